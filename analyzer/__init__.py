@@ -4,21 +4,33 @@ Dieses Paket bündelt die Kernkomponenten für die E-Mail-Analyse. Die
 Untermodule werden bei Bedarf geladen, um optionale Abhängigkeiten zu
 vermeiden.
 """
-
-# Optionale Importe, um Tests ohne externe Abhängigkeiten zu ermöglichen.
-try:  # pragma: no cover - optional Import
-    from .email_scanner import get_outlook_emails
-except Exception:  # pragma: no cover - fehlende Abhängigkeiten
-    get_outlook_emails = None
-
-# Optionaler Import, da Funktion in manchen Umgebungen nicht benötigt wird.
-try:  # pragma: no cover - optional Import
-    from .traffic_light import analyze_threat_level
-except Exception:  # pragma: no cover - fehlende Abhängigkeiten oder fehlende Funktion
-    analyze_threat_level = None
+import importlib
 
 from .utils import setup_logging
 
 __all__ = ["get_outlook_emails", "analyze_threat_level", "setup_logging"]
 
 __version__ = '0.1.0'
+
+# Attribute, deren Untermodule erst beim ersten Zugriff importiert werden
+_LAZY_ATTRIBUTES = {
+    "get_outlook_emails": ".email_scanner",
+    "analyze_threat_level": ".traffic_light",
+}
+
+
+def __getattr__(name):
+    """Lädt schwergewichtige Untermodule erst beim ersten Zugriff (PEP 562).
+
+    Fehlen optionale Abhängigkeiten oder die Funktion selbst, wird ``None``
+    geliefert.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    except Exception:  # pragma: no cover - fehlende Abhängigkeiten oder fehlende Funktion
+        value = None
+    globals()[name] = value
+    return value
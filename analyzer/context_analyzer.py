@@ -3,21 +3,97 @@ Kontext-bewusstes Learning System
 Berücksichtigt Unternehmensstruktur und Benutzerrollen bei der Bedrohungsanalyse
 """
 import os
-import json
 import logging
-from typing import Dict, List
+import pickle
+from collections import OrderedDict, defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from datetime import datetime
 import joblib
 
+try:  # pragma: no cover - optionale Abhängigkeit
+    from numba import njit
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    njit = None
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    import lz4
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    lz4 = None
+
+from .hashing import fast_digest
+from .keyword_matcher import KeywordMatcher
+from .serialization import dumps, loads
+
 
 # Gewichtungen für abteilungsspezifische Analyse
 SENDER_MATCH_WEIGHT = 0.3
 SUBJECT_MATCH_WEIGHT = 0.3
 MAX_CLEARANCE_BONUS = 0.4
 
+# Die Rollenmodelle sehen nur vier Features; 32 Bäume liegen dafür im
+# Rauschen der Standardvorgabe von 100
+ROLE_MODEL_ESTIMATORS = 32
+ROLE_MODEL_MAX_SAMPLES = 256
+
+# LZ4 ist beim Laden deutlich schneller als zlib; ohne lz4 unkomprimiert
+ROLE_MODEL_COMPRESSION = ('lz4', 3) if lz4 is not None else 0
+
+# Maximale Anzahl zwischengespeicherter Analyseergebnisse
+ANALYSIS_CACHE_SIZE = 4096
+
+# Gewichtungen beim Kombinieren der Kontext-Scores
+ROLE_SCORE_WEIGHT = 0.4
+DEPARTMENT_SCORE_WEIGHT = 0.3
+CONTACT_SCORE_WEIGHT = 0.3
+
+# Beispiel-Mapping von Rollen zu spezifischen Bedrohungen
+ROLE_THREATS = {
+    "finance": [
+        ("bank", "Möglicher Banking-Trojaner"),
+        ("rechnung", "Gefälschte Rechnung"),
+        ("zahlung", "Gefälschte Zahlungsaufforderung")
+    ],
+    "hr": [
+        ("bewerbung", "Gefälschte Bewerbung"),
+        ("lebenslauf", "Manipulierter Lebenslauf"),
+        ("vertrag", "Gefälschter Arbeitsvertrag")
+    ],
+    "it": [
+        ("admin", "Gefälschte Admin-Anfrage"),
+        ("passwort", "Passwort-Phishing"),
+        ("zugang", "Unbefugter Zugriffsversuch")
+    ]
+}
+
+
+def _new_role_model() -> IsolationForest:
+    """Erzeugt ein ungelerntes Modell für eine Rolle"""
+    return IsolationForest(
+        n_estimators=ROLE_MODEL_ESTIMATORS,
+        max_samples=ROLE_MODEL_MAX_SAMPLES,
+        contamination=0.1,
+        random_state=42,
+        n_jobs=-1
+    )
+
+
+def _combine_batch_kernel(role, dept, contact, w_role, w_dept, w_contact, out):
+    """Gewichtet die Teil-Scores elementweise und begrenzt sie auf [0, 1]"""
+    for i in range(role.shape[0]):
+        value = role[i] * w_role + dept[i] * w_dept + contact[i] * w_contact
+        out[i] = 0.0 if value < 0.0 else (1.0 if value > 1.0 else value)
+
+
+if njit is not None:  # pragma: no cover - nur mit Numba
+    _combine_batch = njit(cache=True)(_combine_batch_kernel)
+else:
+    def _combine_batch(role, dept, contact, w_role, w_dept, w_contact, out):
+        """NumPy-Variante von ``_combine_batch_kernel`` ohne Python-Schleife"""
+        np.clip(role * w_role + dept * w_dept + contact * w_contact, 0.0, 1.0, out=out)
+
 
 class ContextAwareAnalyzer:
     def __init__(self, storage_dir: str = "models/context"):
@@ -25,14 +101,25 @@ class ContextAwareAnalyzer:
         os.makedirs(storage_dir, exist_ok=True)
 
         self.context_file = os.path.join(storage_dir, "organization_context.json")
+        self.patterns_log_file = os.path.join(storage_dir, "communication_patterns.jsonl")
+        self._patterns_log = None
+        self._last_context_digest = None
         self.models_dir = os.path.join(storage_dir, "role_models")
         os.makedirs(self.models_dir, exist_ok=True)
 
+        self._analysis_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
         self.org_context = self._load_organization_context()
+        self._rebuild_pattern_indices()
         self.role_models = {}
         self._load_role_models()
 
-    def analyze_with_context(self, email_data: Dict, user_context: Dict) -> Dict:
+        self._threat_matchers = {
+            role: KeywordMatcher(keyword for keyword, _ in threats)
+            for role, threats in ROLE_THREATS.items()
+        }
+
+    def analyze_with_context(self, email_data: Dict, user_context: Dict,
+                             now_hour: Optional[int] = None) -> Dict:
         """
         Analysiert eine E-Mail unter Berücksichtigung des Benutzer- und Organisationskontexts
 
@@ -42,31 +129,154 @@ class ContextAwareAnalyzer:
             "clearance_level": int,  # 1-5
             "common_contacts": List[str]  # Häufige Kontakte
         }
+
+        ``now_hour`` legt die Stunde für zeitbasierte Merkmale fest; ohne
+        Angabe wird die aktuelle Stunde verwendet.
+        """
+        return self.analyze_batch([email_data], [user_context], now_hour)[0]
+
+    def analyze_batch(self, emails: List[Dict], user_contexts: List[Dict],
+                      now_hour: Optional[int] = None) -> List[Dict]:
+        """Analysiert mehrere E-Mails in einem Durchlauf.
+
+        Die rollenspezifischen Modelle werden pro Rolle nur einmal mit allen
+        Feature-Zeilen aufgerufen statt einmal pro E-Mail.
+
+        Args:
+            emails: Zu analysierende E-Mails.
+            user_contexts: Benutzerkontexte in derselben Reihenfolge wie ``emails``.
+            now_hour: Stunde (0-23) für zeitbasierte Merkmale. Wird einmal pro
+                Batch ermittelt, wenn nicht angegeben.
+
+        Returns:
+            Analyseergebnisse in der Reihenfolge der Eingabe.
+
+        Raises:
+            ValueError: Wenn beide Listen unterschiedlich lang sind.
         """
-        analysis = {
+        if len(emails) != len(user_contexts):
+            raise ValueError("emails und user_contexts müssen gleich lang sein")
+
+        if now_hour is None:
+            now_hour = datetime.now().hour
+
+        # Sortierte Kontaktliste einmal je Benutzerkontext statt je E-Mail
+        contacts_keys: Dict[int, str] = {}
+        for user_context in user_contexts:
+            if id(user_context) not in contacts_keys:
+                contacts_keys[id(user_context)] = self._contacts_key(user_context)
+        keys = [
+            self._analysis_cache_key(email_data, user_context, now_hour, contacts_keys[id(user_context)])
+            for email_data, user_context in zip(emails, user_contexts)
+        ]
+        results = [self._cached_analysis(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = self._analyze_uncached(
+                [emails[i] for i in missing], [user_contexts[i] for i in missing], now_hour
+            )
+            for i, analysis in zip(missing, computed):
+                results[i] = analysis
+                self._analysis_cache[keys[i]] = analysis
+            while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+
+        # Kopien ausgeben, damit Aufrufer den Cache nicht verändern
+        return [
+            {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+            for result in results
+        ]
+
+    @staticmethod
+    def _contacts_key(user_context: Dict) -> str:
+        """Reihenfolgeunabhängiger Schlüsselanteil der häufigen Kontakte"""
+        return "\x1e".join(sorted(user_context.get("common_contacts", [])))
+
+    @classmethod
+    def _analysis_cache_key(cls, email_data: Dict, user_context: Dict, now_hour: int,
+                            contacts_key: Optional[str] = None) -> bytes:
+        """Bildet den Cache-Schlüssel aus allen Eingaben, die das Ergebnis beeinflussen.
+
+        ``contacts_key`` ist der vorab berechnete Wert von :meth:`_contacts_key`.
+        """
+        if contacts_key is None:
+            contacts_key = cls._contacts_key(user_context)
+        fields = (
+            email_data.get("sender", ""),
+            email_data.get("subject", ""),
+            "1" if email_data.get("attachments") else "0",
+            user_context.get("role", ""),
+            user_context.get("department", ""),
+            user_context.get("clearance_level", 1),
+            contacts_key,
+            now_hour,
+            email_data.get("body", "") or "",
+        )
+        return fast_digest("\x1f".join(str(field) for field in fields).encode("utf-8", "surrogatepass"))
+
+    def _cached_analysis(self, key: bytes) -> Optional[Dict]:
+        """Liefert ein zwischengespeichertes Ergebnis und markiert es als zuletzt genutzt"""
+        result = self._analysis_cache.get(key)
+        if result is not None:
+            self._analysis_cache.move_to_end(key)
+        return result
+
+    def _analyze_uncached(self, emails: List[Dict], user_contexts: List[Dict], now_hour: int) -> List[Dict]:
+        """Analysiert E-Mails ohne Cache"""
+        # Kontaktmengen einmal je Benutzerkontext statt je E-Mail aufbauen
+        contacts_by_context = self._contact_sets_by_context(user_contexts)
+
+        role_scores = np.asarray(
+            self._analyze_role_specific_batch(emails, user_contexts, now_hour, contacts_by_context),
+            dtype=np.float64
+        )
+
+        dept_scores = np.zeros(len(emails), dtype=np.float64)
+        contact_scores = np.zeros(len(emails), dtype=np.float64)
+        valid = np.ones(len(emails), dtype=bool)
+        for i, (email_data, user_context) in enumerate(zip(emails, user_contexts)):
+            try:
+                # Abteilungsspezifische Analyse
+                dept_scores[i] = self._analyze_department_specific(email_data, user_context)
+
+                # Kontaktbasierte Analyse
+                contact_scores[i] = self._analyze_contact_patterns(
+                    email_data, user_context, contacts_by_context[id(user_context)]
+                )
+            except Exception as e:
+                logging.error(f"Fehler bei der Kontextanalyse: {str(e)}")
+                valid[i] = False
+
+        # Kombination der Scores für alle E-Mails in einem Aufruf
+        context_scores = self._combine_scores_batch(role_scores, dept_scores, contact_scores)
+
+        return [
+            self._analyze_single(email_data, user_context, context_score, now_hour)
+            if is_valid else self._empty_analysis()
+            for email_data, user_context, context_score, is_valid
+            in zip(emails, user_contexts, context_scores.tolist(), valid)
+        ]
+
+    @staticmethod
+    def _empty_analysis() -> Dict:
+        """Liefert ein leeres Analyseergebnis"""
+        return {
             "context_score": 0.0,
             "context_factors": [],
             "role_specific_threats": [],
             "suggested_actions": []
         }
 
-        try:
-            # Rollenbasierte Analyse
-            role_score = self._analyze_role_specific(email_data, user_context)
-
-            # Abteilungsspezifische Analyse
-            dept_score = self._analyze_department_specific(email_data, user_context)
-
-            # Kontaktbasierte Analyse
-            contact_score = self._analyze_contact_patterns(email_data, user_context)
-
-            # Kombination der Scores
-            analysis["context_score"] = self._combine_scores(
-                role_score, dept_score, contact_score
-            )
+    def _analyze_single(self, email_data: Dict, user_context: Dict, context_score: float,
+                        now_hour: int) -> Dict:
+        """Ergänzt den kombinierten Kontext-Score um Anomalien, Bedrohungen und Empfehlungen"""
+        analysis = self._empty_analysis()
+        analysis["context_score"] = context_score
 
+        try:
             # Anomalie-Erkennung für den spezifischen Kontext
-            if self._is_contextual_anomaly(email_data, user_context):
+            if self._is_contextual_anomaly(email_data, user_context, now_hour):
                 analysis["context_factors"].append(
                     "Ungewöhnliches Kommunikationsmuster für diese Rolle/Abteilung"
                 )
@@ -91,6 +301,7 @@ class ContextAwareAnalyzer:
         """Aktualisiert den Organisationskontext mit neuen Informationen"""
         try:
             self.org_context.update(context_data)
+            self._rebuild_pattern_indices()
             self._save_organization_context()
 
             # Aktualisiere Modelle bei signifikanten Änderungen
@@ -118,36 +329,63 @@ class ContextAwareAnalyzer:
             if "communication_patterns" not in self.org_context:
                 self.org_context["communication_patterns"] = []
 
-            self.org_context["communication_patterns"].append({
+            record = {
                 **pattern_data,
                 "added": datetime.now().isoformat()
-            })
+            }
+            self.org_context["communication_patterns"].append(record)
 
-            self._save_organization_context()
+            self._rebuild_pattern_indices()
+            self._append_pattern_log(record)
             self._update_role_model(pattern_data["role"])
 
         except Exception as e:
             logging.error(f"Fehler beim Hinzufügen des Kommunikationsmusters: {str(e)}")
 
-    def _analyze_role_specific(self, email_data: Dict, user_context: Dict) -> float:
+    def _analyze_role_specific(self, email_data: Dict, user_context: Dict,
+                               now_hour: Optional[int] = None) -> float:
         """Analysiert E-Mail basierend auf der Benutzerrolle"""
-        role = user_context.get("role")
-        if not role or role not in self.role_models:
-            return 0.0
+        return self._analyze_role_specific_batch([email_data], [user_context], now_hour)[0]
+
+    def _analyze_role_specific_batch(
+        self, emails: List[Dict], user_contexts: List[Dict], now_hour: Optional[int] = None,
+        contacts_by_context: Optional[Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]]] = None
+    ) -> List[float]:
+        """Berechnet die Rollen-Scores für mehrere E-Mails.
+
+        Die E-Mails werden nach Rolle gruppiert, sodass ``score_samples`` je
+        Rolle genau einmal mit einer ``(N, 4)``-Matrix aufgerufen wird.
+        ``contacts_by_context`` sind bereits gebildete Kontaktmengen aus
+        :meth:`_contact_sets_by_context`.
+        """
+        scores = np.zeros(len(emails), dtype=np.float64)
+
+        groups: Dict[str, List[int]] = {}
+        for i, user_context in enumerate(user_contexts):
+            role = user_context.get("role")
+            if role and role in self.role_models:
+                groups.setdefault(role, []).append(i)
+
+        for role, indices in groups.items():
+            try:
+                model = self.role_models[role]
+                features = self._extract_role_features_batch(
+                    [emails[i] for i in indices],
+                    [user_contexts[i] for i in indices],
+                    now_hour,
+                    contacts_by_context
+                )
 
-        try:
-            model = self.role_models[role]
-            features = self._extract_role_features(email_data, user_context)
+                # Anomalie-Score (-1 bis 1, wobei -1 am anomalsten)
+                raw_scores = model.score_samples(features)
 
-            # Anomalie-Score (-1 bis 1, wobei -1 am anomalsten)
-            score = model.score_samples([features])[0]
+                # Normalisiere auf 0-1 Skala
+                scores[indices] = (raw_scores + 1) * 0.5
 
-            # Normalisiere auf 0-1 Skala
-            return (score + 1) / 2
+            except Exception as e:
+                logging.error(f"Fehler bei der rollenspezifischen Analyse: {str(e)}")
 
-        except Exception as e:
-            logging.error(f"Fehler bei der rollenspezifischen Analyse: {str(e)}")
-            return 0.0
+        return scores.tolist()
 
     def _analyze_department_specific(self, email_data: Dict, user_context: Dict) -> float:
         """Analysiert E-Mail im Kontext der Abteilung"""
@@ -160,18 +398,12 @@ class ContextAwareAnalyzer:
 
         if dept_patterns:
             # Prüfe typische Kommunikationsmuster
-            sender_match = any(
-                pattern["sender"] == email_data.get("sender")
-                for pattern in dept_patterns
-            )
+            sender_match = email_data.get("sender") in self._senders_by_dept[department]
             score += SENDER_MATCH_WEIGHT if sender_match else 0
 
-            # Prüfe übliche Betreffzeilen
+            # Prüfe übliche Betreffzeilen (bereits kleingeschrieben indiziert)
             subject = email_data.get("subject", "").lower()
-            subject_match = any(
-                any(s.lower() in subject for s in pattern.get("typical_subjects", []))
-                for pattern in dept_patterns
-            )
+            subject_match = any(s in subject for s in self._subjects_by_dept[department])
             score += SUBJECT_MATCH_WEIGHT if subject_match else 0
 
             # Berücksichtige Clearance-Level
@@ -180,9 +412,30 @@ class ContextAwareAnalyzer:
 
         return score
 
-    def _analyze_contact_patterns(self, email_data: Dict, user_context: Dict) -> float:
+    @staticmethod
+    def _contact_sets(user_context: Dict) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Liefert die häufigen Kontakte und deren Domains als Mengen"""
+        common_contacts = frozenset(user_context.get("common_contacts", []))
+        domains = frozenset(
+            contact.rsplit('@', 1)[1] for contact in common_contacts if '@' in contact
+        )
+        return common_contacts, domains
+
+    @classmethod
+    def _contact_sets_by_context(
+        cls, user_contexts: List[Dict]
+    ) -> Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]]:
+        """Bildet die Kontaktmengen je unterschiedlichem Benutzerkontext genau einmal"""
+        contacts_by_context: Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        for user_context in user_contexts:
+            if id(user_context) not in contacts_by_context:
+                contacts_by_context[id(user_context)] = cls._contact_sets(user_context)
+        return contacts_by_context
+
+    def _analyze_contact_patterns(self, email_data: Dict, user_context: Dict,
+                                  contacts: Optional[Tuple[FrozenSet[str], FrozenSet[str]]] = None) -> float:
         """Analysiert E-Mail basierend auf bekannten Kontaktmustern"""
-        common_contacts = set(user_context.get("common_contacts", []))
+        common_contacts, domains = contacts or self._contact_sets(user_context)
         sender = email_data.get("sender", "")
 
         if not common_contacts or not sender:
@@ -193,35 +446,29 @@ class ContextAwareAnalyzer:
             return 0.8
 
         # Prüfe auf ähnliche Domains
-        sender_domain = sender.split('@')[1] if '@' in sender else ""
-        if sender_domain:
-            for contact in common_contacts:
-                if '@' in contact and contact.split('@')[1] == sender_domain:
-                    return 0.5
+        sender_domain = sender.rsplit('@', 1)[1] if '@' in sender else ""
+        if sender_domain and sender_domain in domains:
+            return 0.5
 
         return 0.2  # Grundwert für unbekannte Absender
 
-    def _is_contextual_anomaly(self, email_data: Dict, user_context: Dict) -> bool:
+    def _is_contextual_anomaly(self, email_data: Dict, user_context: Dict,
+                               now_hour: Optional[int] = None) -> bool:
         """Erkennt kontextbezogene Anomalien"""
-        patterns = self.org_context.get("communication_patterns", [])
-        role_patterns = [p for p in patterns if p["role"] == user_context.get("role")]
-
-        if not role_patterns:
+        role = user_context.get("role")
+        if not self._by_role.get(role):
             return False
 
         anomalies = []
 
         # Prüfe Zeitliche Muster
-        current_hour = datetime.now().hour
-        typical_hours = set()
-        for pattern in role_patterns:
-            typical_hours.update(int(t.split(':')[0]) for t in pattern.get("typical_times", []))
-
-        if typical_hours and current_hour not in typical_hours:
+        current_hour = datetime.now().hour if now_hour is None else now_hour
+        mask = self._typical_hours_mask_by_role.get(role, 0)
+        if mask and not (mask >> current_hour) & 1:
             anomalies.append("Unübliche Zeit für diese Kommunikation")
 
         # Prüfe Absender-Muster
-        typical_senders = {p["sender"] for p in role_patterns}
+        typical_senders = self._typical_senders_by_role.get(role)
         if typical_senders and email_data.get("sender") not in typical_senders:
             anomalies.append("Unüblicher Absender für diese Rolle")
 
@@ -229,35 +476,14 @@ class ContextAwareAnalyzer:
 
     def _get_role_specific_threats(self, email_data: Dict, user_context: Dict) -> List[str]:
         """Identifiziert rollenspezifische Bedrohungen"""
-        threats = []
         role = user_context.get("role", "").lower()
+        matcher = self._threat_matchers.get(role)
+        if matcher is None:
+            return []
 
-        # Beispiel-Mapping von Rollen zu spezifischen Bedrohungen
-        role_threats = {
-            "finance": [
-                ("bank", "Möglicher Banking-Trojaner"),
-                ("rechnung", "Gefälschte Rechnung"),
-                ("zahlung", "Gefälschte Zahlungsaufforderung")
-            ],
-            "hr": [
-                ("bewerbung", "Gefälschte Bewerbung"),
-                ("lebenslauf", "Manipulierter Lebenslauf"),
-                ("vertrag", "Gefälschter Arbeitsvertrag")
-            ],
-            "it": [
-                ("admin", "Gefälschte Admin-Anfrage"),
-                ("passwort", "Passwort-Phishing"),
-                ("zugang", "Unbefugter Zugriffsversuch")
-            ]
-        }
-
-        if role in role_threats:
-            content = f"{email_data.get('subject', '')} {email_data.get('body', '')}".lower()
-            for keyword, threat in role_threats[role]:
-                if keyword in content:
-                    threats.append(threat)
-
-        return threats
+        content = f"{email_data.get('subject', '')} {email_data.get('body', '')}".lower()
+        found = matcher.find(content)
+        return [threat for keyword, threat in ROLE_THREATS[role] if keyword in found]
 
     def _generate_actions(self, context_score: float, user_context: Dict) -> List[str]:
         """Generiert kontextspezifische Handlungsempfehlungen"""
@@ -281,62 +507,143 @@ class ContextAwareAnalyzer:
 
     def _combine_scores(self, role_score: float, dept_score: float, contact_score: float) -> float:
         """Kombiniert verschiedene Kontext-Scores"""
-        weights = {
-            'role': 0.4,
-            'department': 0.3,
-            'contact': 0.3
-        }
+        return float(self._combine_scores_batch(
+            np.array([role_score]), np.array([dept_score]), np.array([contact_score])
+        )[0])
 
-        combined = (
-            role_score * weights['role'] +
-            dept_score * weights['department'] +
-            contact_score * weights['contact']
-        )
+    @staticmethod
+    def _combine_scores_batch(role_scores: np.ndarray, dept_scores: np.ndarray,
+                              contact_scores: np.ndarray) -> np.ndarray:
+        """Kombiniert die Kontext-Scores mehrerer E-Mails.
 
-        return min(1.0, max(0.0, combined))
+        Nutzt einen mit Numba kompilierten Kernel, sofern verfügbar,
+        andernfalls vektorisierte NumPy-Operationen.
+        """
+        out = np.empty(role_scores.shape[0], dtype=np.float64)
+        _combine_batch(
+            role_scores, dept_scores, contact_scores,
+            ROLE_SCORE_WEIGHT, DEPARTMENT_SCORE_WEIGHT, CONTACT_SCORE_WEIGHT, out
+        )
+        return out
 
-    def _extract_role_features(self, email_data: Dict, user_context: Dict) -> np.ndarray:
+    def _extract_role_features(self, email_data: Dict, user_context: Dict,
+                               now_hour: Optional[int] = None) -> np.ndarray:
         """Extrahiert Features für die rollenspezifische Analyse"""
-        features = []
+        return self._extract_role_features_batch([email_data], [user_context], now_hour)[0]
 
-        # Zeitliche Features
-        hour = datetime.now().hour
-        features.append(hour / 24.0)  # Normalisierte Stunde
+    def _extract_role_features_batch(
+        self, emails: List[Dict], user_contexts: List[Dict], now_hour: Optional[int] = None,
+        contacts_by_context: Optional[Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]]] = None
+    ) -> np.ndarray:
+        """Extrahiert die Rollen-Features mehrerer E-Mails als ``(N, 4)``-Matrix.
 
-        # Sender-Features
-        sender = email_data.get("sender", "")
-        known_contact = 1.0 if sender in user_context.get("common_contacts", []) else 0.0
-        features.append(known_contact)
+        Spalten: normalisierte Stunde, bekannter Kontakt, normalisiertes
+        Berechtigungslevel, vorhandene Anhänge.
+        """
+        features = np.empty((len(emails), 4), dtype=np.float32)
+
+        # Zeitliche Features (normalisierte Stunde)
+        features[:, 0] = (datetime.now().hour if now_hour is None else now_hour) / 24.0
+
+        # Sender-Features; die Kontaktmenge wird je Benutzerkontext nur einmal gebildet
+        if contacts_by_context is None:
+            contacts_by_context = self._contact_sets_by_context(user_contexts)
+        features[:, 1] = np.fromiter(
+            (
+                email_data.get("sender", "") in contacts_by_context[id(user_context)][0]
+                for email_data, user_context in zip(emails, user_contexts)
+            ),
+            dtype=np.float32,
+            count=len(emails)
+        )
 
-        # Berechtigungslevel
-        clearance = user_context.get("clearance_level", 1)
-        features.append(clearance / 5.0)  # Normalisiert auf 0-1
+        # Berechtigungslevel, normalisiert auf 0-1
+        features[:, 2] = np.fromiter(
+            (user_context.get("clearance_level", 1) for user_context in user_contexts),
+            dtype=np.float32,
+            count=len(user_contexts)
+        ) / 5.0
 
         # Anhang-Features
-        has_attachments = 1.0 if email_data.get("attachments") else 0.0
-        features.append(has_attachments)
+        features[:, 3] = np.fromiter(
+            (bool(email_data.get("attachments")) for email_data in emails),
+            dtype=np.float32,
+            count=len(emails)
+        )
 
-        return np.array(features)
+        return features
+
+    def checkpoint(self) -> None:
+        """Schreibt einen vollständigen Snapshot und leert das Muster-Log"""
+        self._save_organization_context()
 
     def _load_organization_context(self) -> Dict:
-        """Lädt den Organisationskontext"""
+        """Lädt den Organisationskontext.
+
+        Auf den Snapshot werden anschließend alle Muster aus dem
+        Append-Log angewendet, die seit dem letzten Snapshot hinzukamen.
+        """
+        context = {}
         try:
             if os.path.exists(self.context_file):
-                with open(self.context_file, 'r') as f:
-                    return json.load(f)
-            return {}
+                with open(self.context_file, 'rb') as f:
+                    context = loads(f.read())
         except Exception as e:
             logging.error(f"Fehler beim Laden des Organisationskontexts: {str(e)}")
             return {}
 
+        try:
+            if os.path.exists(self.patterns_log_file):
+                patterns = context.setdefault("communication_patterns", [])
+                with open(self.patterns_log_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            patterns.append(loads(line))
+                        except ValueError:
+                            logging.warning("Unvollständiger Eintrag im Muster-Log übersprungen")
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des Muster-Logs: {str(e)}")
+
+        return context
+
     def _save_organization_context(self) -> None:
-        """Speichert den Organisationskontext"""
+        """Speichert den Organisationskontext als Snapshot.
+
+        Der Snapshot wird über eine temporäre Datei und ``os.replace``
+        atomar ersetzt und entfällt, wenn sich der Inhalt seit dem letzten
+        Speichern nicht geändert hat. Da der Snapshot alle Muster enthält,
+        wird das Append-Log danach geleert.
+        """
         try:
-            with open(self.context_file, 'w') as f:
-                json.dump(self.org_context, f, indent=2)
+            data = dumps(self.org_context, indent=True)
+            digest = fast_digest(data)
+            if digest != self._last_context_digest:
+                tmp_file = f"{self.context_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.context_file)
+                self._last_context_digest = digest
+            self._truncate_pattern_log()
         except Exception as e:
             logging.error(f"Fehler beim Speichern des Organisationskontexts: {str(e)}")
 
+    def _append_pattern_log(self, record: Dict) -> None:
+        """Hängt ein Kommunikationsmuster als JSON-Zeile an das Log an"""
+        if self._patterns_log is None:
+            self._patterns_log = open(self.patterns_log_file, 'ab')
+        self._patterns_log.write(dumps(record) + b"\n")
+        self._patterns_log.flush()
+
+    def _truncate_pattern_log(self) -> None:
+        """Schließt und leert das Muster-Log"""
+        if self._patterns_log is not None:
+            self._patterns_log.close()
+            self._patterns_log = None
+        if os.path.exists(self.patterns_log_file):
+            open(self.patterns_log_file, 'wb').close()
+
     def _load_role_models(self) -> None:
         """Lädt die rollenspezifischen Modelle"""
         try:
@@ -345,10 +652,7 @@ class ContextAwareAnalyzer:
                 if os.path.exists(model_path):
                     self.role_models[role] = joblib.load(model_path)
                 else:
-                    self.role_models[role] = IsolationForest(
-                        contamination=0.1,
-                        random_state=42
-                    )
+                    self.role_models[role] = _new_role_model()
         except Exception as e:
             logging.error(f"Fehler beim Laden der Rollenmodelle: {str(e)}")
 
@@ -357,17 +661,18 @@ class ContextAwareAnalyzer:
         try:
             if role in self.role_models:
                 model_path = os.path.join(self.models_dir, f"{role}_model.joblib")
-                joblib.dump(self.role_models[role], model_path)
+                joblib.dump(
+                    self.role_models[role], model_path,
+                    compress=ROLE_MODEL_COMPRESSION, protocol=pickle.HIGHEST_PROTOCOL
+                )
         except Exception as e:
             logging.error(f"Fehler beim Speichern des Rollenmodells: {str(e)}")
 
     def _update_role_model(self, role: str) -> None:
         """Aktualisiert ein rollenspezifisches Modell"""
         if role not in self.role_models:
-            self.role_models[role] = IsolationForest(
-                contamination=0.1,
-                random_state=42
-            )
+            self.role_models[role] = _new_role_model()
+        self._analysis_cache.clear()
         self._save_role_model(role)
 
     def _requires_model_update(self, context_data: Dict) -> bool:
@@ -380,5 +685,55 @@ class ContextAwareAnalyzer:
 
     def _get_department_patterns(self, department: str) -> List[Dict]:
         """Holt die Kommunikationsmuster einer Abteilung"""
-        patterns = self.org_context.get("communication_patterns", [])
-        return [p for p in patterns if p.get("department") == department]
+        return self._by_dept.get(department, [])
+
+    def _rebuild_pattern_indices(self) -> None:
+        """Baut die Nachschlage-Indizes über die Kommunikationsmuster neu auf.
+
+        Muss nach jeder Änderung an ``communication_patterns`` aufgerufen
+        werden, damit Abteilungs- und Rollenabfragen ohne lineare Suche
+        auskommen. Zwischengespeicherte Analyseergebnisse werden verworfen.
+        """
+        self._analysis_cache.clear()
+
+        by_dept: Dict[str, List[Dict]] = defaultdict(list)
+        by_role: Dict[str, List[Dict]] = defaultdict(list)
+        hours_by_role: Dict[str, int] = defaultdict(int)
+        senders_by_role: Dict[str, set] = defaultdict(set)
+        senders_by_dept: Dict[str, set] = defaultdict(set)
+        subjects_by_dept: Dict[str, dict] = defaultdict(dict)
+
+        for pattern in self.org_context.get("communication_patterns", []):
+            department = pattern.get("department")
+            by_dept[department].append(pattern)
+            if "sender" in pattern:
+                senders_by_dept[department].add(pattern["sender"])
+            for typical_subject in pattern.get("typical_subjects", []):
+                subjects_by_dept[department][typical_subject.lower()] = None
+
+            role = pattern.get("role")
+            by_role[role].append(pattern)
+            if pattern.get("sender"):
+                senders_by_role[role].add(pattern["sender"])
+            for typical_time in pattern.get("typical_times", []):
+                try:
+                    hour = int(typical_time.split(':')[0])
+                    if not 0 <= hour < 24:
+                        raise ValueError(hour)
+                    hours_by_role[role] |= 1 << hour
+                except (AttributeError, ValueError):
+                    logging.warning(f"Ungültige Uhrzeit im Kommunikationsmuster: {typical_time}")
+
+        self._by_dept = dict(by_dept)
+        self._by_role = dict(by_role)
+        self._senders_by_dept: Dict[str, FrozenSet[str]] = {
+            department: frozenset(senders_by_dept[department]) for department in by_dept
+        }
+        self._subjects_by_dept: Dict[str, Tuple[str, ...]] = {
+            department: tuple(subjects_by_dept[department]) for department in by_dept
+        }
+        # Bit h gesetzt, wenn Stunde h für die Rolle üblich ist
+        self._typical_hours_mask_by_role: Dict[str, int] = dict(hours_by_role)
+        self._typical_senders_by_role: Dict[str, FrozenSet[str]] = {
+            role: frozenset(senders) for role, senders in senders_by_role.items()
+        }
@@ -0,0 +1,47 @@
+"""Suffixprüfung von Absenderadressen gegen vertrauenswürdige Domains.
+
+Die Domains werden rückwärts in einem Trie abgelegt, sodass eine Adresse in
+einem Durchlauf über ihre Zeichen geprüft wird, unabhängig davon, wie viele
+Domains konfiguriert sind.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+# Markiert im Trie das Ende einer Domain
+_TERMINAL = ""
+
+
+class TrustedDomainMatcher:
+    """Prüft, ob eine Adresse auf eine der vertrauenswürdigen Domains endet.
+
+    Args:
+        domains: Domain-Suffixe wie ``"@ihrefirma.de"``. Der Vergleich
+            berücksichtigt Groß-/Kleinschreibung wie ``str.endswith``.
+    """
+
+    def __init__(self, domains: Iterable[str]):
+        self._root: Dict[str, dict] = {}
+        for domain in domains:
+            node = self._root
+            for char in reversed(domain):
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = {}
+
+    def matches(self, sender: str) -> bool:
+        """Liefert ``True``, wenn ``sender`` auf eine der Domains endet."""
+        node = self._root
+        if _TERMINAL in node:
+            return True
+        for char in reversed(sender):
+            node = node.get(char)
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                return True
+        return False
+
+
+@lru_cache(maxsize=32)
+def get_domain_matcher(domains: Tuple[str, ...]) -> TrustedDomainMatcher:
+    """Liefert einen zwischengespeicherten Matcher für die gegebenen Domains."""
+    return TrustedDomainMatcher(domains)
@@ -4,12 +4,14 @@ Dieses Modul nutzt die `msal`-Bibliothek. Ist sie nicht verfügbar, wird die
 Integration deaktiviert, ohne dass ein ImportError ausgelöst wird.
 """
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional
 
 try:  # pragma: no cover - externe Abhängigkeit
     import requests
+    from requests.adapters import HTTPAdapter
 except Exception:  # pragma: no cover
-    requests = None
+    requests = HTTPAdapter = None
 
 try:  # pragma: no cover - externe Abhängigkeit
     import msal
@@ -18,14 +20,38 @@ except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
 
 from .base import EmailClientBase
 
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+# Maximale Anzahl von Teilanfragen pro Graph-$batch-Aufruf
+GRAPH_BATCH_LIMIT = 20
+MESSAGE_FIELDS = "id,subject,from,body,hasAttachments"
+# Verbindungs- und Lese-Timeout in Sekunden
+HTTP_TIMEOUT = (3.05, 30)
+HTTP_POOL_MAXSIZE = 16
+# Parallele Graph-Anfragen, begrenzt durch die Größe des Verbindungspools
+MAX_FETCH_WORKERS = min(8, HTTP_POOL_MAXSIZE)
+# Für die Analyse genügt der Anfang des Bodys; große HTML-Bodys werden gekürzt
+DEFAULT_BODY_CHARS_CAP = 64 * 1024
+
 
 class ExchangeOnlineClient(EmailClientBase):
-    def __init__(self, client_id: str, tenant_id: str, client_secret: str):
+    def __init__(self, client_id: str, tenant_id: str, client_secret: str,
+                 body_chars_cap: Optional[int] = DEFAULT_BODY_CHARS_CAP):
+        """Initialisiert den Client.
+
+        Args:
+            client_id: Anwendungs-ID der App-Registrierung.
+            tenant_id: ID des Azure-AD-Mandanten.
+            client_secret: Geheimnis der App-Registrierung.
+            body_chars_cap: Maximale Anzahl übernommener Zeichen des
+                Nachrichtentexts; ``None`` übernimmt den vollständigen Text.
+        """
         self._client_id = client_id
+        self._body_chars_cap = body_chars_cap
         self._tenant_id = tenant_id
         self._client_secret = client_secret
         self._token = None
         self._app = None
+        self._session = None
 
     @property
     def name(self) -> str:
@@ -53,6 +79,7 @@ class ExchangeOnlineClient(EmailClientBase):
 
             if "access_token" in result:
                 self._token = result['access_token']
+                self._session = self._create_session()
                 return True
             logging.error(f"Fehler beim Token-Abruf: {result.get('error')}")
             return False
@@ -61,39 +88,61 @@ class ExchangeOnlineClient(EmailClientBase):
             logging.error(f"Fehler beim Verbinden mit Exchange Online: {str(e)}")
             return False
 
+    def _create_session(self):
+        """Erstellt eine Session mit Keep-Alive und Verbindungspool.
+
+        Alle Graph-Aufrufe teilen sich so TCP- und TLS-Verbindungen, der
+        Authorization-Header wird nur einmal gesetzt.
+        """
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE))
+        session.headers.update({
+            'Authorization': f'Bearer {self._token}',
+            'Content-Type': 'application/json'
+        })
+        return session
+
     def get_emails(self, max_count: int = 20) -> List[Dict]:
-        if not self._token:
+        if not self._token or self._session is None:
             if not self.connect():
                 return []
 
         try:
-            headers = {
-                'Authorization': f'Bearer {self._token}',
-                'Content-Type': 'application/json'
-            }
-
-            # Microsoft Graph API Aufruf
-            url = f"https://graph.microsoft.com/v1.0/me/messages?$top={max_count}&$orderby=receivedDateTime desc"
-            response = requests.get(url, headers=headers)
+            # Microsoft Graph API Aufruf, Anhangsnamen werden direkt mitgeladen
+            url = (
+                f"{GRAPH_BASE_URL}/me/messages?$top={max_count}"
+                f"&$orderby=receivedDateTime desc&$select={MESSAGE_FIELDS}"
+            )
+            response = self._session.get(f"{url}&$expand=attachments($select=name)", timeout=HTTP_TIMEOUT)
+            expanded = response.ok
+            if not expanded:
+                # $expand kann durch Mandantenrichtlinien untersagt sein
+                logging.warning("Graph $expand nicht möglich, Anhänge werden per $batch abgerufen")
+                response = self._session.get(url, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
 
-            data = response.json()
-            emails = []
+            messages = response.json().get('value', [])
+            if expanded:
+                attachments_by_id = {
+                    msg.get('id'): [att['name'] for att in msg.get('attachments', [])]
+                    for msg in messages
+                }
+            else:
+                attachments_by_id = self._fetch_attachment_names(
+                    [msg['id'] for msg in messages if msg.get('hasAttachments', False)]
+                )
 
-            for msg in data.get('value', []):
-                # Anhänge abrufen
-                attachments = []
-                if msg.get('hasAttachments', False):
-                    att_url = f"https://graph.microsoft.com/v1.0/me/messages/{msg['id']}/attachments"
-                    att_response = requests.get(att_url, headers=headers)
-                    if att_response.ok:
-                        attachments = [att['name'] for att in att_response.json().get('value', [])]
+            emails = []
+            for msg in messages:
+                body = msg.get('body', {}).get('content', '')
+                if self._body_chars_cap is not None:
+                    body = body[:self._body_chars_cap]
 
                 emails.append({
                     "subject": msg.get('subject', ''),
                     "sender": msg.get('from', {}).get('emailAddress', {}).get('address', ''),
-                    "body": msg.get('body', {}).get('content', ''),
-                    "attachments": attachments
+                    "body": body,
+                    "attachments": attachments_by_id.get(msg.get('id'), [])
                 })
 
             return emails
@@ -102,6 +151,61 @@ class ExchangeOnlineClient(EmailClientBase):
             logging.error(f"Fehler beim Abrufen der E-Mails von Exchange Online: {str(e)}")
             return []
 
+    def _fetch_attachment_names(self, message_ids: List[str]) -> Dict[str, List[str]]:
+        """Ruft Anhangsnamen mehrerer Nachrichten über Graph-$batch-Anfragen ab.
+
+        Mehrere $batch-Anfragen werden parallel gesendet, damit sich ihre
+        Netzwerklatenzen überlappen.
+
+        Args:
+            message_ids: IDs der Nachrichten mit Anhängen.
+
+        Returns:
+            Zuordnung von Nachrichten-ID zu Anhangsnamen.
+        """
+        chunks = [
+            message_ids[start:start + GRAPH_BATCH_LIMIT]
+            for start in range(0, len(message_ids), GRAPH_BATCH_LIMIT)
+        ]
+        names: Dict[str, List[str]] = {}
+        if not chunks:
+            return names
+
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(chunks))) as executor:
+            futures = [executor.submit(self._fetch_attachment_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                names.update(future.result())
+
+        return names
+
+    def _fetch_attachment_chunk(self, message_ids: List[str]) -> Dict[str, List[str]]:
+        """Ruft die Anhangsnamen von höchstens ``GRAPH_BATCH_LIMIT`` Nachrichten ab."""
+        payload = {
+            "requests": [
+                {
+                    "id": str(index),
+                    "method": "GET",
+                    "url": f"/me/messages/{message_id}/attachments?$select=name"
+                }
+                for index, message_id in enumerate(message_ids)
+            ]
+        }
+        response = self._session.post(f"{GRAPH_BASE_URL}/$batch", json=payload, timeout=HTTP_TIMEOUT)
+        if not response.ok:
+            logging.warning(f"Graph-$batch-Anfrage fehlgeschlagen: {response.status_code}")
+            return {}
+
+        names: Dict[str, List[str]] = {}
+        for item in response.json().get('responses', []):
+            if item.get('status') == 200:
+                names[message_ids[int(item['id'])]] = [
+                    att['name'] for att in item.get('body', {}).get('value', [])
+                ]
+        return names
+
     def disconnect(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         self._token = None
         self._app = None
@@ -1,11 +1,15 @@
 """
 Gmail IMAP Integration
 """
+import base64
 import imaplib
 import email
-from email.header import decode_header
+import quopri
+import re
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
 import os
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 import pickle
 
@@ -16,16 +20,230 @@ try:  # pragma: no cover - externe Abhängigkeiten
 except Exception:  # pragma: no cover - Bibliotheken evtl. nicht verfügbar
     Credentials = InstalledAppFlow = Request = None
 
+from ..serialization import loads
 from .base import EmailClientBase
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Kopfzeilen und MIME-Struktur aller Nachrichten in einem Aufruf, ohne sie als gelesen zu markieren
+HEADER_FETCH_SPEC = '(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM)] BODYSTRUCTURE)'
+
+# Token einer IMAP-FETCH-Antwort: Klammern, Quoted-Strings, Literal-Ankündigungen
+# und Atome inklusive Abschnittsangaben wie ``BODY[1.2]``
+_IMAP_TOKEN_RE = re.compile(
+    rb'\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"'
+    rb'|\{(?P<literal>\d+)\}\s*$|(?P<atom>[^\s()"\[]+(?:\[[^\]]*\](?:<\d+>)?)?))'
+)
+
+
+def _tokenize_fetch_segments(segments: List[bytes]) -> Iterator:
+    """Zerlegt die Segmente einer FETCH-Antwort in Token.
+
+    Literale (``{n}``) werden von ``imaplib`` als eigenes Segment geliefert
+    und unverändert als ``bytes``-Token durchgereicht.
+    """
+    expect_literal = False
+    for segment in segments:
+        if expect_literal:
+            yield segment
+            expect_literal = False
+            continue
+
+        pos = 0
+        while pos < len(segment):
+            match = _IMAP_TOKEN_RE.match(segment, pos)
+            if not match or match.end() == pos:
+                if segment[pos:].strip():
+                    raise ValueError(f"Unerwartete IMAP-Antwort: {segment[pos:pos + 40]!r}")
+                break
+            pos = match.end()
+            if match.group('open'):
+                yield '('
+            elif match.group('close'):
+                yield ')'
+            elif match.group('quoted') is not None:
+                yield re.sub(rb'\\(.)', rb'\1', match.group('quoted'))
+            elif match.group('literal') is not None:
+                expect_literal = True
+            else:
+                atom = match.group('atom')
+                yield None if atom.upper() == b'NIL' else atom
+
+
+def _parse_tokens(tokens: Iterator) -> List:
+    """Baut aus einem Token-Strom verschachtelte Listen auf."""
+    stack: List[List] = [[]]
+    for token in tokens:
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) == 1:
+                raise ValueError("Unausgeglichene Klammern in IMAP-Antwort")
+            finished = stack.pop()
+            stack[-1].append(finished)
+        else:
+            stack[-1].append(token)
+    if len(stack) != 1:
+        raise ValueError("Unausgeglichene Klammern in IMAP-Antwort")
+    return stack[0]
+
+
+def _parse_fetch_response(data: List) -> Dict[bytes, Dict[bytes, object]]:
+    """Wandelt eine ``imaplib``-FETCH-Antwort in ein Dictionary je Nachricht um.
+
+    Returns:
+        Zuordnung von Sequenznummer zu den gelieferten Datenelementen,
+        z. B. ``{b'3': {b'BODYSTRUCTURE': [...], b'BODY[1]': b'...'}}``.
+    """
+    messages: List[List[bytes]] = []
+    for item in data:
+        if item is None:
+            continue
+        head = item[0] if isinstance(item, tuple) else item
+        if re.match(rb'\d+ \(', head):
+            messages.append([])
+        if not messages:
+            continue
+        if isinstance(item, tuple):
+            messages[-1].extend(item)
+        else:
+            messages[-1].append(item)
+
+    parsed: Dict[bytes, Dict[bytes, object]] = {}
+    for segments in messages:
+        seq, items = _parse_tokens(_tokenize_fetch_segments(segments))[:2]
+        parsed[seq] = {
+            items[i].upper(): items[i + 1] for i in range(0, len(items) - 1, 2)
+        }
+    return parsed
+
+
+def _header_bytes(items: Dict[bytes, object]) -> bytes:
+    """Liefert die angeforderten Kopfzeilen aus den FETCH-Daten einer Nachricht.
+
+    Server formatieren den Schlüssel unterschiedlich (z. B. mit Anführungszeichen
+    um die Feldnamen), daher wird nur das Präfix verglichen.
+    """
+    for key, value in items.items():
+        if key.startswith(b'BODY[HEADER'):
+            return value or b''
+    return b''
+
+
+def _text(value) -> str:
+    """Dekodiert ein IMAP-Atom oder einen String, ``NIL`` wird zu ``''``."""
+    return value.decode('utf-8', errors='replace') if isinstance(value, bytes) else ''
+
+
+def _params(value) -> Dict[str, str]:
+    """Wandelt eine IMAP-Parameterliste in ein Dictionary um."""
+    if not isinstance(value, list):
+        return {}
+    return {_text(value[i]).lower(): _text(value[i + 1]) for i in range(0, len(value) - 1, 2)}
+
+
+def _walk_bodystructure(structure: List, number: str = '') -> Iterator[Tuple[str, List]]:
+    """Liefert alle Blatt-Teile einer BODYSTRUCTURE mit ihrer Teilnummer."""
+    if structure and isinstance(structure[0], list):
+        # Multipart: Kind-Teile stehen vor dem Subtyp
+        for index, child in enumerate(structure, start=1):
+            if not isinstance(child, list):
+                break
+            yield from _walk_bodystructure(child, f"{number}.{index}" if number else str(index))
+    else:
+        yield number or '1', structure
+
+
+def _analyze_bodystructure(structure: List) -> Tuple[Optional[Dict[str, str]], List[str]]:
+    """Ermittelt den ersten Text-Teil und die Anhangsnamen einer Nachricht.
+
+    Returns:
+        Beschreibung des ``text/plain``-Teils (Teilnummer, Zeichensatz,
+        Transferkodierung) oder ``None`` sowie die Liste der Anhangsnamen.
+
+    Raises:
+        ValueError: Wenn ``structure`` keine gültige BODYSTRUCTURE ist.
+    """
+    if not isinstance(structure, list) or not structure:
+        raise ValueError("Ungültige BODYSTRUCTURE")
+    text_part = None
+    attachments = []
+    for number, part in _walk_bodystructure(structure):
+        main_type, sub_type = _text(part[0]).lower(), _text(part[1]).lower()
+        params = _params(part[2])
+
+        # Erweiterungsfelder folgen auf die Basisfelder und typspezifische Felder
+        extra = 1 if main_type == 'text' else 3 if (main_type, sub_type) == ('message', 'rfc822') else 0
+        disposition = part[8 + extra] if len(part) > 8 + extra else None
+        is_attachment = (
+            isinstance(disposition, list) and _text(disposition[0]).lower() == 'attachment'
+        )
+
+        if is_attachment:
+            disposition_params = _params(disposition[1]) if len(disposition) > 1 else {}
+            attachments.append(disposition_params.get('filename') or params.get('name'))
+        elif text_part is None and (main_type, sub_type) == ('text', 'plain'):
+            text_part = {
+                'number': number,
+                'charset': params.get('charset') or 'utf-8',
+                'encoding': _text(part[5]).lower(),
+            }
+    return text_part, attachments
+
+
+def _decode_header_value(value: Optional[str]) -> str:
+    """Dekodiert einen RFC-2047-kodierten Header-Wert vollständig."""
+    if not value:
+        return ''
+    try:
+        return str(make_header(decode_header(value)))
+    except Exception:
+        return value
+
+
+def _parse_rfc822(raw: bytes) -> Dict:
+    """Parst eine vollständige Nachricht (Rückfallweg ohne BODYSTRUCTURE)."""
+    message = email.message_from_bytes(raw)
+
+    body = ""
+    attachments = []
+    if message.is_multipart():
+        for part in message.walk():
+            if part.get_content_type() == "text/plain" and not body:
+                payload = part.get_payload(decode=True) or b''
+                body = payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
+            elif part.get_content_disposition() == 'attachment':
+                attachments.append(_decode_header_value(part.get_filename()))
+    else:
+        payload = message.get_payload(decode=True) or b''
+        body = payload.decode(message.get_content_charset() or 'utf-8', errors='replace')
+
+    return {
+        "subject": _decode_header_value(message["Subject"]),
+        "sender": _decode_header_value(message.get("From", "")),
+        "body": body,
+        "attachments": attachments
+    }
+
+
+def _decode_part(payload: bytes, encoding: str, charset: str) -> str:
+    """Dekodiert einen über ``BODY.PEEK[<teil>]`` geladenen MIME-Teil."""
+    if encoding == 'base64':
+        payload = base64.b64decode(payload)
+    elif encoding == 'quoted-printable':
+        payload = quopri.decodestring(payload)
+    try:
+        return payload.decode(charset, errors='replace')
+    except LookupError:
+        return payload.decode('utf-8', errors='replace')
+
 
 class GmailClient(EmailClientBase):
     def __init__(self, credentials_file: str = 'credentials.json'):
         self._imap = None
         self._credentials_file = credentials_file
-        self._token_file = 'token.pickle'
+        self._token_file = 'token.json'
+        self._legacy_token_file = 'token.pickle'
         self._creds = None
 
     @property
@@ -36,7 +254,9 @@ class GmailClient(EmailClientBase):
         """Gmail OAuth2 Authentifizierung"""
         if os.path.exists(self._token_file):
             with open(self._token_file, 'rb') as token:
-                self._creds = pickle.load(token)
+                self._creds = Credentials.from_authorized_user_info(loads(token.read()), SCOPES)
+        elif os.path.exists(self._legacy_token_file):
+            self._migrate_legacy_token()
 
         if not self._creds or not self._creds.valid:
             if self._creds and self._creds.expired and self._creds.refresh_token:
@@ -46,11 +266,28 @@ class GmailClient(EmailClientBase):
                     self._credentials_file, SCOPES)
                 self._creds = flow.run_local_server(port=0)
 
-            with open(self._token_file, 'wb') as token:
-                pickle.dump(self._creds, token)
+            self._save_credentials()
 
         return self._creds
 
+    def _save_credentials(self) -> None:
+        """Speichert die Zugangsdaten als JSON, nur für den Besitzer lesbar"""
+        fd = os.open(self._token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as token:
+            token.write(self._creds.to_json().encode('utf-8'))
+
+    def _migrate_legacy_token(self) -> None:
+        """Übernimmt einmalig ein altes ``token.pickle`` in ``token.json``"""
+        try:
+            with open(self._legacy_token_file, 'rb') as token:
+                self._creds = pickle.load(token)
+            self._save_credentials()
+            os.remove(self._legacy_token_file)
+            logging.info("Gmail-Token von token.pickle nach token.json migriert")
+        except Exception as e:
+            logging.warning(f"Altes Gmail-Token konnte nicht migriert werden: {str(e)}")
+            self._creds = None
+
     def connect(self) -> bool:
         if Credentials is None or InstalledAppFlow is None or Request is None:
             logging.error("Google API Bibliotheken nicht verfügbar. Gmail-Integration deaktiviert.")
@@ -78,33 +315,52 @@ class GmailClient(EmailClientBase):
             self._imap.select('INBOX')
             _, messages = self._imap.search(None, 'ALL')
             email_ids = messages[0].split()[-max_count:]
+            if not email_ids:
+                return []
 
-            emails = []
+            # Kopfzeilen und Struktur aller Nachrichten in einem Aufruf laden
+            _, data = self._imap.fetch(b','.join(email_ids).decode(), HEADER_FETCH_SPEC)
+            fetched = _parse_fetch_response(data)
+
+            structures = {}
+            parts_by_number: Dict[str, List[bytes]] = {}
             for email_id in email_ids:
-                _, msg = self._imap.fetch(email_id, '(RFC822)')
-                email_body = msg[0][1]
-                email_message = email.message_from_bytes(email_body)
+                try:
+                    text_part, attachments = _analyze_bodystructure(fetched[email_id][b'BODYSTRUCTURE'])
+                except Exception as e:
+                    logging.warning(f"BODYSTRUCTURE von Nachricht {email_id!r} nicht lesbar: {str(e)}")
+                    continue
+                structures[email_id] = (text_part, attachments)
+                if text_part:
+                    parts_by_number.setdefault(text_part['number'], []).append(email_id)
 
-                subject = decode_header(email_message["Subject"])[0][0]
-                if isinstance(subject, bytes):
-                    subject = subject.decode()
+            # Nur die benötigten Text-Teile laden, gebündelt je Teilnummer
+            bodies: Dict[bytes, bytes] = {}
+            for number, ids in parts_by_number.items():
+                _, data = self._imap.fetch(b','.join(ids).decode(), f'(BODY.PEEK[{number}])')
+                for email_id, items in _parse_fetch_response(data).items():
+                    bodies[email_id] = items.get(f'BODY[{number}]'.encode()) or b''
+
+            emails = []
+            header_parser = BytesHeaderParser()
+            for email_id in email_ids:
+                if email_id not in structures:
+                    # Rückfall: vollständige Nachricht laden und parsen
+                    _, data = self._imap.fetch(email_id.decode(), '(BODY.PEEK[])')
+                    emails.append(_parse_rfc822(data[0][1]))
+                    continue
 
-                sender = email_message.get("From", "")
+                headers = header_parser.parsebytes(_header_bytes(fetched.get(email_id, {})))
+                subject = _decode_header_value(headers["Subject"])
+                sender = _decode_header_value(headers.get("From", ""))
 
-                # E-Mail-Body extrahieren
+                text_part, attachments = structures[email_id]
+                attachments = [_decode_header_value(name) for name in attachments]
                 body = ""
-                attachments = []
-                if email_message.is_multipart():
-                    for part in email_message.walk():
-                        if part.get_content_type() == "text/plain":
-                            try:
-                                body = part.get_payload(decode=True).decode()
-                            except Exception:
-                                body = part.get_payload()
-                        elif part.get_content_disposition() == 'attachment':
-                            attachments.append(part.get_filename())
-                else:
-                    body = email_message.get_payload(decode=True).decode()
+                if text_part:
+                    body = _decode_part(
+                        bodies.get(email_id, b''), text_part['encoding'], text_part['charset']
+                    )
 
                 emails.append({
                     "subject": subject,
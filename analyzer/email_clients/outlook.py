@@ -15,6 +15,10 @@ except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
 
 from .base import EmailClientBase
 
+# MAPI-Eigenschaft PR_HASATTACH, da HasAttachments keine Table-Spalte ist
+PR_HASATTACH = "http://schemas.microsoft.com/mapi/proptag/0x0E1B000B"
+TABLE_COLUMNS = ("SenderEmailAddress", PR_HASATTACH)
+
 
 class OutlookClient(EmailClientBase):
     def __init__(self):
@@ -37,28 +41,38 @@ class OutlookClient(EmailClientBase):
             return False
 
     def get_emails(self, max_count: int = 20) -> List[Dict]:
+        """Liest die neuesten E-Mails über ein Outlook-``Table``-Objekt.
+
+        Die Tabelle liefert Betreff, Absender und Anhangs-Flag zeilenweise in
+        einem Aufruf. Nur der Body (in Tabellen auf 255 Zeichen gekürzt) und
+        vorhandene Anhänge werden über das einzelne Element gelesen.
+        """
         if not self._outlook:
             if not self.connect():
                 return []
 
         try:
             inbox = self._outlook.GetDefaultFolder(6)  # 6 = Inbox
-            messages = inbox.Items
-            messages.Sort("[ReceivedTime]", True)
+            table = inbox.GetTable()
+            for column in TABLE_COLUMNS:
+                table.Columns.Add(column)
+            table.Sort("[ReceivedTime]", True)
 
             emails = []
-            count = 0
-            for message in messages:
-                if count >= max_count:
-                    break
+            while not table.EndOfTable and len(emails) < max_count:
+                row = table.GetNextRow()
                 try:
+                    message = self._outlook.GetItemFromID(row.Item("EntryID"))
+                    attachments = []
+                    if row.Item(PR_HASATTACH):
+                        attachments = [att.FileName for att in message.Attachments]
+
                     emails.append({
-                        "subject": message.Subject,
-                        "sender": message.SenderEmailAddress,
+                        "subject": row.Item("Subject"),
+                        "sender": row.Item("SenderEmailAddress"),
                         "body": message.Body,
-                        "attachments": [att.FileName for att in message.Attachments]
+                        "attachments": attachments
                     })
-                    count += 1
                 except Exception as e:
                     logging.warning(f"Fehler beim Lesen einer E-Mail: {str(e)}")
 
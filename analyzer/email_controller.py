@@ -1,27 +1,85 @@
 """Controller for retrieving and analyzing emails."""
 
-from typing import List, Tuple, Dict
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bound for concurrent analyses of thread-safe analyzers
+MAX_ANALYSIS_WORKERS = 16
 
 
 class EmailController:
-    """Handle email fetching and analysis."""
+    """Handle email fetching and analysis.
+
+    Analyses run concurrently only for analyzers that declare
+    ``thread_safe = True`` or provide an ``analyze_email_async`` coroutine;
+    all other analyzers are called one email at a time.
+    """
+
+    __slots__ = ("_scanner", "_analyzer")
 
     def __init__(self, scanner, analyzer) -> None:
         self._scanner = scanner
         self._analyzer = analyzer
 
-    def fetch_emails(self, max_count: int) -> List[Tuple[Dict, Dict]]:
+    def fetch_emails(
+        self, max_count: int, progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Tuple[Dict, Dict]]:
         """Fetch emails and return analysis results.
 
         Args:
             max_count: Maximum number of emails to retrieve.
+            progress: Called as ``progress(done, total)`` in the calling thread
+                after each analysis, in email order.
 
         Returns:
             List[Tuple[Dict, Dict]]: Pairs of raw email data and analysis results.
         """
         emails = self._scanner.get_emails(max_count=max_count)
-        results: List[Tuple[Dict, Dict]] = []
-        for email in emails:
-            analysis = self._analyzer.analyze_email(email)
-            results.append((email, analysis))
+        return list(zip(emails, self._analyze_all(emails, progress)))
+
+    async def fetch_emails_async(self, max_count: int) -> List[Tuple[Dict, Dict]]:
+        """Fetch emails and analyze them without blocking the event loop.
+
+        Uses ``analyze_email_async`` of the analyzer together with
+        :func:`asyncio.gather` when available and otherwise runs the
+        synchronous analysis in the default executor.
+
+        Args:
+            max_count: Maximum number of emails to retrieve.
+
+        Returns:
+            List[Tuple[Dict, Dict]]: Pairs of raw email data and analysis results.
+        """
+        loop = asyncio.get_running_loop()
+        emails = await loop.run_in_executor(None, partial(self._scanner.get_emails, max_count=max_count))
+
+        analyze_async = getattr(self._analyzer, "analyze_email_async", None)
+        if analyze_async is not None:
+            analyses = await asyncio.gather(*(analyze_async(email) for email in emails))
+        else:
+            analyses = await loop.run_in_executor(None, self._analyze_all, emails)
+        return list(zip(emails, analyses))
+
+    def _analyze_all(
+        self, emails: List[Dict], progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict]:
+        """Analyze emails, overlapping calls for thread-safe analyzers."""
+        if len(emails) > 1 and getattr(self._analyzer, "thread_safe", False):
+            workers = min(MAX_ANALYSIS_WORKERS, len(emails))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return self._collect(executor.map(self._analyzer.analyze_email, emails), len(emails), progress)
+        return self._collect(map(self._analyzer.analyze_email, emails), len(emails), progress)
+
+    @staticmethod
+    def _collect(
+        analyses: Iterable[Dict], total: int, progress: Optional[Callable[[int, int], None]]
+    ) -> List[Dict]:
+        """Gather analyses in order and report progress after each one."""
+        results = []
+        for done, analysis in enumerate(analyses, start=1):
+            results.append(analysis)
+            if progress is not None:
+                progress(done, total)
         return results
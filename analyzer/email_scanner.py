@@ -4,12 +4,16 @@ Verwaltet die E-Mail-Client-Integrationen und den Scan-Prozess
 """
 import logging
 import configparser
-import re
+import os
 from contextlib import contextmanager
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
 from config import settings
-from .utils import extract_links
+from .domain_matcher import get_domain_matcher
+from .keyword_dfa import KeywordDFA, njit
+from .keyword_matcher import KeywordMatcher
+from .utils import iter_links
 from .email_clients.base import EmailClientBase
 from .email_clients.outlook import OutlookClient
 from .email_clients.gmail import GmailClient
@@ -21,19 +25,70 @@ SUSPICIOUS_KEYWORDS = tuple(
     for keywords in settings.SUSPICIOUS_KEYWORDS.values()
     for kw in keywords
 )
+# Als Tupel prüft ``str.endswith`` alle Endungen in einem einzigen C-Aufruf;
+# generierte ``or``-Ketten einzelner ``endswith``-Aufrufe wären langsamer
 SUSPICIOUS_EXTENSIONS = tuple(
     ext.lower()
     for exts in settings.SUSPICIOUS_EXTENSIONS.values()
     for ext in exts
 )
-SHORTENER_PATTERN = re.compile(r"(bit\.ly|tinyurl|goo\.gl|ow\.ly)", re.IGNORECASE)
-SUSPICIOUS_LINK_PATTERN = re.compile(r"(login|verify|secure|bank|konto)", re.IGNORECASE)
+# Alle Schlüsselwörter werden in einem einzigen Textdurchlauf gesucht; mit
+# Numba über einen kompilierten Byte-Automaten
+KEYWORD_MATCHER = (KeywordDFA if njit is not None else KeywordMatcher)(SUSPICIOUS_KEYWORDS)
+# Literale Teilstrings; ein ``in``-Test ist günstiger als ein Regex-Aufruf je Link
+DEFAULT_TRUSTED_DOMAINS = ("@ihrefirma.de", "@vertrauenswuerdig.de")
+SHORTENER_TOKENS = ("bit.ly", "tinyurl", "goo.gl", "ow.ly")
+SUSPICIOUS_LINK_TOKENS = ("login", "verify", "secure", "bank", "konto")
+
+
+@lru_cache(maxsize=8)
+def _parse_config(config_file: str, mtime_ns: Optional[int]) -> configparser.ConfigParser:
+    """Parst eine Konfigurationsdatei; der Änderungszeitpunkt dient als Cache-Schlüssel"""
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    return config
+
+
+def _load_config(config_file: str) -> configparser.ConfigParser:
+    """Liefert die geparste Konfiguration und liest sie nur nach Änderungen neu ein.
+
+    Das Ergebnis wird zwischen Scanner-Instanzen geteilt und darf nicht
+    verändert werden.
+    """
+    try:
+        mtime_ns = os.stat(config_file).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _parse_config(config_file, mtime_ns)
 
 
 class EmailScanner:
+    __slots__ = ("config_file", "config", "_client", "_client_settings")
+
     def __init__(self, config_file: str = "configuration.ini"):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file)
+        self.config_file = config_file
+        self.config = _load_config(config_file)
+        self._client: Optional[EmailClientBase] = None
+        self._client_settings: Optional[Tuple] = None
+
+    def _current_client_settings(self) -> Tuple:
+        """Liefert alle Einstellungen, von denen der konfigurierte Client abhängt"""
+        return (
+            self.config.get('EMAIL', 'client', fallback='outlook').lower(),
+            self.config.get('GMAIL', 'credentials_file', fallback='credentials.json'),
+            self.config.get('EXCHANGE', 'client_id', fallback=None),
+            self.config.get('EXCHANGE', 'tenant_id', fallback=None),
+            self.config.get('EXCHANGE', 'client_secret', fallback=None),
+        )
+
+    def _get_client(self) -> EmailClientBase:
+        """Liefert den Client und erzeugt ihn nur bei geänderter Konfiguration neu"""
+        self.config = _load_config(self.config_file)
+        settings_key = self._current_client_settings()
+        if self._client is None or settings_key != self._client_settings:
+            self._client = self._initialize_client()
+            self._client_settings = settings_key
+        return self._client
 
     def _initialize_client(self) -> EmailClientBase:
         """Initialisiert den konfigurierten E-Mail-Client"""
@@ -55,7 +110,7 @@ class EmailScanner:
     @contextmanager
     def _client_context(self) -> EmailClientBase:
         """Provide a connected mail client and ensure cleanup."""
-        client = self._initialize_client()
+        client = self._get_client()
         logging.info(f"Initialisiere {client.name} Client")
         if not client.connect():
             raise ConnectionError(f"Verbindung zu {client.name} fehlgeschlagen")
@@ -65,7 +120,11 @@ class EmailScanner:
             client.disconnect()
 
     def get_emails(self, max_count: int = 20) -> List[Dict]:
-        """Ruft E-Mails vom konfigurierten Client ab."""
+        """Ruft E-Mails vom konfigurierten Client ab.
+
+        Verbindungsfehler werden protokolliert und ergeben eine leere Liste;
+        andere Ausnahmen deuten auf Programmfehler hin und werden weitergereicht.
+        """
         try:
             with self._client_context() as client:
                 emails = client.get_emails(max_count)
@@ -75,8 +134,6 @@ class EmailScanner:
                 return emails
         except ConnectionError as exc:
             logging.error(f"Verbindungsfehler: {exc}")
-        except Exception as exc:  # Fallback for unerwartete Fehler
-            logging.error(f"Fehler beim Abrufen der E-Mails: {exc}")
         return []
 
 
@@ -103,35 +160,66 @@ def scan_email(email, trusted_domains=None):
         - Unknown or external senders.
     """
     if trusted_domains is None:
-        trusted_domains = ["@ihrefirma.de", "@vertrauenswuerdig.de"]
+        trusted_domains = DEFAULT_TRUSTED_DOMAINS
+
+    found = KEYWORD_MATCHER.find(_keyword_text(email))
+    return _evaluate_email(email, found, trusted_domains)
+
 
-    subject = email.get("subject") or ""
+def scan_emails(emails: List[Dict], trusted_domains=None) -> List[Tuple[str, List[str]]]:
+    """Bewertet mehrere E-Mails wie :func:`scan_email`.
+
+    Die Schlüsselwortsuche läuft für alle E-Mails in einem einzigen Durchlauf
+    des Automaten; Links, Anhänge und Absender werden je E-Mail geprüft.
+
+    Args:
+        emails (list[dict]): E-Mail-Daten wie bei :func:`scan_email`.
+        trusted_domains (list[str], optional): Vertrauenswürdige Domains.
+
+    Returns:
+        list[tuple[str, list[str]]]: Risikostufe und Befunde je E-Mail.
+    """
+    if trusted_domains is None:
+        trusted_domains = DEFAULT_TRUSTED_DOMAINS
+
+    found_per_email = KEYWORD_MATCHER.find_many([_keyword_text(email) for email in emails])
+    return [
+        _evaluate_email(email, found, trusted_domains)
+        for email, found in zip(emails, found_per_email)
+    ]
+
+
+def _keyword_text(email: Dict) -> str:
+    """Betreff und Body in Kleinschreibung für die Schlüsselwortsuche"""
+    return f"{(email.get('subject') or '').lower()}\n{(email.get('body') or '').lower()}"
+
+
+def _evaluate_email(email: Dict, found: Set[str], trusted_domains) -> Tuple[str, List[str]]:
+    """Ermittelt Befunde und Risikostufe aus den gefundenen Schlüsselwörtern"""
     body = email.get("body") or ""
     sender = email.get("sender") or ""
-
-    subject_lower = subject.lower()
-    body_lower = body.lower()
     issues: List[str] = []
 
-    # Check for suspicious keywords in subject and body
-    for keyword in SUSPICIOUS_KEYWORDS:
-        if keyword in subject_lower or keyword in body_lower:
+    # Report keywords found in subject and body in configured order
+    for keyword in KEYWORD_MATCHER.keywords:
+        if keyword in found:
             issues.append(f"Verdächtiges Schlüsselwort gefunden: '{keyword}'")
 
     # Check for suspicious links
-    for link in extract_links(body):
-        if SHORTENER_PATTERN.search(link):
+    for link in iter_links(body):
+        link_lower = link.lower()
+        if any(token in link_lower for token in SHORTENER_TOKENS):
             issues.append(f"Verdächtiger Kurzlink gefunden: {link}")
-        if SUSPICIOUS_LINK_PATTERN.search(link):
+        if any(token in link_lower for token in SUSPICIOUS_LINK_TOKENS):
             issues.append(f"Verdächtiger Link gefunden: {link}")
 
     # Check for suspicious attachments
     for att in email.get("attachments", []):
-        if any(att.lower().endswith(ext) for ext in SUSPICIOUS_EXTENSIONS):
+        if att.lower().endswith(SUSPICIOUS_EXTENSIONS):
             issues.append(f"Verdächtiger Anhang: {att}")
 
     # Check for unknown sender (simple heuristic)
-    if not any(sender.endswith(domain) for domain in trusted_domains):
+    if not get_domain_matcher(tuple(trusted_domains)).matches(sender):
         issues.append(f"Unbekannter oder externer Absender: {sender}")
 
     # Determine risk level
@@ -169,28 +257,21 @@ def scan_inbox(max_count: int = 20, trusted_domains=None):
         List[Dict]: Eine Liste mit Ergebnissen pro E-Mail.
     """
     emails = get_outlook_emails(max_count=max_count)
-    results = []
-    for email in emails:
-        risk, issues = scan_email(email, trusted_domains=trusted_domains)
-        results.append({
+    return [
+        {
             "subject": email["subject"],
             "sender": email["sender"],
             "risk": risk,
             "issues": issues,
-        })
-    return results
-
-
-# Globale Instanz für einfachen Zugriff
-_scanner = None
+        }
+        for email, (risk, issues) in zip(emails, scan_emails(emails, trusted_domains=trusted_domains))
+    ]
 
 
-def get_scanner() -> EmailScanner:
-    """Singleton-Zugriff auf den E-Mail-Scanner"""
-    global _scanner
-    if not _scanner:
-        _scanner = EmailScanner()
-    return _scanner
+@lru_cache(maxsize=1)
+def get_scanner(config_file: str = "configuration.ini") -> EmailScanner:
+    """Singleton-Zugriff auf den E-Mail-Scanner je Konfigurationsdatei"""
+    return EmailScanner(config_file)
 
 
 def get_outlook_emails(max_count: int = 20) -> List[Dict]:
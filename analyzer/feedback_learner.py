@@ -2,16 +2,78 @@
 Feedback Learning System
 Lernt automatisch aus Benutzerinteraktionen und passt die Analyse entsprechend an
 """
+import copy
 import os
-import json
 import logging
-from typing import Dict, List
-
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
-import joblib
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.special import expit
+from sklearn.exceptions import NotFittedError
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.utils.validation import check_is_fitted
 from datetime import datetime
 
+from .hashing import fast_digest
+from .model_store import dump_atomic, flush_at_exit, load_shared
+from .serialization import dumps, loads
+
+# Nach so vielen Einträgen wird das Feedback-Log kompakt neu geschrieben
+FEEDBACK_COMPACTION_INTERVAL = 10000
+# Anzahl gehashter Merkmale für Betreff und Absender (dünn besetzte Eingaben)
+FEEDBACK_HASH_FEATURES = 2 ** 14
+# Anzahl gehashter Merkmale für die Absender-Domain
+FEEDBACK_DOMAIN_FEATURES = 2 ** 8
+# Numerische Metadaten je E-Mail, siehe ``FeedbackLearner._extract_feature_vector``
+FEEDBACK_NUMERIC_FEATURES = 5
+# Spalten mit Längen und Anzahlen, die logarithmisch skaliert werden
+_LOG_SCALED_COLUMNS = [0, 1, 3, 4]
+FEEDBACK_N_FEATURES = FEEDBACK_HASH_FEATURES + FEEDBACK_NUMERIC_FEATURES + FEEDBACK_DOMAIN_FEATURES
+# Alle so vielen Einträge wird das Modell vollständig über alle Daten trainiert
+FEEDBACK_FULL_RETRAIN_INTERVAL = 1000
+# Nachtrainierte Modelle werden nur nach so vielen inkrementellen Trainings gespeichert
+FEEDBACK_SAVE_INTERVAL = 10
+FEEDBACK_CLASSES = np.array([0, 1])
+# Maximale Anzahl zwischengespeicherter Modellvorhersagen
+FEEDBACK_PREDICTION_CACHE_SIZE = 8192
+
+
+def _new_feedback_vectorizer() -> HashingVectorizer:
+    """Erzeugt den zustandslosen Vectorizer für das Feedback-Modell"""
+    return HashingVectorizer(n_features=FEEDBACK_HASH_FEATURES, alternate_sign=False, dtype=np.float32)
+
+
+def _new_feedback_model() -> SGDClassifier:
+    """Erzeugt ein inkrementell trainierbares Feedback-Modell"""
+    return SGDClassifier(loss="log_loss", random_state=42)
+
+
+def _is_fitted(estimator) -> bool:
+    """Prüft, ob ein Estimator bereits trainiert wurde"""
+    try:
+        check_is_fitted(estimator)
+        return True
+    except NotFittedError:
+        return False
+
+
+def _predict_proba(model, X) -> np.ndarray:
+    """Klassenwahrscheinlichkeiten für eine dünn besetzte Merkmalsmatrix.
+
+    Für das binäre logistische SGD-Modell wird die Entscheidungsfunktion
+    direkt als Skalarprodukt berechnet; das spart die Eingabeprüfung von
+    ``predict_proba``, die bei einzelnen E-Mails die Laufzeit dominiert.
+    Andere Modelle werden regulär befragt.
+    """
+    if isinstance(model, SGDClassifier) and model.loss == "log_loss" and model.coef_.shape[0] == 1:
+        positive = expit(X @ model.coef_[0] + model.intercept_[0])
+        return np.column_stack((1.0 - positive, positive))
+    return model.predict_proba(X)
+
 
 class FeedbackLearner:
     def __init__(
@@ -34,16 +96,33 @@ class FeedbackLearner:
             high_confidence_threshold: Schwelle für das Hinzufügen eines Indikators.
         """
         self.model_dir = model_dir
-        self.feedback_file = os.path.join(model_dir, "feedback_data.json")
+        self.feedback_file = os.path.join(model_dir, "feedback_data.jsonl")
+        self.legacy_feedback_file = os.path.join(model_dir, "feedback_data.json")
         self.model_file = os.path.join(model_dir, "feedback_model.joblib")
-        self.vectorizer_file = os.path.join(model_dir, "feedback_vectorizer.joblib")
         self.version_file = os.path.join(model_dir, "feedback_model.version")
 
         os.makedirs(model_dir, exist_ok=True)
 
-        self.feedback_data = self._load_feedback_data()
+        # Die Historie bleibt auf der Platte und wird bei Bedarf gestreamt;
+        # im Speicher liegen nur laufende Zähler und die noch nicht gelernten Einträge
+        self._migrate_legacy_feedback()
+        self._feedback_count = 0
+        self._correct_count = 0
+        self._category_counts: Counter = Counter()
+        self._count_feedback()
+        self._pending_feedback: List[Dict] = []
+        # Aus dem Cache geladene Modelle werden geteilt und vor Änderungen kopiert
+        self._model_shared = False
         self.model = self._load_model()
-        self.vectorizer = self._load_vectorizer()
+        # Inkrementelle Trainings seit dem letzten Speichern; Rest wird beim Beenden geschrieben
+        self._unsaved_retrains = 0
+        flush_at_exit(self.flush)
+        # Klassenwahrscheinlichkeiten je Merkmalsschlüssel; gilt nur für ``_prediction_model``
+        self._prediction_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._prediction_model = None
+        # Hashing benötigt kein Training und keinen gespeicherten Zustand
+        self.vectorizer = _new_feedback_vectorizer()
+        self.domain_hasher = FeatureHasher(n_features=FEEDBACK_DOMAIN_FEATURES, input_type="string", dtype=np.float32)
 
         # Schwellenwerte für Modellanpassung
         self.min_feedback_samples = 50
@@ -72,6 +151,7 @@ class FeedbackLearner:
                 "subject": email_data.get("subject", ""),
                 "sender": email_data.get("sender", ""),
                 "has_attachments": bool(email_data.get("attachments", [])),
+                "attachment_count": len(email_data.get("attachments", [])),
                 "body_length": len(email_data.get("body", "")),
             },
             "analysis": {
@@ -79,177 +159,346 @@ class FeedbackLearner:
                 "level": analysis_result.get("level", "LOW"),
                 "indicators": analysis_result.get("indicators", [])
             },
-            "user_feedback": user_feedback
+            "user_feedback": user_feedback,
+            # Einmal berechnet, damit das Neutraining die Historie nicht erneut aufbereitet
+            "feature_text": self._extract_features(email_data),
         }
 
-        self.feedback_data.append(feedback_entry)
-        self._save_feedback_data()
+        self._append_feedback(feedback_entry)
+        self._feedback_count += 1
+        self._correct_count += bool(user_feedback.get("is_correct"))
+        self._category_counts[user_feedback.get("correct_category")] += 1
+        self._pending_feedback.append(feedback_entry)
+        if self._feedback_count % FEEDBACK_COMPACTION_INTERVAL == 0:
+            self._save_feedback_data(self._iter_feedback())
 
         # Prüfe ob Neutraining erforderlich
-        if len(self.feedback_data) >= self.min_feedback_samples and \
-           len(self.feedback_data) % self.retraining_threshold == 0:
-            self._retrain_model()
+        if self._feedback_count >= self.min_feedback_samples and \
+           self._feedback_count % self.retraining_threshold == 0:
+            self._retrain_model(force=self._feedback_count % FEEDBACK_FULL_RETRAIN_INTERVAL == 0)
+
+    @property
+    def feedback_data(self) -> List[Dict]:
+        """Alle gespeicherten Feedback-Einträge; liest das gesamte Log ein"""
+        return list(self._iter_feedback())
 
     def adjust_analysis(self, email_data: Dict, preliminary_analysis: Dict) -> Dict:
         """Passt die Analyse basierend auf gelerntem Feedback an"""
-        if not self.model or not self.vectorizer:
-            return preliminary_analysis
+        return self.adjust_analysis_batch([(email_data, preliminary_analysis)])[0]
+
+    def adjust_analysis_batch(self, items: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """Passt mehrere Analysen mit einem Modellaufruf an.
+
+        Vectorizer und Modell werden einmal über alle noch nicht
+        zwischengespeicherten E-Mails ausgeführt; wiederkehrende E-Mails mit
+        gleichen Merkmalen werden aus dem Cache bedient. Die Gewichtung der
+        Scores erfolgt vektorisiert.
+
+        Args:
+            items: Paare aus E-Mail-Daten und vorläufiger Analyse.
+
+        Returns:
+            Die (gegebenenfalls angepassten) Analysen in Eingabereihenfolge.
+        """
+        analyses = [analysis for _, analysis in items]
+        if not items or self.model is None or self.vectorizer is None:
+            return analyses
 
         try:
-            # Feature-Extraktion
-            features = self._extract_features(email_data)
-            X = self.vectorizer.transform([features])
-
-            # Vorhersage
-            feedback_score = self.model.predict_proba(X)[0]
-            confidence = max(feedback_score)
-
-            # Wenn Konfidenz hoch genug, passe Analyse an
-            if confidence > self.confidence_threshold:
-                adjusted_score = (
-                    preliminary_analysis["score"] * self.original_weight +
-                    feedback_score[1] * self.feedback_scale * self.feedback_weight
-                )
-
-                preliminary_analysis["score"] = min(10.0, adjusted_score)
-                preliminary_analysis["feedback_confidence"] = confidence
-
-                if confidence > self.high_confidence_threshold:
-                    preliminary_analysis["indicators"].append(
+            feedback_scores = self._predict_cached([email for email, _ in items])
+            confidences = feedback_scores.max(axis=1)
+
+            scores = np.fromiter(
+                (analysis.get("score", 0.0) for analysis in analyses), dtype=np.float64, count=len(analyses)
+            )
+            adjusted_scores = np.minimum(
+                10.0,
+                scores * self.original_weight +
+                feedback_scores[:, 1] * self.feedback_scale * self.feedback_weight
+            )
+
+            # Nur Analysen mit ausreichender Konfidenz anpassen
+            for i in np.flatnonzero(confidences > self.confidence_threshold):
+                analysis = analyses[i]
+                analysis["score"] = float(adjusted_scores[i])
+                analysis["feedback_confidence"] = float(confidences[i])
+
+                if confidences[i] > self.high_confidence_threshold:
+                    analysis["indicators"].append(
                         "Anpassung basierend auf Unternehmensfeedback"
                     )
 
-            return preliminary_analysis
+            return analyses
 
         except Exception as e:
             logging.error(f"Fehler bei der Feedback-basierten Anpassung: {str(e)}")
-            return preliminary_analysis
+            return analyses
 
-    def get_learning_stats(self) -> Dict:
-        """Liefert Statistiken über das Lernverhalten"""
-        if not self.feedback_data:
-            return {"error": "Keine Feedback-Daten verfügbar"}
+    def _predict_cached(self, emails: List[Dict]) -> np.ndarray:
+        """Liefert Klassenwahrscheinlichkeiten und nutzt den Vorhersage-Cache.
 
-        total_samples = len(self.feedback_data)
-        correct_predictions = sum(
-            1 for entry in self.feedback_data
-            if entry["user_feedback"]["is_correct"]
+        Nicht zwischengespeicherte E-Mails werden gemeinsam vektorisiert und
+        mit einem Modellaufruf bewertet. Der Cache wird verworfen, sobald ein
+        anderes Modell aktiv ist oder das Modell nachtrainiert wurde.
+        """
+        if self._prediction_model is not self.model:
+            self._prediction_cache.clear()
+            self._prediction_model = self.model
+
+        cache = self._prediction_cache
+        keys = [self._prediction_cache_key(email) for email in emails]
+        rows = [cache.get(key) for key in keys]
+
+        # Feature-Extraktion und Vorhersage für alle fehlenden E-Mails gemeinsam
+        missing = {}
+        for i, (key, row) in enumerate(zip(keys, rows)):
+            if row is None:
+                missing.setdefault(key, i)
+            else:
+                cache.move_to_end(key)
+        if missing:
+            pending = [emails[i] for i in missing.values()]
+            X = self._feature_matrix(pending, [self._extract_features(email) for email in pending])
+            computed = dict(zip(missing, _predict_proba(self.model, X)))
+            rows = [computed[key] if row is None else row for key, row in zip(keys, rows)]
+            cache.update(computed)
+            while len(cache) > FEEDBACK_PREDICTION_CACHE_SIZE:
+                cache.popitem(last=False)
+        return np.array(rows)
+
+    @staticmethod
+    def _prediction_cache_key(email_data: Dict) -> bytes:
+        """Bildet den Cache-Schlüssel aus allen Eingaben der Merkmalsextraktion"""
+        fields = (
+            email_data.get("subject") or "",
+            email_data.get("sender") or "",
+            email_data.get("body_length", len(email_data.get("body") or "")),
+            email_data.get("attachment_count", len(email_data.get("attachments") or [])),
+            bool(email_data.get("has_attachments", bool(email_data.get("attachments")))),
         )
+        return fast_digest("\x1f".join(str(field) for field in fields).encode("utf-8", "surrogatepass"))
 
-        categories = {}
-        for entry in self.feedback_data:
-            cat = entry["user_feedback"]["correct_category"]
-            categories[cat] = categories.get(cat, 0) + 1
+    def get_learning_stats(self) -> Dict:
+        """Liefert Statistiken über das Lernverhalten aus den laufenden Zählern"""
+        if not self._feedback_count:
+            return {"error": "Keine Feedback-Daten verfügbar"}
 
         return {
-            "total_samples": total_samples,
-            "accuracy": correct_predictions / total_samples,
-            "category_distribution": categories,
+            "total_samples": self._feedback_count,
+            "accuracy": self._correct_count / self._feedback_count,
+            "category_distribution": dict(self._category_counts),
             "last_retrain": self._get_last_retrain_date(),
             "model_version": self._get_model_version()
         }
 
     def _extract_features(self, email_data: Dict) -> str:
-        """Extrahiert Features für das Feedback-Modell"""
-        features = []
+        """Extrahiert den Text (Betreff und Absender) für das Feedback-Modell"""
+        return f"{email_data.get('subject', '')} {email_data.get('sender', '')}"
 
-        # Kombiniere relevante E-Mail-Eigenschaften
-        features.append(email_data.get("subject", ""))
-        features.append(email_data.get("sender", ""))
+    @staticmethod
+    def _extract_feature_vector(email_data: Dict) -> np.ndarray:
+        """Bildet die numerischen Metadaten einer E-Mail als Zeilenvektor.
 
-        # Füge Metadaten hinzu
-        attachments = email_data.get("attachments", [])
-        features.append(f"has_attachments_{bool(attachments)}")
-        features.append(f"attachment_count_{len(attachments)}")
+        Siehe :meth:`_extract_feature_matrix`.
+        """
+        return FeedbackLearner._extract_feature_matrix([email_data])[0]
+
+    @staticmethod
+    def _extract_feature_matrix(records: List[Dict]) -> np.ndarray:
+        """Bildet die numerischen Metadaten mehrerer E-Mails als Matrix.
 
-        # Extrahiere Domain
-        if "@" in email_data.get("sender", ""):
-            features.append(f"domain_{email_data['sender'].split('@')[1]}")
+        Akzeptiert sowohl vollständige E-Mail-Daten als auch die im Feedback
+        gespeicherte Zusammenfassung. Je E-Mail werden nur die Rohwerte
+        gesammelt; die logarithmische Skalierung von Längen und Anzahlen
+        erfolgt anschließend in einem Schritt für alle Zeilen.
 
-        return " ".join(features)
+        Returns:
+            ``float32``-Matrix mit den Spalten Body-Länge, Anhangsanzahl,
+            Anhang-Flag, Betreff- und Absenderlänge.
+        """
+        features = np.array([
+            (
+                record.get("body_length", len(record.get("body") or "")),
+                record.get("attachment_count", len(record.get("attachments") or [])),
+                record.get("has_attachments", bool(record.get("attachments"))),
+                len(record.get("subject") or ""),
+                len(record.get("sender") or ""),
+            )
+            for record in records
+        ], dtype=np.float32).reshape(-1, FEEDBACK_NUMERIC_FEATURES)
+        features[:, _LOG_SCALED_COLUMNS] = np.log1p(features[:, _LOG_SCALED_COLUMNS])
+        return features
+
+    @staticmethod
+    def _sender_domain(email_data: Dict) -> List[str]:
+        """Liefert die Absender-Domain als Token-Liste für den FeatureHasher"""
+        sender = email_data.get("sender") or ""
+        return [sender.split("@")[1]] if "@" in sender else []
+
+    def _retrain_model(self, force: bool = False) -> None:
+        """Trainiert das Feedback-Modell nach.
+
+        Regulär werden nur die seit dem letzten Training hinzugekommenen
+        Einträge per ``partial_fit`` gelernt. Ein vollständiges Training über
+        alle Daten erfolgt mit ``force=True`` sowie, solange noch kein
+        trainiertes Modell vorliegt; die Historie wird dabei aus dem Log
+        gestreamt, und es werden nur die benötigten Spalten behalten.
 
-    def _retrain_model(self) -> None:
-        """Trainiert das Feedback-Modell neu"""
+        Args:
+            force: Modell über alle Feedback-Daten neu trainieren.
+        """
         try:
+            full = force or not _is_fitted(self.model)
+            if not full and not self._pending_feedback:
+                return
+            entries = self._iter_feedback() if full else self._pending_feedback
+
             # Bereite Trainingsdaten vor
-            X_text = [
-                self._extract_features(entry["email_data"])
-                for entry in self.feedback_data
-            ]
-
-            y = [
-                1 if entry["user_feedback"]["is_correct"] else 0
-                for entry in self.feedback_data
-            ]
-
-            # Trainiere Vectorizer und Modell
-            self.vectorizer = TfidfVectorizer(max_features=1000)
-            X = self.vectorizer.fit_transform(X_text)
-
-            self.model = GradientBoostingClassifier(
-                n_estimators=100,
-                learning_rate=0.1,
-                random_state=42
+            records, X_text, y = [], [], []
+            for entry in entries:
+                records.append(entry["email_data"])
+                X_text.append(entry.get("feature_text") or self._extract_features(entry["email_data"]))
+                y.append(1 if entry["user_feedback"]["is_correct"] else 0)
+
+            # Trainiere Modell; der Hashing-Vectorizer benötigt kein Fitting
+            if full:
+                self.model = _new_feedback_model()
+                self._model_shared = False
+                self.model.fit(self._feature_matrix(records, X_text), y)
+            else:
+                if self._model_shared:
+                    self.model = copy.deepcopy(self.model)
+                    self._model_shared = False
+                self.model.partial_fit(self._feature_matrix(records, X_text), y, classes=FEEDBACK_CLASSES)
+
+            self._pending_feedback = []
+            self._prediction_cache.clear()
+
+            # Speichere Modelle; nach inkrementellen Trainings nur gebündelt
+            self._unsaved_retrains += 1
+            if full or self._unsaved_retrains >= FEEDBACK_SAVE_INTERVAL:
+                self._save_models()
+            logging.info(
+                "Feedback-Modell erfolgreich neu trainiert" if full else
+                f"Feedback-Modell mit {len(y)} neuen Einträgen nachtrainiert"
             )
-            self.model.fit(X, y)
-
-            # Speichere Modelle
-            self._save_models()
-            logging.info("Feedback-Modell erfolgreich neu trainiert")
 
         except Exception as e:
             logging.error(f"Fehler beim Neutraining des Feedback-Modells: {str(e)}")
 
-    def _load_feedback_data(self) -> List:
-        """Lädt gespeicherte Feedback-Daten"""
+    def _iter_feedback(self) -> Iterator[Dict]:
+        """Liest die gespeicherten Feedback-Einträge zeilenweise.
+
+        Unvollständige Zeilen, etwa nach einem Abbruch beim Schreiben, werden
+        übersprungen.
+        """
+        try:
+            with open(self.feedback_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = loads(line)
+                    except ValueError:
+                        logging.warning("Unvollständiger Eintrag im Feedback-Log übersprungen")
+                        continue
+                    yield entry
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.error(f"Fehler beim Laden der Feedback-Daten: {str(e)}")
+
+    def _count_feedback(self) -> None:
+        """Initialisiert die Zähler für :meth:`get_learning_stats` in einem Durchlauf"""
+        total = correct = 0
+        categories = self._category_counts
+        for entry in self._iter_feedback():
+            user_feedback = entry.get("user_feedback", {})
+            total += 1
+            correct += bool(user_feedback.get("is_correct"))
+            categories[user_feedback.get("correct_category")] += 1
+        self._feedback_count = total
+        self._correct_count = correct
+
+    def _migrate_legacy_feedback(self) -> None:
+        """Übernimmt eine ``feedback_data.json`` älterer Versionen einmalig ins JSONL-Log"""
+        if os.path.exists(self.feedback_file) or not os.path.exists(self.legacy_feedback_file):
+            return
         try:
-            if os.path.exists(self.feedback_file):
-                with open(self.feedback_file, 'r') as f:
-                    return json.load(f)
-            return []
+            with open(self.legacy_feedback_file, 'rb') as f:
+                self._save_feedback_data(loads(f.read()))
         except Exception as e:
             logging.error(f"Fehler beim Laden der Feedback-Daten: {str(e)}")
-            return []
 
-    def _save_feedback_data(self) -> None:
-        """Speichert Feedback-Daten"""
+    def _append_feedback(self, entry: Dict) -> None:
+        """Hängt einen Feedback-Eintrag als JSON-Zeile an das Log an"""
+        try:
+            with open(self.feedback_file, 'ab') as f:
+                f.write(dumps(entry) + b"\n")
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern der Feedback-Daten: {str(e)}")
+
+    def _save_feedback_data(self, entries: Iterable[Dict]) -> None:
+        """Schreibt alle Feedback-Daten kompakt und atomar neu"""
         try:
-            with open(self.feedback_file, 'w') as f:
-                json.dump(self.feedback_data, f, indent=2)
+            tmp_file = f"{self.feedback_file}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.writelines(dumps(entry) + b"\n" for entry in entries)
+            os.replace(tmp_file, self.feedback_file)
         except Exception as e:
             logging.error(f"Fehler beim Speichern der Feedback-Daten: {str(e)}")
 
     def _load_model(self):
-        """Lädt das gespeicherte Feedback-Modell"""
+        """Lädt das gespeicherte Feedback-Modell.
+
+        Modelle früherer Versionen, die nicht inkrementell trainierbar sind,
+        eine andere Merkmalsanzahl erwarten oder mit ``float64``-Merkmalen
+        trainiert wurden, werden verworfen. ``partial_fit`` lehnt
+        ``float32``-Merkmale für ``float64``-Koeffizienten ab; erst ab
+        scikit-learn 1.3 behalten SGD-Modelle ``float32``-Koeffizienten.
+        """
         try:
             if os.path.exists(self.model_file):
-                return joblib.load(self.model_file)
-            return GradientBoostingClassifier(
-                n_estimators=100,
-                learning_rate=0.1,
-                random_state=42
-            )
+                model = load_shared(self.model_file)
+                if hasattr(model, "partial_fit") and \
+                   getattr(model, "n_features_in_", FEEDBACK_N_FEATURES) == FEEDBACK_N_FEATURES and \
+                   getattr(model, "coef_", np.empty(0, dtype=np.float32)).dtype == np.float32:
+                    self._model_shared = True
+                    return model
+                logging.warning("Inkompatibles Feedback-Modell verworfen, Neutraining erforderlich")
+            return _new_feedback_model()
         except Exception as e:
             logging.error(f"Fehler beim Laden des Feedback-Modells: {str(e)}")
             return None
 
-    def _load_vectorizer(self):
-        """Lädt den gespeicherten Vectorizer"""
-        try:
-            if os.path.exists(self.vectorizer_file):
-                return joblib.load(self.vectorizer_file)
-            return TfidfVectorizer(max_features=1000)
-        except Exception as e:
-            logging.error(f"Fehler beim Laden des Vectorizers: {str(e)}")
-            return None
+    def _feature_matrix(self, records: List[Dict], texts: List[str]) -> sparse.csr_matrix:
+        """Kombiniert Text-, Metadaten- und Domain-Merkmale zu einer Matrix.
+
+        Args:
+            records: E-Mail-Daten oder gespeicherte Zusammenfassungen.
+            texts: Zugehörige Texte aus :meth:`_extract_features`.
+
+        Returns:
+            Dünn besetzte ``float32``-Matrix mit ``FEEDBACK_N_FEATURES`` Spalten.
+        """
+        return sparse.hstack([
+            self.vectorizer.transform(texts),
+            sparse.csr_matrix(self._extract_feature_matrix(records)),
+            self.domain_hasher.transform(self._sender_domain(record) for record in records),
+        ], format="csr")
+
+    def flush(self) -> None:
+        """Speichert ein nachtrainiertes, noch nicht geschriebenes Modell"""
+        if self._unsaved_retrains:
+            self._save_models()
 
     def _save_models(self) -> None:
-        """Speichert Modell, Vectorizer und Version"""
+        """Speichert Modell und Version"""
         try:
-            joblib.dump(self.model, self.model_file)
-            joblib.dump(self.vectorizer, self.vectorizer_file)
+            dump_atomic(self.model, self.model_file)
             with open(self.version_file, "w", encoding="utf-8") as version_file:
                 version_file.write(datetime.now().isoformat())
+            self._unsaved_retrains = 0
         except Exception as e:
             logging.error(f"Fehler beim Speichern der Modelle: {str(e)}")
 
@@ -0,0 +1,27 @@
+"""Schnelle, nicht-kryptographische Prüfsummen für Caches und Änderungserkennung.
+
+Nutzt ``xxhash`` (XXH3), sofern verfügbar, und andernfalls ``hashlib.blake2b``
+mit gekürztem Digest. Die Werte dienen ausschließlich als Schlüssel innerhalb
+eines Prozesses bzw. zum Vergleich mit zuvor berechneten Werten und dürfen
+nicht für Sicherheitszwecke verwendet werden.
+"""
+import hashlib
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    import xxhash
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    xxhash = None
+
+
+def fast_digest(data: bytes) -> bytes:
+    """Berechnet eine 8 Byte lange Prüfsumme über ``data``.
+
+    Args:
+        data: Zu hashende Daten.
+
+    Returns:
+        Digest als ``bytes``.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).digest()
+    return hashlib.blake2b(data, digest_size=8).digest()
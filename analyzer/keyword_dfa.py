@@ -0,0 +1,159 @@
+"""Schlüsselwortsuche als kompilierter Aho-Corasick-DFA über UTF-8-Bytes.
+
+Die Schlüsselwörter werden in eine dichte Übergangstabelle übersetzt, deren
+Fehlerübergänge bereits eingefaltet sind. Spalten gibt es nur für Bytes, die in
+einem Schlüsselwort vorkommen, plus eine gemeinsame Spalte für alle übrigen
+(Byte-Klassen); zusammen mit ``int16``-Zuständen bleibt die Tabelle für
+übliche Schlüsselwortlisten klein genug für den L1/L2-Cache.
+Der Suchkern arbeitet nur mit NumPy-Arrays und wird mit ``numba.njit``
+kompiliert, sofern Numba verfügbar ist. Da UTF-8 selbstsynchronisierend ist,
+entspricht ein Treffer auf Byte-Ebene genau einem Teilstring-Treffer im Text.
+"""
+from collections import deque
+from typing import Iterable, List, Sequence, Set
+
+import numpy as np
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    from numba import njit
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    njit = None
+
+
+def _scan_bytes_kernel(data, byte_classes, transitions, out_offsets, out_ids, n_keywords):
+    """Durchläuft ``data`` einmal und markiert alle gefundenen Schlüsselwort-IDs"""
+    found = np.zeros(n_keywords, dtype=np.bool_)
+    state = 0
+    for i in range(data.shape[0]):
+        state = transitions[state, byte_classes[data[i]]]
+        for j in range(out_offsets[state], out_offsets[state + 1]):
+            found[out_ids[j]] = True
+    return found
+
+
+def _scan_batch_kernel(data, ends, byte_classes, transitions, out_offsets, out_ids, n_keywords):
+    """Durchläuft mehrere hintereinanderliegende Texte und markiert Treffer je Text
+
+    ``ends[k]`` ist das exklusive Byte-Ende des ``k``-ten Textes; der Zustand
+    wird an jeder Grenze zurückgesetzt.
+    """
+    found = np.zeros((ends.shape[0], n_keywords), dtype=np.bool_)
+    start = 0
+    for k in range(ends.shape[0]):
+        state = 0
+        for i in range(start, ends[k]):
+            state = transitions[state, byte_classes[data[i]]]
+            for j in range(out_offsets[state], out_offsets[state + 1]):
+                found[k, out_ids[j]] = True
+        start = ends[k]
+    return found
+
+
+if njit is not None:  # pragma: no cover - nur mit Numba
+    scan_bytes = njit(cache=True)(_scan_bytes_kernel)
+    scan_batch = njit(cache=True)(_scan_batch_kernel)
+else:
+    scan_bytes = _scan_bytes_kernel
+    scan_batch = _scan_batch_kernel
+
+
+class KeywordDFA:
+    """Findet Schlüsselwörter mit einem vorkompilierten Byte-Automaten.
+
+    Bietet dieselbe Schnittstelle wie :class:`analyzer.keyword_matcher.KeywordMatcher`.
+    Ohne Numba läuft der Suchkern als Python-Schleife und ist nur für Tests
+    gedacht; Aufrufer sollten dann ``KeywordMatcher`` verwenden.
+
+    Args:
+        keywords: Zu suchende Schlüsselwörter. Leere Einträge und Duplikate
+            werden ignoriert, die Reihenfolge bleibt erhalten.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(kw for kw in keywords if kw))
+        self._build([kw.encode("utf-8") for kw in self.keywords])
+
+    def _build(self, patterns) -> None:
+        """Erzeugt Übergangstabelle und Ausgabelisten (CSR-Format)"""
+        goto = [{}]
+        outputs = [set()]
+        for keyword_id, pattern in enumerate(patterns):
+            state = 0
+            for byte in pattern:
+                if byte not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][byte] = len(goto) - 1
+                state = goto[state][byte]
+            outputs[state].add(keyword_id)
+
+        transitions = np.zeros((len(goto), 256), dtype=np.int32)
+        fail = [0] * len(goto)
+        queue = deque()
+        for byte, child in goto[0].items():
+            transitions[0, byte] = child
+            queue.append(child)
+
+        # Breitensuche: Fehlerübergänge in die Tabelle einfalten
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            transitions[state] = transitions[fail[state]]
+            for byte, child in goto[state].items():
+                fail[child] = transitions[fail[state], byte] if state else 0
+                transitions[state, byte] = child
+                queue.append(child)
+
+        # Byte-Klassen: Klasse 0 fasst alle Bytes zusammen, die in keinem
+        # Schlüsselwort vorkommen und daher stets in den Startzustand führen
+        alphabet = sorted({byte for pattern in patterns for byte in pattern})
+        self._byte_classes = np.zeros(256, dtype=np.uint16)
+        self._byte_classes[alphabet] = np.arange(1, len(alphabet) + 1)
+        state_dtype = np.int16 if len(goto) <= np.iinfo(np.int16).max else np.int32
+        self._transitions = np.zeros((len(goto), len(alphabet) + 1), dtype=state_dtype)
+        self._transitions[:, 1:] = transitions[:, alphabet]
+        self._out_offsets = np.zeros(len(goto) + 1, dtype=np.int32)
+        self._out_offsets[1:] = np.cumsum([len(ids) for ids in outputs])
+        self._out_ids = np.fromiter(
+            (keyword_id for ids in outputs for keyword_id in sorted(ids)),
+            dtype=np.int32,
+            count=int(self._out_offsets[-1])
+        )
+
+    def find(self, text: str) -> Set[str]:
+        """Ermittelt alle Schlüsselwörter, die in ``text`` vorkommen.
+
+        Args:
+            text: Zu durchsuchender Text. Groß-/Kleinschreibung wird nicht
+                angepasst.
+
+        Returns:
+            Menge der gefundenen Schlüsselwörter.
+        """
+        if not text or not self.keywords:
+            return set()
+        data = np.frombuffer(text.encode("utf-8", "surrogatepass"), dtype=np.uint8)
+        found = scan_bytes(
+            data, self._byte_classes, self._transitions, self._out_offsets, self._out_ids, len(self.keywords)
+        )
+        return {self.keywords[i] for i in np.flatnonzero(found)}
+
+    def find_many(self, texts: Sequence[str]) -> List[Set[str]]:
+        """Ermittelt die Schlüsselwörter mehrerer Texte in einem Kernel-Aufruf.
+
+        Args:
+            texts: Zu durchsuchende Texte.
+
+        Returns:
+            Je Text die Menge der gefundenen Schlüsselwörter, in der
+            Reihenfolge von ``texts``.
+        """
+        if not self.keywords or not texts:
+            return [set() for _ in texts]
+        encoded = [text.encode("utf-8", "surrogatepass") for text in texts]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        ends = np.cumsum([len(chunk) for chunk in encoded], dtype=np.int64)
+        found = scan_batch(
+            data, ends, self._byte_classes, self._transitions, self._out_offsets, self._out_ids, len(self.keywords)
+        )
+        return [{self.keywords[i] for i in np.flatnonzero(row)} for row in found]
@@ -0,0 +1,78 @@
+"""Mehrfach-Schlüsselwortsuche für die Analysemodule.
+
+Nutzt einen Aho-Corasick-Automaten aus ``pyahocorasick``, sofern verfügbar,
+sodass ein Text unabhängig von der Anzahl der Schlüsselwörter nur einmal
+durchlaufen wird. Ohne die Bibliothek wird auf einfache Teilstring-Prüfungen
+zurückgegriffen.
+"""
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Iterable, List, Sequence, Set
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    import ahocorasick
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    ahocorasick = None
+
+# Trennzeichen zwischen den Texten einer Stapelsuche; kommt in keinem
+# sinnvollen Schlüsselwort vor, sodass kein Treffer eine Textgrenze überspannt
+BATCH_SEPARATOR = "\x01"
+
+
+class KeywordMatcher:
+    """Findet mehrere Schlüsselwörter in einem einzigen Textdurchlauf.
+
+    Args:
+        keywords: Zu suchende Schlüsselwörter. Leere Einträge und Duplikate
+            werden ignoriert, die Reihenfolge bleibt erhalten.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(kw for kw in keywords if kw))
+        self._automaton = None
+
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+    def find(self, text: str) -> Set[str]:
+        """Ermittelt alle Schlüsselwörter, die in ``text`` vorkommen.
+
+        Args:
+            text: Zu durchsuchender Text. Groß-/Kleinschreibung wird nicht
+                angepasst.
+
+        Returns:
+            Menge der gefundenen Schlüsselwörter.
+        """
+        if not text:
+            return set()
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
+
+    def find_many(self, texts: Sequence[str]) -> List[Set[str]]:
+        """Ermittelt die Schlüsselwörter mehrerer Texte in einem Durchlauf.
+
+        Die Texte werden mit :data:`BATCH_SEPARATOR` verbunden und gemeinsam
+        durchsucht; die Trefferpositionen werden anschließend den einzelnen
+        Texten zugeordnet.
+
+        Args:
+            texts: Zu durchsuchende Texte.
+
+        Returns:
+            Je Text die Menge der gefundenen Schlüsselwörter, in der
+            Reihenfolge von ``texts``.
+        """
+        if self._automaton is None or any(BATCH_SEPARATOR in kw for kw in self.keywords):
+            return [self.find(text) for text in texts]
+
+        # Endposition (exklusiv) jedes Textes im verbundenen Puffer
+        bounds = list(accumulate(len(text) + 1 for text in texts))
+        results: List[Set[str]] = [set() for _ in texts]
+        for end, keyword in self._automaton.iter(BATCH_SEPARATOR.join(texts)):
+            results[bisect_left(bounds, end + 1)].add(keyword)
+        return results
@@ -2,45 +2,109 @@
 Lokale KI-Modelle Integration (Ollama und DeepSeek)
 """
 import os
-import json
+import asyncio
 import logging
-from typing import Dict
+import time
+from typing import Awaitable, Callable, Dict, Tuple
 import httpx
 from concurrent.futures import ThreadPoolExecutor
 
+from .serialization import loads
+
+# Antwortzeit der Modelle; Verbindungsaufbau soll schnell scheitern
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+# Timeout für Verfügbarkeitsprüfungen
+PROBE_TIMEOUT = 5.0
+# Gültigkeitsdauer eines Prüfergebnisses in Sekunden
+AVAILABILITY_TTL = 300.0
+# Erwartbare Fehler einer Modellabfrage: Transport/HTTP-Status sowie
+# ungültige oder unvollständige Antworten. Alles andere ist ein Programmfehler.
+MODEL_ERRORS = (httpx.HTTPError, ValueError, KeyError, IndexError, TypeError)
+
 
 class LocalAIHandler:
+    __slots__ = (
+        'ollama_url', 'deepseek_url', 'ollama_model', 'deepseek_model',
+        '_ollama', '_deepseek', '_availability', '_executor', '_aclient',
+    )
+
     def __init__(self):
         self.ollama_url = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
         self.deepseek_url = os.getenv('DEEPSEEK_HOST', 'http://localhost:8080')
-        self.models = {
-            'ollama': {
-                'model': 'llama2',  # Standard-Modell, kann in der Konfiguration geändert werden
-                'available': self._check_ollama_available()
-            },
-            'deepseek': {
-                'model': 'deepseek-coder',  # Standard-Modell
-                'available': self._check_deepseek_available()
-            }
-        }
+
+        # Dauerhafte Clients je Backend, damit Verbindungen wiederverwendet werden
+        self._ollama = httpx.Client(base_url=self.ollama_url, timeout=HTTP_TIMEOUT)
+        self._deepseek = httpx.Client(base_url=self.deepseek_url, timeout=HTTP_TIMEOUT)
+        # Standard-Modelle, können in der Konfiguration geändert werden
+        self.ollama_model = 'llama2'
+        self.deepseek_model = 'deepseek-coder'
+        # Verfügbarkeit wird erst bei Bedarf geprüft: Backend -> (Ergebnis, Ablaufzeitpunkt)
+        self._availability: Dict[str, Tuple[bool, float]] = {}
+        self._executor = None
+        self._aclient = None
+
+    @property
+    def ollama_available(self) -> bool:
+        """Ob Ollama erreichbar ist; das Ergebnis wird für ``AVAILABILITY_TTL`` gespeichert"""
+        return self._cached_availability('ollama', self._check_ollama_available)
+
+    @property
+    def deepseek_available(self) -> bool:
+        """Ob DeepSeek erreichbar ist; das Ergebnis wird für ``AVAILABILITY_TTL`` gespeichert"""
+        return self._cached_availability('deepseek', self._check_deepseek_available)
+
+    def _cached_availability(self, backend: str, check: Callable[[], bool]) -> bool:
+        """Liefert das gespeicherte Prüfergebnis oder prüft erneut, wenn es abgelaufen ist"""
+        now = time.monotonic()
+        cached = self._availability.get(backend)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        available = check()
+        self._availability[backend] = (available, now + AVAILABILITY_TTL)
+        return available
+
+    async def _cached_availability_async(self, backend: str, check: Callable[[], Awaitable[bool]]) -> bool:
+        """Wie :meth:`_cached_availability`, prüft aber ohne die Event-Loop zu blockieren"""
+        cached = self._availability.get(backend)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        available = await check()
+        self._availability[backend] = (available, time.monotonic() + AVAILABILITY_TTL)
+        return available
 
     def _check_ollama_available(self) -> bool:
         """Prüft, ob Ollama verfügbar ist"""
         try:
-            with httpx.Client(timeout=5.0) as client:
-                response = client.get(f"{self.ollama_url}/api/tags")
-                return response.status_code == 200
-        except Exception as e:
+            response = self._ollama.get("/api/tags", timeout=PROBE_TIMEOUT)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
             logging.warning(f"Ollama nicht verfügbar: {str(e)}")
             return False
 
     def _check_deepseek_available(self) -> bool:
         """Prüft, ob DeepSeek verfügbar ist"""
         try:
-            with httpx.Client(timeout=5.0) as client:
-                response = client.get(f"{self.deepseek_url}/v1/models")
-                return response.status_code == 200
-        except Exception as e:
+            response = self._deepseek.get("/v1/models", timeout=PROBE_TIMEOUT)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
+            logging.warning(f"DeepSeek nicht verfügbar: {str(e)}")
+            return False
+
+    async def _check_ollama_available_async(self) -> bool:
+        """Prüft asynchron, ob Ollama verfügbar ist"""
+        try:
+            response = await self._get_async_client().get(f"{self.ollama_url}/api/tags", timeout=PROBE_TIMEOUT)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
+            logging.warning(f"Ollama nicht verfügbar: {str(e)}")
+            return False
+
+    async def _check_deepseek_available_async(self) -> bool:
+        """Prüft asynchron, ob DeepSeek verfügbar ist"""
+        try:
+            response = await self._get_async_client().get(f"{self.deepseek_url}/v1/models", timeout=PROBE_TIMEOUT)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
             logging.warning(f"DeepSeek nicht verfügbar: {str(e)}")
             return False
 
@@ -53,26 +117,83 @@ class LocalAIHandler:
         Returns:
             Dict: Kombinierte Analyseergebnisse der verfügbaren Modelle.
         """
-        results = {}
-
         # Bereite den Prompt vor
         prompt = self._prepare_email_prompt(email_data)
 
-        # Parallel-Analyse mit verfügbaren Modellen
-        with ThreadPoolExecutor() as executor:
-            if self.models['ollama']['available']:
-                ollama_future = executor.submit(self._analyze_with_ollama, prompt)
-            if self.models['deepseek']['available']:
-                deepseek_future = executor.submit(self._analyze_with_deepseek, prompt)
+        analyzers: Dict[str, Callable[[str], Dict]] = {}
+        if self.ollama_available:
+            analyzers['ollama'] = self._analyze_with_ollama
+        if self.deepseek_available:
+            analyzers['deepseek'] = self._analyze_with_deepseek
+
+        if len(analyzers) > 1:
+            # Parallel-Analyse über einen wiederverwendeten Thread-Pool
+            futures = {name: self._get_executor().submit(analyze, prompt) for name, analyze in analyzers.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: analyze(prompt) for name, analyze in analyzers.items()}
+
+        return self._combine_analysis_results(results)
+
+    async def analyze_email_content_async(self, email_data: Dict) -> Dict:
+        """Analysiert E-Mail-Inhalt nebenläufig auf der aufrufenden Event-Loop.
+
+        Verfügbarkeitsprüfung und Modelle werden ohne zusätzliche Threads über
+        einen gemeinsamen ``httpx.AsyncClient`` abgefragt. Der Client ist an die Event-Loop des
+        ersten Aufrufs gebunden und wird mit :meth:`aclose` geschlossen.
+
+        Args:
+            email_data (Dict): E-Mail-Daten mit Betreff, Inhalt und weiteren Feldern.
+
+        Returns:
+            Dict: Kombinierte Analyseergebnisse der verfügbaren Modelle.
+        """
+        prompt = self._prepare_email_prompt(email_data)
+
+        ollama_available, deepseek_available = await asyncio.gather(
+            self._cached_availability_async('ollama', self._check_ollama_available_async),
+            self._cached_availability_async('deepseek', self._check_deepseek_available_async),
+        )
 
-            # Sammle Ergebnisse
-            if self.models['ollama']['available']:
-                results['ollama'] = ollama_future.result()
-            if self.models['deepseek']['available']:
-                results['deepseek'] = deepseek_future.result()
+        coroutines = {}
+        if ollama_available:
+            coroutines['ollama'] = self._analyze_with_ollama_async(prompt)
+        if deepseek_available:
+            coroutines['deepseek'] = self._analyze_with_deepseek_async(prompt)
 
+        outcomes = await asyncio.gather(*coroutines.values(), return_exceptions=True)
+        results = {
+            name: {"error": str(outcome)} if isinstance(outcome, BaseException) else outcome
+            for name, outcome in zip(coroutines, outcomes)
+        }
         return self._combine_analysis_results(results)
 
+    def close(self) -> None:
+        """Schließt die HTTP-Clients und gibt den Thread-Pool frei"""
+        self._ollama.close()
+        self._deepseek.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def aclose(self) -> None:
+        """Schließt den asynchronen HTTP-Client"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Erzeugt den Thread-Pool beim ersten Bedarf"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="local-ai")
+        return self._executor
+
+    def _get_async_client(self) -> "httpx.AsyncClient":
+        """Erzeugt den asynchronen HTTP-Client beim ersten Bedarf"""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+        return self._aclient
+
     def _prepare_email_prompt(self, email_data: Dict) -> str:
         """Bereitet den Prompt für die KI-Analyse vor"""
         return f"""Analysiere diese E-Mail auf potenzielle Bedrohungen:
@@ -93,62 +214,92 @@ Bewerte folgende Aspekte:
 
 Antworte im JSON-Format."""
 
+    def _ollama_payload(self, prompt: str) -> Dict:
+        """Erstellt den Request-Body für Ollama"""
+        return {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": False
+        }
+
+    def _deepseek_payload(self, prompt: str) -> Dict:
+        """Erstellt den Request-Body für DeepSeek"""
+        return {
+            "model": self.deepseek_model,
+            "messages": [
+                {"role": "system", "content": "Du bist ein E-Mail-Sicherheitsexperte."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3
+        }
+
+    @staticmethod
+    def _parse_ollama_result(result: Dict) -> Dict:
+        """Extrahiert das JSON-Ergebnis aus einer Ollama-Antwort"""
+        try:
+            return loads(result['response'])
+        except ValueError:
+            # Fallback für nicht-JSON Antworten
+            return {
+                "error": "Konnte Ollama-Antwort nicht parsen",
+                "raw_response": result['response']
+            }
+
+    @staticmethod
+    def _parse_deepseek_result(result: Dict) -> Dict:
+        """Extrahiert das JSON-Ergebnis aus einer DeepSeek-Antwort"""
+        content = result['choices'][0]['message']['content']
+        try:
+            return loads(content)
+        except ValueError:
+            return {
+                "error": "Konnte DeepSeek-Antwort nicht parsen",
+                "raw_response": content
+            }
+
     def _analyze_with_ollama(self, prompt: str) -> Dict:
         """Führt Analyse mit Ollama durch"""
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.models['ollama']['model'],
-                        "prompt": prompt,
-                        "stream": False
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                # Versuche JSON aus der Antwort zu extrahieren
-                try:
-                    return json.loads(result['response'])
-                except json.JSONDecodeError:
-                    # Fallback für nicht-JSON Antworten
-                    return {
-                        "error": "Konnte Ollama-Antwort nicht parsen",
-                        "raw_response": result['response']
-                    }
-
-        except Exception as e:
+            response = self._ollama.post("/api/generate", json=self._ollama_payload(prompt))
+            response.raise_for_status()
+            return self._parse_ollama_result(loads(response.content))
+
+        except MODEL_ERRORS as e:
             logging.error(f"Fehler bei Ollama-Analyse: {str(e)}")
             return {"error": str(e)}
 
     def _analyze_with_deepseek(self, prompt: str) -> Dict:
         """Führt Analyse mit DeepSeek durch"""
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.deepseek_url}/v1/chat/completions",
-                    json={
-                        "model": self.models['deepseek']['model'],
-                        "messages": [
-                            {"role": "system", "content": "Du bist ein E-Mail-Sicherheitsexperte."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                try:
-                    return json.loads(result['choices'][0]['message']['content'])
-                except json.JSONDecodeError:
-                    return {
-                        "error": "Konnte DeepSeek-Antwort nicht parsen",
-                        "raw_response": result['choices'][0]['message']['content']
-                    }
-
-        except Exception as e:
+            response = self._deepseek.post("/v1/chat/completions", json=self._deepseek_payload(prompt))
+            response.raise_for_status()
+            return self._parse_deepseek_result(loads(response.content))
+
+        except MODEL_ERRORS as e:
+            logging.error(f"Fehler bei DeepSeek-Analyse: {str(e)}")
+            return {"error": str(e)}
+
+    async def _analyze_with_ollama_async(self, prompt: str) -> Dict:
+        """Führt Analyse mit Ollama asynchron durch"""
+        try:
+            response = await self._get_async_client().post(
+                f"{self.ollama_url}/api/generate", json=self._ollama_payload(prompt)
+            )
+            response.raise_for_status()
+            return self._parse_ollama_result(loads(response.content))
+        except MODEL_ERRORS as e:
+            logging.error(f"Fehler bei Ollama-Analyse: {str(e)}")
+            return {"error": str(e)}
+
+    async def _analyze_with_deepseek_async(self, prompt: str) -> Dict:
+        """Führt Analyse mit DeepSeek asynchron durch"""
+        try:
+            response = await self._get_async_client().post(
+                f"{self.deepseek_url}/v1/chat/completions", json=self._deepseek_payload(prompt)
+            )
+            response.raise_for_status()
+            return self._parse_deepseek_result(loads(response.content))
+        except MODEL_ERRORS as e:
             logging.error(f"Fehler bei DeepSeek-Analyse: {str(e)}")
             return {"error": str(e)}
 
@@ -157,7 +308,7 @@ Antworte im JSON-Format."""
         combined = {
             "spam_score": 0.0,
             "risk_score": 0.0,
-            "indicators": [],
+            "indicators": {},  # dict als geordnete Menge
             "confidence": 0.0,
             "model_scores": {}
         }
@@ -175,9 +326,9 @@ Antworte im JSON-Format."""
                 combined["spam_score"] += result.get("spam_probability", 0.0)
                 combined["risk_score"] += result.get("overall_risk", 0.0)
 
-                # Sammle eindeutige Indikatoren
-                if "indicators" in result:
-                    combined["indicators"].extend(result["indicators"])
+                # Sammle eindeutige Indikatoren in Reihenfolge des Auftretens
+                for indicator in result.get("indicators", []):
+                    combined["indicators"][indicator] = None
 
                 valid_results += 1
 
@@ -187,7 +338,6 @@ Antworte im JSON-Format."""
             combined["risk_score"] /= valid_results
             combined["confidence"] = valid_results / len(results)  # Konfidenz basierend auf verfügbaren Modellen
 
-        # Entferne Duplikate aus Indikatoren
-        combined["indicators"] = list(set(combined["indicators"]))
+        combined["indicators"] = list(combined["indicators"])
 
         return combined
@@ -3,6 +3,7 @@
 Das Modul implementiert ein lokales Modell, das kontinuierlich aus den
 analysierten E-Mails lernt.
 """
+import copy
 import os
 import pickle
 
@@ -11,13 +12,45 @@ try:  # pragma: no cover - optionale Abhängigkeit
 except Exception:  # pragma: no cover
     joblib = None
 
+from sklearn.exceptions import NotFittedError
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
+from sklearn.utils.validation import check_is_fitted
 import logging
 from typing import Dict, List, Tuple, Optional
-import json
+
+import numpy as np
+
+from .model_store import dump_atomic, flush_at_exit, load_shared
+from .serialization import dumps, loads
+
+# Alle so vielen neuen E-Mails wird das Modell mit diesen E-Mails nachtrainiert
+RETRAIN_INTERVAL = 10
+# Alle so vielen E-Mails werden Vokabular und Modell vollständig neu trainiert
+FULL_RETRAIN_INTERVAL = 1000
+# Nachtrainierte Modelle werden nur nach so vielen inkrementellen Trainings gespeichert
+SAVE_INTERVAL = 10
+
+
+def _new_model() -> SGDRegressor:
+    """Erzeugt ein inkrementell trainierbares Regressionsmodell"""
+    return SGDRegressor(random_state=42)
+
+
+def _new_vectorizer() -> TfidfVectorizer:
+    """Erzeugt den TF-IDF-Vectorizer; ``float32`` halbiert die Matrixdaten"""
+    return TfidfVectorizer(max_features=1000, dtype=np.float32)
+
+
+def _is_fitted(estimator) -> bool:
+    """Prüft, ob ein Estimator bereits trainiert wurde"""
+    try:
+        check_is_fitted(estimator)
+        return True
+    except NotFittedError:
+        return False
 
 
 class MLAnalyzer:
@@ -33,14 +66,25 @@ class MLAnalyzer:
 
         # Lade oder initialisiere Modelle
         self.vectorizer = self._load_vectorizer()
+        # Aus dem Cache geladene Modelle werden geteilt und vor Änderungen kopiert
+        self._model_shared = False
         self.model = self._load_model()
         self.training_data = self._load_training_data()
-
-    def analyze_email(self, email_data: Dict) -> Dict:
+        # Wichtigste Features des aktuellen Modells; hängen nicht von der E-Mail ab
+        self._important_features: Optional[List[Tuple[str, float]]] = None
+        # Feature-Namen ändern sich nur mit dem Vokabular, also beim vollständigen Training
+        self._feature_names: Optional[np.ndarray] = None
+        # Inkrementelle Trainings seit dem letzten Speichern; Rest wird beim Beenden geschrieben
+        self._unsaved_retrains = 0
+        flush_at_exit(self.flush)
+
+    def analyze_email(self, email_data: Dict, include_features: bool = False) -> Dict:
         """Analysiert eine E-Mail mit dem ML-Modell.
 
         Args:
             email_data: E-Mail-Inhalt und Metadaten.
+            include_features: Zusätzlich die wichtigsten Modell-Features unter
+                ``ml_features`` liefern (zur Fehlersuche; unabhängig von der E-Mail).
 
         Returns:
             Bewertung und zusätzliche ML-Informationen.
@@ -56,13 +100,15 @@ class MLAnalyzer:
             # Vorhersage
             prediction = self.model.predict(X)[0]
 
-            return {
+            result = {
                 "ml_score": float(prediction),
                 # Regressionsmodelle liefern keine Wahrscheinlichkeiten.
                 # Daher geben wir eine konstante Konfidenz von 1.0 zurück.
                 "confidence": 1.0,
-                "ml_features": self._get_important_features(features),
             }
+            if include_features:
+                result["ml_features"] = self._get_important_features(features)
+            return result
 
         except Exception as e:
             logging.error(f"Fehler bei der ML-Analyse: {str(e)}")
@@ -89,10 +135,9 @@ class MLAnalyzer:
                 }
             })
 
-            # Trainiere neu, wenn genügend neue Daten vorhanden sind
-            if len(self.training_data) % 10 == 0:
-                # Alle 10 E-Mails neu trainieren
-                self._retrain_model()
+            # Trainiere nach, wenn genügend neue Daten vorhanden sind
+            if len(self.training_data) % RETRAIN_INTERVAL == 0:
+                self._retrain_model(force=len(self.training_data) % FULL_RETRAIN_INTERVAL == 0)
                 self._save_training_data()
 
         except Exception as e:
@@ -113,9 +158,36 @@ class MLAnalyzer:
 
         return " ".join(features)
 
-    def _retrain_model(self):
-        """Trainiert das Modell neu mit allen verfügbaren Daten"""
-        if len(self.training_data) < 10:
+    def _retrain_model(self, force: bool = False):
+        """Trainiert das Modell mit den neuesten Daten nach.
+
+        Regulär wird nur der letzte Block aus ``RETRAIN_INTERVAL`` E-Mails per
+        ``partial_fit`` gelernt; das Vokabular bleibt dabei unverändert. Ein
+        vollständiges Training über alle Daten erfolgt mit ``force=True``
+        sowie, wenn noch kein inkrementell trainierbares Modell vorliegt.
+
+        Args:
+            force: Vokabular und Modell über alle Daten neu trainieren.
+        """
+        if len(self.training_data) < RETRAIN_INTERVAL:
+            return
+
+        incremental = (
+            not force and hasattr(self.model, "partial_fit") and
+            _is_fitted(self.model) and _is_fitted(self.vectorizer)
+        )
+        if incremental:
+            batch = self.training_data[-RETRAIN_INTERVAL:]
+            X = self.vectorizer.transform([item["features"] for item in batch])
+            if self._model_shared:
+                self.model = copy.deepcopy(self.model)
+                self._model_shared = False
+            self.model.partial_fit(X, [item["score"] for item in batch])
+            self._important_features = None
+            logging.info(f"ML-Modell mit {len(batch)} neuen E-Mails nachtrainiert")
+            self._unsaved_retrains += 1
+            if self._unsaved_retrains >= SAVE_INTERVAL:
+                self._save_models()
             return
 
         # Bereite Trainingsdaten vor
@@ -123,8 +195,9 @@ class MLAnalyzer:
         y = [item["score"] for item in self.training_data]
 
         # Aktualisiere Vectorizer
-        self.vectorizer = TfidfVectorizer(max_features=1000)
+        self.vectorizer = _new_vectorizer()
         X_vectorized = self.vectorizer.fit_transform(X)
+        self._feature_names = None
 
         # Aufteilung in Trainings- und Testdaten zur Auswertung
         X_train, X_test, y_train, y_test = train_test_split(
@@ -132,8 +205,10 @@ class MLAnalyzer:
         )
 
         # Trainiere Regressionsmodell
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self.model = _new_model()
+        self._model_shared = False
         self.model.fit(X_train, y_train)
+        self._important_features = None
 
         # Bewertung des Modells
         predictions = self.model.predict(X_test)
@@ -148,6 +223,9 @@ class MLAnalyzer:
     ) -> List[Tuple[str, float]]:
         """Ermittelt die wichtigsten Features für die Klassifizierung.
 
+        Die Wichtigkeiten hängen nur vom trainierten Modell ab und werden
+        daher bis zum nächsten Neutraining zwischengespeichert.
+
         Args:
             features: Textrepräsentation der E-Mail.
 
@@ -156,77 +234,88 @@ class MLAnalyzer:
         """
         if not self.model or not self.vectorizer:
             return []
-
-        # Hole Feature-Namen und Wichtigkeiten
-        feature_names = self.vectorizer.get_feature_names_out()
-        importances = self.model.feature_importances_
-
-        # Finde die wichtigsten Features
-        important_features = []
-        for i, importance in enumerate(importances):
-            if importance > 0.01:  # Nur Features mit Wichtigkeit > 1 %
-                important_features.append(
-                    (feature_names[i], float(importance))
-                )
-
-        return sorted(important_features, key=lambda x: x[1], reverse=True)[:5]
+        if self._important_features is not None:
+            return list(self._important_features)
+
+        # Hole Feature-Namen und Wichtigkeiten; lineare Modelle liefern
+        # Koeffizienten, deren Beträge normiert als Wichtigkeit dienen
+        if self._feature_names is None:
+            self._feature_names = self.vectorizer.get_feature_names_out()
+        importances = getattr(self.model, "feature_importances_", None)
+        if importances is None:
+            weights = np.abs(self.model.coef_)
+            total = weights.sum()
+            importances = weights / total if total else weights
+
+        # Die fünf wichtigsten Features mit Wichtigkeit > 1 %, absteigend sortiert
+        candidates = np.flatnonzero(importances > 0.01)
+        top = candidates[np.argsort(-importances[candidates], kind="stable")[:5]]
+        self._important_features = list(zip(self._feature_names[top].tolist(), importances[top].tolist()))
+        return list(self._important_features)
 
     def _load_vectorizer(self) -> Optional[TfidfVectorizer]:
         """Lädt den gespeicherten Vectorizer oder erstellt einen neuen"""
         try:
             if os.path.exists(self.vectorizer_path):
                 if joblib:
-                    return joblib.load(self.vectorizer_path)
+                    return load_shared(self.vectorizer_path)
                 with open(self.vectorizer_path, "rb") as f:
                     return pickle.load(f)
-            return TfidfVectorizer(max_features=1000)
+            return _new_vectorizer()
         except Exception as e:
             logging.error(f"Fehler beim Laden des Vectorizers: {str(e)}")
-            return TfidfVectorizer(max_features=1000)
+            return _new_vectorizer()
 
-    def _load_model(self) -> Optional[RandomForestRegressor]:
+    def _load_model(self):
         """Lädt das gespeicherte Modell oder erstellt ein neues"""
         try:
             if os.path.exists(self.model_path):
                 if joblib:
-                    return joblib.load(self.model_path)
+                    self._model_shared = True
+                    return load_shared(self.model_path)
                 with open(self.model_path, "rb") as f:
                     return pickle.load(f)
-            return RandomForestRegressor(n_estimators=100, random_state=42)
+            return _new_model()
         except Exception as e:
             logging.error(f"Fehler beim Laden des Modells: {str(e)}")
-            return RandomForestRegressor(n_estimators=100, random_state=42)
+            return _new_model()
 
     def _load_training_data(self) -> List:
         """Lädt gespeicherte Trainingsdaten"""
         try:
             if os.path.exists(self.training_data_path):
-                with open(self.training_data_path, 'r') as f:
-                    return json.load(f)
+                with open(self.training_data_path, 'rb') as f:
+                    return loads(f.read())
             return []
         except Exception as e:
             logging.error(f"Fehler beim Laden der Trainingsdaten: {str(e)}")
             return []
 
+    def flush(self) -> None:
+        """Speichert nachtrainierte, noch nicht geschriebene Modelle"""
+        if self._unsaved_retrains:
+            self._save_models()
+
     def _save_models(self):
         """Speichert Vectorizer und Modell"""
         try:
             if joblib:
-                joblib.dump(self.vectorizer, self.vectorizer_path)
-                joblib.dump(self.model, self.model_path)
+                dump_atomic(self.vectorizer, self.vectorizer_path)
+                dump_atomic(self.model, self.model_path)
             else:
                 with open(self.vectorizer_path, "wb") as f:
-                    pickle.dump(self.vectorizer, f)
+                    pickle.dump(self.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
                 with open(self.model_path, "wb") as f:
-                    pickle.dump(self.model, f)
+                    pickle.dump(self.model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._unsaved_retrains = 0
         except Exception as e:
             logging.error(f"Fehler beim Speichern der Modelle: {str(e)}")
 
     def _save_training_data(self):
         """Speichert Trainingsdaten"""
         try:
-            with open(self.training_data_path, 'w') as f:
-                json.dump(self.training_data, f)
+            with open(self.training_data_path, 'wb') as f:
+                f.write(dumps(self.training_data))
         except Exception as e:
             logging.error(
                 f"Fehler beim Speichern der Trainingsdaten: {str(e)}"
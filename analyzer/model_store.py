@@ -0,0 +1,75 @@
+"""Laden und Speichern persistierter Modelle mit ``joblib``.
+
+Geladene Modelle werden je Pfad und Änderungszeitpunkt zwischengespeichert
+und ihre NumPy-Arrays per ``mmap`` eingeblendet, sodass mehrere Instanzen
+(und Prozesse) dieselben Seiten teilen. Gespeichert wird atomar über eine
+temporäre Datei, damit eingeblendete Dateien nie überschrieben werden.
+Komprimiert wird bewusst nicht, da ``mmap`` nur unkomprimierte Arrays
+einblenden kann.
+"""
+import atexit
+import os
+import pickle
+import weakref
+from functools import lru_cache
+from typing import Any, Callable
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    import joblib
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    joblib = None
+
+
+@lru_cache(maxsize=8)
+def _load_mapped(path: str, mtime_ns: int) -> Any:
+    """Lädt ein Modell; der Änderungszeitpunkt dient als Cache-Schlüssel"""
+    return joblib.load(path, mmap_mode="r")
+
+
+def load_shared(path: str) -> Any:
+    """Lädt ein gespeichertes Modell und teilt es mit weiteren Aufrufern.
+
+    Das Ergebnis ist schreibgeschützt und darf nicht verändert werden; vor
+    einem ``partial_fit`` muss es mit :func:`copy.deepcopy` kopiert werden.
+
+    Args:
+        path: Pfad der ``joblib``-Datei.
+
+    Returns:
+        Das deserialisierte Objekt.
+    """
+    return _load_mapped(path, os.stat(path).st_mtime_ns)
+
+
+def dump_atomic(obj: Any, path: str) -> None:
+    """Speichert ein Objekt mit ``joblib`` über eine temporäre Datei.
+
+    Verwendet wird das neueste Pickle-Protokoll (5), das große Puffer ohne
+    zusätzliche Kopien schreibt.
+
+    Args:
+        obj: Zu speicherndes Objekt.
+        path: Zielpfad der ``joblib``-Datei.
+    """
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def flush_at_exit(flush: Callable[[], None]) -> None:
+    """Ruft eine gebundene Speichermethode beim Beenden des Prozesses auf.
+
+    Das Objekt wird nur schwach referenziert und bleibt dadurch nicht
+    allein wegen der Registrierung am Leben.
+
+    Args:
+        flush: Gebundene Methode, etwa ``analyzer.flush``.
+    """
+    method = weakref.WeakMethod(flush)
+
+    def _flush() -> None:
+        bound = method()
+        if bound is not None:
+            bound()
+
+    atexit.register(_flush)
@@ -14,16 +14,22 @@ environments.
 
 from __future__ import annotations
 
-from collections import Counter
+from bisect import insort
+from collections import Counter, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
+# Default maximum number of threat records kept with their full metadata
+HISTORY_SIZE = 10000
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ThreatRecord:
     """Internal representation of a single threat entry.
 
+    Records are immutable and use ``__slots__`` to keep the history compact.
+
     Attributes:
         timestamp: Time when the threat was recorded.
         type: Categorised threat type (e.g. ``"phishing"``).
@@ -41,17 +47,86 @@ class ThreatRecord:
     target_role: Optional[str] = None
 
 
+class _SlidingWindow:
+    """Running aggregates over the threat records of one time window.
+
+    Records are kept ordered by timestamp so that expired entries can be
+    dropped from the front; totals and type counts are updated on insert and
+    expiry instead of being recomputed from the full history. Each call thus
+    costs O(new + expired) records, which is why no vectorised or parallel
+    reduction over the history is used.
+    """
+
+    __slots__ = ("delta", "records", "score_sum", "type_counts")
+
+    def __init__(self, delta: timedelta) -> None:
+        self.delta = delta
+        self.records: Deque[Tuple[datetime, str, float]] = deque()
+        self.score_sum = 0.0
+        self.type_counts: Counter = Counter()
+
+    def add(self, entry: Tuple[datetime, str, float]) -> None:
+        """Add a ``(timestamp, type, score)`` entry, keeping the window ordered by timestamp.
+
+        The same tuple is shared by all windows, so each record is stored once.
+        """
+        timestamp, threat_type, score = entry
+        if self.records and timestamp < self.records[-1][0]:
+            insort(self.records, entry)
+        else:
+            self.records.append(entry)
+        self.score_sum += score
+        self.type_counts[threat_type] += 1
+
+    def expire(self, now: datetime) -> None:
+        """Drop all records older than the window relative to ``now``."""
+        start_time = now - self.delta
+        records = self.records
+        while records and records[0][0] < start_time:
+            _, threat_type, score = records.popleft()
+            self.score_sum -= score
+            self.type_counts[threat_type] -= 1
+            if not self.type_counts[threat_type]:
+                del self.type_counts[threat_type]
+        if not records:
+            # Avoid drift of the running sum once the window is empty
+            self.score_sum = 0.0
+
+    def summary(self) -> Dict[str, object]:
+        """Return the statistics reported for this window."""
+        total = len(self.records)
+        return {
+            "total_threats": total,
+            "avg_severity": round(self.score_sum / total, 2) if total else 0.0,
+            "type_distribution": dict(self.type_counts),
+        }
+
+
 class ProactiveThreatDefense:
     """Analyse historical e‑mail threats to identify trends.
 
-    The class stores a history of :class:`ThreatRecord` instances.  Calling
-    :meth:`analyze_trends` with new e‑mails extends this history and returns
-    aggregated statistics that are used by :class:`ThreatAnalyzer` and
-    :class:`ThreatDashboard`.
+    The class stores a bounded history of :class:`ThreatRecord` instances.
+    Calling :meth:`analyze_trends` with new e‑mails extends this history and
+    returns aggregated statistics that are used by :class:`ThreatAnalyzer` and
+    :class:`ThreatDashboard`.  The statistics are maintained incrementally per
+    time window, so each call only touches new and expired records.
     """
 
-    def __init__(self) -> None:
-        self._history: List[ThreatRecord] = []
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        """Create an empty history.
+
+        Args:
+            history_size: Maximum number of records kept with their metadata.
+                Records older than the longest window are dropped earlier.
+        """
+        self._history: Deque[ThreatRecord] = deque(maxlen=history_size)
+        self._total_records = 0
+        self._windows = {
+            "short": _SlidingWindow(timedelta(hours=24)),
+            "medium": _SlidingWindow(timedelta(days=7)),
+            "long": _SlidingWindow(timedelta(days=30)),
+        }
+        self._history_span = max(window.delta for window in self._windows.values())
 
     # ------------------------------------------------------------------
     def analyze_trends(self, emails: List[Dict]) -> Dict[str, Dict]:
@@ -100,32 +175,23 @@ class ProactiveThreatDefense:
                 target_role=email.get("target_role"),
             )
             self._history.append(record)
+            self._total_records += 1
+            entry = (record.timestamp, record.type, record.score)
+            for window in self._windows.values():
+                window.add(entry)
 
         # ------------------------------------------------------------------
         # Analyse different time windows
-        windows = {
-            "short": timedelta(hours=24),
-            "medium": timedelta(days=7),
-            "long": timedelta(days=30),
-        }
-
         window_analysis: Dict[str, Dict[str, object]] = {}
-        for name, delta in windows.items():
-            start_time = now - delta
-            window_records = [r for r in self._history if r.timestamp >= start_time]
-
-            if window_records:
-                avg_severity = sum(r.score for r in window_records) / len(window_records)
-                type_counts = Counter(r.type for r in window_records)
-            else:  # No data in this window
-                avg_severity = 0.0
-                type_counts = Counter()
-
-            window_analysis[name] = {
-                "total_threats": len(window_records),
-                "avg_severity": round(avg_severity, 2),
-                "type_distribution": dict(type_counts),
-            }
+        for name, window in self._windows.items():
+            window.expire(now)
+            window_analysis[name] = window.summary()
+
+        # Records arrive roughly in time order, so stale ones sit at the front
+        cutoff = now - self._history_span
+        history = self._history
+        while history and history[0].timestamp < cutoff:
+            history.popleft()
 
         # ------------------------------------------------------------------
         # Simple forecasts based on recent averages
@@ -142,7 +208,7 @@ class ProactiveThreatDefense:
             "next_24h": {"predicted_threats": predicted_24h},
             "next_week": {"predicted_threats": predicted_week},
             # confidence grows with available data but is capped to 0.99
-            "confidence": round(min(len(self._history) / 100, 0.99), 2),
+            "confidence": round(min(self._total_records / 100, 0.99), 2),
         }
 
         # ------------------------------------------------------------------
@@ -1,25 +1,64 @@
 """Controller coordinating report generation and statistics."""
 
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+# Reports are CPU-bound; two workers keep a PDF and an Excel export in flight
+REPORT_WORKERS = 2
+
+
+def _generate_pdf(output_dir: str, emails: List[Dict[str, Any]]) -> Optional[str]:
+    """Create a PDF report in a worker process."""
+    from analyzer.report_generator import ReportGenerator
+
+    return ReportGenerator(output_dir).create_pdf_report(emails)
+
+
+def _generate_excel(output_dir: str, emails: List[Dict[str, Any]]) -> Optional[str]:
+    """Create an Excel report in a worker process."""
+    from analyzer.report_generator import ReportGenerator
+
+    return ReportGenerator(output_dir).create_excel_report(emails)
+
 
 class ReportController:
-    """Aggregate email data and delegate report creation."""
+    """Aggregate email data and delegate report creation.
 
-    def __init__(self, generator) -> None:
+    The ``submit_*`` methods collect the emails on the calling (GUI) thread
+    and render the report in a process pool, returning a
+    :class:`~concurrent.futures.Future` with the file name. The pool is
+    created on first use unless an executor is passed in.
+    """
+
+    def __init__(self, generator, executor: Optional[Executor] = None) -> None:
         self._generator = generator
+        self._pool = executor
 
     def _collect_emails(self, list_widget) -> List[Dict[str, Any]]:
-        """Extract email and analysis data from a QListWidget-like object."""
-        emails: List[Dict[str, Any]] = []
-        for i in range(list_widget.count()):
-            item = list_widget.item(i)
-            email_data = item.email_data.copy()
-            email_data.update(item.analysis_result)
-            email_data["timestamp"] = datetime.now().isoformat()
-            emails.append(email_data)
-        return emails
+        """Extract email and analysis data from a QListWidget-like object.
+
+        All collected emails share the timestamp of the collection.
+        """
+        timestamp = datetime.now().isoformat()
+        items = (list_widget.item(i) for i in range(list_widget.count()))
+        return [
+            {**item.email_data, **item.analysis_result, "timestamp": timestamp}
+            for item in items
+        ]
+
+    def _executor(self) -> Executor:
+        """Return the report pool, creating it on first use.
+
+        Workers are spawned rather than forked: the GUI process runs threads,
+        and forking a multi-threaded process can deadlock the child.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
 
     def create_pdf_report(self, list_widget) -> Optional[str]:
         """Create a PDF report from the given widget contents."""
@@ -31,7 +70,31 @@ class ReportController:
         emails = self._collect_emails(list_widget)
         return self._generator.create_excel_report(emails)
 
+    def submit_pdf_report(self, list_widget) -> Future:
+        """Create a PDF report in the background.
+
+        Returns:
+            Future: Resolves to the file name of the report.
+        """
+        emails = self._collect_emails(list_widget)
+        return self._executor().submit(_generate_pdf, self._generator.output_dir, emails)
+
+    def submit_excel_report(self, list_widget) -> Future:
+        """Create an Excel report in the background.
+
+        Returns:
+            Future: Resolves to the file name of the report or ``None``.
+        """
+        emails = self._collect_emails(list_widget)
+        return self._executor().submit(_generate_excel, self._generator.output_dir, emails)
+
     def create_statistical_analysis(self, list_widget) -> Optional[Dict[str, Any]]:
         """Generate statistical summaries for the given emails."""
         emails = self._collect_emails(list_widget)
         return self._generator.create_statistical_analysis(emails)
+
+    def shutdown(self) -> None:
+        """Stop the report pool without waiting for pending reports."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -3,15 +3,61 @@ Report Generator für Mail Analyzer
 Generiert verschiedene Arten von Berichten und Statistiken
 """
 import os
+from collections import Counter
 from datetime import datetime, timedelta
-import json
+from itertools import chain
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from fpdf import FPDF
 
-from .utils import get_threat_level
+try:  # pragma: no cover - optionale Abhängigkeit
+    import xlsxwriter
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    xlsxwriter = None
+
+from .serialization import dumps, loads
+from .utils import THREAT_LEVEL_NAMES, classify_threat_levels
+
+
+def _parse_timestamps(values: List[str]) -> np.ndarray:
+    """Parst ISO-Zeitstempel in ein ``datetime64``-Array.
+
+    Zeitzonen-Offsets werden verworfen, sodass jeder Zeitstempel in seiner
+    eigenen Ortszeit ausgewertet wird. Unterschiedliche Offsets lassen sich
+    nicht gemeinsam parsen; dann wird jeder Wert einzeln gelesen.
+    """
+    try:
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), format="ISO8601", cache=True)
+        if parsed.dt.tz is not None:
+            parsed = parsed.dt.tz_localize(None)
+        return parsed.to_numpy(dtype="datetime64[ns]")
+    except ValueError:
+        return np.array(
+            [datetime.fromisoformat(value).replace(tzinfo=None) for value in values], dtype="datetime64[ns]"
+        )
+
+
+def _hour_and_weekday_counts(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Zählt Zeitstempel je Stunde (0-23) und Wochentag (Montag = 0)"""
+    hours = timestamps.astype("datetime64[h]").astype(np.int64) % 24
+    # Der 1. Januar 1970 war ein Donnerstag
+    weekdays = (timestamps.astype("datetime64[D]").astype(np.int64) + 3) % 7
+    return np.bincount(hours, minlength=24), np.bincount(weekdays, minlength=7)
+
+
+def _threat_levels(emails: List[Dict]) -> np.ndarray:
+    """Bestimmt die Bedrohungslevel aller E-Mails in einem Aufruf"""
+    return classify_threat_levels(
+        np.fromiter((email["score"] for email in emails), dtype=np.float64, count=len(emails))
+    )
+
+
+def _excel_value(value):
+    """Listen und andere Container werden wie von pandas als Text geschrieben"""
+    return str(value) if isinstance(value, (list, tuple, dict, set)) else value
 
 
 class ReportGenerator:
@@ -21,9 +67,13 @@ class ReportGenerator:
             os.makedirs(output_dir)
 
     def create_pdf_report(
-        self, emails: List[Dict], period: str = "daily"
+        self, emails: List[Dict], period: str = "daily", levels: Optional[np.ndarray] = None
     ) -> str:
-        """Erstellt einen PDF-Bericht über analysierte E-Mails."""
+        """Erstellt einen PDF-Bericht über analysierte E-Mails.
+
+        ``levels`` kann bereits bestimmte Bedrohungslevel (siehe
+        :func:`classify_threat_levels`) übergeben; sonst werden sie berechnet.
+        """
         try:
             pdf = FPDF()
             pdf.add_page()
@@ -50,10 +100,9 @@ class ReportGenerator:
             pdf.ln(10)
 
             # Zusammenfassung
-            threat_levels = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
-            for email in emails:
-                level = get_threat_level(email["score"])
-                threat_levels[level] += 1
+            if levels is None:
+                levels = _threat_levels(emails)
+            threat_levels = dict(zip(THREAT_LEVEL_NAMES, np.bincount(levels, minlength=3).tolist()))
 
             pdf.set_font("Arial", "B", 14)
             pdf.cell(0, 10, "Zusammenfassung", ln=True)
@@ -84,7 +133,9 @@ class ReportGenerator:
             pdf.cell(0, 10, 'Detaillierte Auflistung', ln=True)
             pdf.set_font('Arial', '', 10)
 
-            for email in emails:
+            # Einzelne Zellen statt eines multi_cell-Blocks je E-Mail: fpdf 1.7
+            # bricht multi_cell zeichenweise um, was hier langsamer ist
+            for email, level in zip(emails, levels):
                 pdf.cell(
                     0,
                     10,
@@ -95,7 +146,7 @@ class ReportGenerator:
                 pdf.cell(
                     0,
                     10,
-                    f"Risiko: {get_threat_level(email['score'])}",
+                    f"Risiko: {THREAT_LEVEL_NAMES[level]}",
                     ln=True,
                 )
                 if email.get("indicators"):
@@ -118,14 +169,28 @@ class ReportGenerator:
             logging.error(f"Fehler bei der PDF-Erstellung: {str(e)}")
             return None
 
-    def create_excel_report(self, emails: List[Dict]) -> str:
-        """Erstellt einen Excel-Bericht mit detaillierten Analysedaten."""
-        try:
-            df = pd.DataFrame(emails)
+    def create_excel_report(self, emails: List[Dict], levels: Optional[np.ndarray] = None) -> str:
+        """Erstellt einen Excel-Bericht mit detaillierten Analysedaten.
 
-            # Zusätzliche Statistiken berechnen
-            df["threat_level"] = df["score"].apply(get_threat_level)
-            df['date'] = pd.to_datetime(df['timestamp'])
+        Die Zeilen werden direkt aus den E-Mails geschrieben; ``xlsxwriter``
+        läuft im ``constant_memory``-Modus und hält damit nur die aktuelle
+        Zeile im Speicher statt der gesamten Tabelle. ``levels`` wie bei
+        :meth:`create_pdf_report`.
+        """
+        if xlsxwriter is None:
+            logging.error("Fehler bei der Excel-Erstellung: xlsxwriter ist nicht installiert")
+            return None
+
+        try:
+            # Bedrohungslevel für alle E-Mails gemeinsam bestimmen
+            if levels is None:
+                levels = _threat_levels(emails)
+            level_counts = np.bincount(levels, minlength=3).tolist()
+            # Spalten in der Reihenfolge ihres ersten Auftretens; Level und Datum werden angehängt
+            columns = [
+                key for key in dict.fromkeys(chain.from_iterable(emails))
+                if key not in ("threat_level", "date")
+            ]
 
             # Excel erstellen
             filename = os.path.join(
@@ -133,33 +198,36 @@ class ReportGenerator:
                 f"mail_analysis_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
             )
 
-            with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
+            workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+            try:
+                date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+
                 # Haupttabelle
-                df.to_excel(
-                    writer,
-                    sheet_name="Detailed Analysis",
-                    index=False,
-                )
+                worksheet = workbook.add_worksheet("Detailed Analysis")
+                level_col, date_col = len(columns), len(columns) + 1
+                worksheet.write_row(0, 0, columns + ["threat_level", "date"])
+                for row, (email, level) in enumerate(zip(emails, levels), start=1):
+                    for col, key in enumerate(columns):
+                        value = email.get(key)
+                        if value is not None:
+                            worksheet.write(row, col, _excel_value(value))
+                    worksheet.write_string(row, level_col, THREAT_LEVEL_NAMES[level])
+                    if email.get("timestamp"):
+                        timestamp = datetime.fromisoformat(email["timestamp"]).replace(tzinfo=None)
+                        worksheet.write_datetime(row, date_col, timestamp, date_format)
 
                 # Zusammenfassung
-                summary = pd.DataFrame({
-                    'Metric': [
-                        'Total Emails',
-                        'High Risk',
-                        'Medium Risk',
-                        'Low Risk',
-                    ],
-                    'Count': [
-                        len(df),
-                        len(df[df['threat_level'] == 'HIGH']),
-                        len(df[df['threat_level'] == 'MEDIUM']),
-                        len(df[df['threat_level'] == 'LOW']),
-                    ],
-                })
-                summary.to_excel(writer, sheet_name='Summary', index=False)
+                summary = workbook.add_worksheet('Summary')
+                summary.write_row(0, 0, ['Metric', 'Count'])
+                for row, (metric, count) in enumerate((
+                    ('Total Emails', len(emails)),
+                    ('High Risk', level_counts[2]),
+                    ('Medium Risk', level_counts[1]),
+                    ('Low Risk', level_counts[0]),
+                ), start=1):
+                    summary.write_row(row, 0, [metric, count])
 
                 # Grafiken erstellen
-                workbook = writer.book
                 worksheet = workbook.add_worksheet('Charts')
 
                 # Bedrohungslevel-Verteilung
@@ -172,6 +240,8 @@ class ReportGenerator:
                     }
                 )
                 worksheet.insert_chart('B2', chart)
+            finally:
+                workbook.close()
 
             return filename
 
@@ -179,8 +249,17 @@ class ReportGenerator:
             logging.error(f"Fehler bei der Excel-Erstellung: {str(e)}")
             return None
 
-    def create_statistical_analysis(self, emails: List[Dict]) -> Dict:
-        """Erstellt eine statistische Analyse der E-Mail-Daten"""
+    def create_statistical_analysis(
+        self, emails: List[Dict], levels: Optional[np.ndarray] = None, timestamps: Optional[np.ndarray] = None
+    ) -> Dict:
+        """Erstellt eine statistische Analyse der E-Mail-Daten.
+
+        Indikatoren, Domains und Anhänge werden mit ``Counter`` in je einem
+        Durchlauf gezählt; Bedrohungslevel und Zeitstempel werden für alle
+        E-Mails gemeinsam ausgewertet. ``levels`` wie bei
+        :meth:`create_pdf_report`; ``timestamps`` kann die bereits geparsten
+        Zeitstempel aller E-Mails als ``datetime64``-Array übergeben.
+        """
         try:
             stats = {
                 'total_emails': len(emails),
@@ -195,33 +274,37 @@ class ReportGenerator:
                 'hourly_distribution': {str(i): 0 for i in range(24)},
                 'weekly_distribution': {str(i): 0 for i in range(7)}
             }
+            if not emails:
+                return stats
+
+            # Bedrohungslevel
+            if levels is None:
+                levels = _threat_levels(emails)
+            counts = np.bincount(levels, minlength=len(THREAT_LEVEL_NAMES))
+            stats["threat_levels"] = {"HIGH": int(counts[2]), "MEDIUM": int(counts[1]), "LOW": int(counts[0])}
+
+            # Indikatoren
+            stats['common_indicators'] = dict(
+                Counter(chain.from_iterable(email.get('indicators', ()) for email in emails))
+            )
+
+            # Absender-Domains
+            stats['sender_domains'] = dict(Counter(email['sender'].rpartition('@')[2] for email in emails))
 
-            for email in emails:
-                # Bedrohungslevel
-                level = get_threat_level(email["score"])
-                stats["threat_levels"][level] += 1
-
-                # Indikatoren
-                for indicator in email.get('indicators', []):
-                    stats['common_indicators'][indicator] = \
-                        stats['common_indicators'].get(indicator, 0) + 1
-
-                # Absender-Domains
-                domain = email['sender'].split('@')[-1]
-                stats['sender_domains'][domain] = \
-                    stats['sender_domains'].get(domain, 0) + 1
-
-                # Anhänge
-                for attachment in email.get('attachments', []):
-                    ext = os.path.splitext(attachment)[1]
-                    stats['attachment_types'][ext] = \
-                        stats['attachment_types'].get(ext, 0) + 1
-
-                # Zeitliche Verteilung
-                if 'timestamp' in email:
-                    dt = datetime.fromisoformat(email['timestamp'])
-                    stats['hourly_distribution'][str(dt.hour)] += 1
-                    stats['weekly_distribution'][str(dt.weekday())] += 1
+            # Anhänge; die Endung wird je eindeutigem Dateinamen einmal bestimmt
+            extensions = Counter()
+            for name, count in Counter(
+                chain.from_iterable(email.get('attachments', ()) for email in emails)
+            ).items():
+                extensions[os.path.splitext(name)[1]] += count
+            stats['attachment_types'] = dict(extensions)
+
+            # Zeitliche Verteilung
+            if timestamps is None:
+                timestamps = _parse_timestamps([email['timestamp'] for email in emails if 'timestamp' in email])
+            hours, weekdays = _hour_and_weekday_counts(timestamps)
+            stats['hourly_distribution'] = {str(hour): int(count) for hour, count in enumerate(hours)}
+            stats['weekly_distribution'] = {str(day): int(count) for day, count in enumerate(weekdays)}
 
             return stats
 
@@ -235,8 +318,8 @@ class ReportGenerator:
             # Lade gespeicherte E-Mail-Daten
             data_file = os.path.join(self.output_dir, 'email_data.json')
             if os.path.exists(data_file):
-                with open(data_file, 'r') as f:
-                    all_emails = json.load(f)
+                with open(data_file, 'rb') as f:
+                    all_emails = loads(f.read())
 
                 # Filtere nach Zeitraum
                 now = datetime.now()
@@ -245,25 +328,28 @@ class ReportGenerator:
                 else:  # weekly
                     start_date = now - timedelta(days=7)
 
-                filtered_emails = [
-                    email for email in all_emails
-                    if datetime.fromisoformat(email['timestamp']) >= start_date
-                ]
+                # Zeitstempel einmal parsen und für Filter und Statistik nutzen
+                timestamps = _parse_timestamps([email['timestamp'] for email in all_emails])
+                selected = np.flatnonzero(timestamps >= np.datetime64(start_date))
+                filtered_emails = [all_emails[i] for i in selected]
 
-                # Generiere Berichte
-                self.create_pdf_report(filtered_emails, period)
-                self.create_excel_report(filtered_emails)
+                # Generiere Berichte; die Bedrohungslevel werden nur einmal bestimmt
+                levels = _threat_levels(filtered_emails)
+                self.create_pdf_report(filtered_emails, period, levels=levels)
+                self.create_excel_report(filtered_emails, levels=levels)
 
                 # Erstelle statistische Analyse
-                stats = self.create_statistical_analysis(filtered_emails)
+                stats = self.create_statistical_analysis(
+                    filtered_emails, levels=levels, timestamps=timestamps[selected]
+                )
                 if stats:
                     date_str = datetime.now().strftime('%Y%m%d')
                     stats_file = os.path.join(
                         self.output_dir,
                         f"statistics_{period}_{date_str}.json",
                     )
-                    with open(stats_file, 'w') as f:
-                        json.dump(stats, f, indent=2)
+                    with open(stats_file, 'wb') as f:
+                        f.write(dumps(stats, indent=True))
 
         except Exception as e:
             logging.error(
@@ -1,25 +1,36 @@
 """Automatischer Report-Scheduler für periodische Berichtserstellung."""
 
-import time
 import schedule
 import threading
 import logging
 from analyzer.report_generator import ReportGenerator
 import configparser
 
+# Längste Wartezeit am Stück, damit Uhrumstellungen spätestens dann auffallen
+MAX_IDLE_SECONDS = 3600
+
 
 class ReportScheduler:
     def __init__(self):
         self.config = configparser.ConfigParser()
         self.config.read('configuration.ini')
+        self._load_settings()
         self.report_generator = ReportGenerator()
         self.running = False
         self.thread = None
+        # Eigener Zeitplan statt des globalen Schedulers von ``schedule``
+        self._scheduler = schedule.Scheduler()
+        self._lock = threading.Lock()
+        # Weckt die Hauptschleife bei stop() und reload_config() vorzeitig
+        self._wakeup = threading.Event()
 
     def start(self):
         """Startet den Scheduler in einem separaten Thread"""
         if not self.running:
             self.running = True
+            self._wakeup.clear()
+            with self._lock:
+                self._schedule_jobs()
             self.thread = threading.Thread(target=self._run_scheduler)
             self.thread.daemon = True
             self.thread.start()
@@ -28,33 +39,53 @@ class ReportScheduler:
     def stop(self):
         """Stoppt den Scheduler"""
         self.running = False
+        self._wakeup.set()
         if self.thread:
             self.thread.join()
+            self.thread = None
             logging.info("Report-Scheduler gestoppt")
 
-    def _run_scheduler(self):
-        """Hauptschleife des Schedulers"""
+    def _load_settings(self):
+        """Übernimmt die Berichtseinstellungen aus der Konfiguration"""
+        self._daily_reports = self.config.getboolean('REPORTS', 'daily_reports', fallback=False)
+        self._weekly_reports = self.config.getboolean('REPORTS', 'weekly_reports', fallback=False)
+
+    def _schedule_jobs(self):
+        """Plant die Berichte gemäß Konfiguration ein"""
+        self._scheduler.clear()
+
         # Tägliche Berichte um 23:00 Uhr
-        if self.config.getboolean('REPORTS', 'daily_reports', fallback=False):
-            schedule.every().day.at("23:00").do(
+        if self._daily_reports:
+            self._scheduler.every().day.at("23:00").do(
                 self.report_generator.generate_periodic_report,
                 period='daily'
             )
 
         # Wöchentliche Berichte jeden Sonntag um 23:30 Uhr
-        if self.config.getboolean('REPORTS', 'weekly_reports', fallback=False):
-            schedule.every().sunday.at("23:30").do(
+        if self._weekly_reports:
+            self._scheduler.every().sunday.at("23:30").do(
                 self.report_generator.generate_periodic_report,
                 period='weekly'
             )
 
+    def _run_scheduler(self):
+        """Hauptschleife des Schedulers.
+
+        Schläft bis zum nächsten fälligen Bericht statt minütlich zu prüfen.
+        """
         while self.running:
-            schedule.run_pending()
-            time.sleep(60)  # Prüfe jede Minute
+            with self._lock:
+                self._scheduler.run_pending()
+                delay = self._scheduler.idle_seconds
+            timeout = MAX_IDLE_SECONDS if delay is None else min(max(delay, 0), MAX_IDLE_SECONDS)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
 
     def reload_config(self):
         """Lädt die Konfiguration neu und aktualisiert den Zeitplan"""
         self.config.read('configuration.ini')
-        schedule.clear()
-        if self.running:
-            self._run_scheduler()
+        self._load_settings()
+        with self._lock:
+            self._schedule_jobs()
+        # Die laufende Hauptschleife berechnet die Wartezeit neu
+        self._wakeup.set()
@@ -0,0 +1,49 @@
+"""JSON-(De-)Serialisierung für persistierte Analysezustände.
+
+Verwendet ``orjson``, sofern verfügbar, und fällt sonst auf das
+Standardmodul ``json`` zurück. Beide Varianten arbeiten mit ``bytes``, damit
+Dateien unabhängig vom Backend binär gelesen und geschrieben werden können.
+"""
+import json
+from typing import Any, Union
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    import orjson
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parst ein JSON-Dokument.
+
+    Args:
+        data: JSON-Text als ``bytes`` oder ``str``.
+
+    Returns:
+        Das deserialisierte Python-Objekt.
+
+    Raises:
+        ValueError: Wenn ``data`` kein gültiges JSON ist.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialisiert ein Objekt als UTF-8-kodiertes JSON.
+
+    Args:
+        obj: Zu serialisierendes Objekt.
+        indent: Bei ``True`` wird mit zwei Leerzeichen eingerückt.
+
+    Returns:
+        JSON-Dokument als ``bytes``.
+    """
+    if orjson is not None:
+        # NumPy-Skalare (z. B. aus ``np.mean``) wie beim Standardmodul zulassen
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
@@ -2,10 +2,18 @@
 Threat Analyzer Komponente
 Analysiert E-Mails auf verschiedene Bedrohungsindikatoren mit KI-Unterstützung
 """
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+import os
 import re
 import logging
+import threading
 from urllib.parse import urlparse
+from .keyword_dfa import KeywordDFA, njit
+from .keyword_matcher import KeywordMatcher
 from .ml_analyzer import MLAnalyzer
 from .threat_intelligence import ThreatIntelligence
 from .context_analyzer import ContextAwareAnalyzer
@@ -20,59 +28,163 @@ from config.settings import (
     SCORING_WEIGHTS,
 )
 
+URGENCY_INDICATORS = ('sofort', 'dringend', 'eilig', 'wichtig', 'warnung', 'jetzt')
+KEYWORDS_BY_RISK = tuple(
+    (risk_level, tuple(kw.lower() for kw in keywords))
+    for risk_level, keywords in SUSPICIOUS_KEYWORDS.items()
+)
+SUBJECT_KEYWORD_LABELS = {
+    'high_risk': "Hochrisiko-Schlüsselwort im Betreff",
+    'medium_risk': "Mittleres Risiko-Schlüsselwort im Betreff",
+    'low_risk': "Niedrigrisiko-Schlüsselwort im Betreff",
+}
+# Dateiendung -> Risikostufe; von niedrig nach hoch eingetragen, damit bei
+# Mehrfachnennung die höchste Stufe gilt
+EXTENSION_RISK = {
+    ext.lower(): risk_level
+    for risk_level, extensions in reversed(SUSPICIOUS_EXTENSIONS.items())
+    for ext in extensions
+}
+ATTACHMENT_LABELS = {
+    'high_risk': "Hochrisiko-Anhang",
+    'medium_risk': "Mittleres Risiko-Anhang",
+    'low_risk': "Niedrigrisiko-Anhang",
+}
+# Teilstrings statt ganzer Wörter, damit auch Komposita wie "Bankkonto" oder
+# "Gewinnspiel" erkannt werden
+PHISHING_KEYWORDS = ('bank', 'konto', 'password', 'anmelden')
+SCAM_KEYWORDS = ('gewinn', 'prize', 'lottery')
+# Als Tupel prüft ``str.endswith`` alle Endungen in einem C-Aufruf; verglichen
+# wird nur das Ende des Hostnamens, damit etwa ".pro" nicht "x.promo.de" trifft
+SUSPICIOUS_TLD_SUFFIXES = tuple(
+    tld.lower() if tld.startswith('.') else f".{tld.lower()}" for tld in SUSPICIOUS_TLD
+)
+# Alle URL-Muster als eine Alternation, damit jeder Text nur einmal durchsucht wird
+URL_RE = re.compile("|".join(f"(?:{pattern})" for pattern in SUSPICIOUS_URL_PATTERNS))
+SENDER_ADDRESS_RE = re.compile(r'<?([\w\.-]+@[\w\.-]+\.\w+)>?')
+# Threads für nebenläufige Teilanalysen (ML, Kontext, Threat Intelligence)
+ANALYSIS_WORKERS = 4
+# Schlüsselwörter aller Risikostufen und Dringlichkeitsbegriffe werden in
+# einem einzigen Textdurchlauf gesucht
+KEYWORD_MATCHER = (KeywordDFA if njit is not None else KeywordMatcher)(
+    chain(chain.from_iterable(keywords for _, keywords in KEYWORDS_BY_RISK), URGENCY_INDICATORS)
+)
+
+
+@lru_cache(maxsize=4096)
+def _url_domain(url: str) -> Tuple[str, str]:
+    """Liefert Netloc und Hostnamen einer URL; wiederkehrende URLs werden nur einmal zerlegt"""
+    parsed = urlparse(url if '://' in url else 'http://' + url)
+    return parsed.netloc.lower(), parsed.hostname or ''
+
+
+@dataclass(slots=True)
+class AnalysisContext:
+    """Zwischenergebnisse einer einzelnen E-Mail-Analyse.
+
+    Jeder Aufruf von :meth:`ThreatAnalyzer.analyze_email` erhält einen
+    eigenen Kontext; die Prüfmethoden schreiben ihre Funde hierhin statt in
+    Attribute des Analyzers.
+
+    Attributes:
+        indicators: Gefundene Bedrohungsindikatoren in Prüfreihenfolge.
+        urls: Im Text gefundene URLs.
+    """
+
+    indicators: List[str] = field(default_factory=list)
+    urls: Set[str] = field(default_factory=set)
+
 
 class ThreatAnalyzer:
+    # Funde einer Analyse liegen im AnalysisContext, der gemeinsame Zustand der
+    # Teilanalysen ist durch ``_state_lock`` geschützt; mehrere E-Mails dürfen
+    # daher gleichzeitig analysiert werden
+    thread_safe = True
+
     def __init__(self):
-        self.threat_score = 0.0
-        self.threat_indicators = []
-        self.urls_found = set()
         self.ml_analyzer = MLAnalyzer()
         self.threat_intel = ThreatIntelligence()
         self.context_analyzer = ContextAwareAnalyzer()
         self.cluster_analyzer = ThreatClusterAnalyzer()
         self.proactive_defense = ProactiveThreatDefense()
+        self._executor = None
+        # Schützt Analyse-Cache, Cluster-Puffer und Trend-Historie
+        self._state_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Clustert noch gepufferte E-Mails und gibt den Thread-Pool der Teilanalysen frei"""
+        with self._state_lock:
+            cluster_result = self.cluster_analyzer.flush()
+        if cluster_result.get('new_patterns'):
+            logging.info(f"Neue Bedrohungsmuster erkannt: {len(cluster_result['new_patterns'])}")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Erzeugt den Thread-Pool beim ersten Bedarf"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="threat-analysis")
+        return self._executor
 
     def analyze_email(self, email_data: Dict, user_context: Optional[Dict] = None) -> Dict:
         """Analysiert eine E-Mail auf verschiedene Bedrohungsindikatoren"""
-        self.threat_score = 0.0
-        self.threat_indicators = []
-        self.urls_found.clear()
+        ctx = AnalysisContext()
+
+        # Felder einmal auslesen; Betreff und Text nur einmal kleinschreiben
+        sender = email_data.get('sender', '')
+        subject = email_data.get('subject', '')
+        body = email_data.get('body', '')
+        attachments = email_data.get('attachments', [])
+        subject_lower = subject.lower()
+        body_lower = body.lower()
+
+        # ML- und Kontextanalyse laufen im Hintergrund, während die Regeln
+        # geprüft werden; ihre Indikatoren werden erst danach übernommen
+        executor = self._get_executor()
+        ml_future = executor.submit(self.ml_analyzer.analyze_email, email_data)
+        context_future = (
+            executor.submit(self._analyze_with_context, email_data, user_context)
+            if user_context else None
+        )
 
         # Traditionelle regelbasierte Analyse
-        sender_score = self._check_sender(email_data.get('sender', ''))
-        subject_score = self._check_subject(email_data.get('subject', ''))
-        body_score = self._check_body(email_data.get('body', ''))
-        attachment_score = self._check_attachments(email_data.get('attachments', []))
+        sender_score = self._check_sender(sender, ctx)
+        subject_score = self._check_subject(subject, ctx, subject_lower)
+        body_score = self._check_body(body, ctx, body_lower)
+        attachment_score = self._check_attachments(attachments, ctx)
 
         # ML-basierte Analyse
-        ml_result = self.ml_analyzer.analyze_email(email_data)
+        ml_result = ml_future.result()
         ml_score = ml_result.get('ml_score', 0.0)
         ml_confidence = ml_result.get('confidence', 0.0)
 
         # Kontextbasierte Analyse
         if user_context:
-            context_result = self.context_analyzer.analyze_with_context(email_data, user_context)
+            context_result = context_future.result()
             context_score = context_result.get('context_score', 0.0)
-            self.threat_indicators.extend(context_result.get('role_specific_threats', []))
+            ctx.indicators.extend(context_result.get('role_specific_threats', []))
         else:
             context_score = 0.0
 
-        # Cluster-basierte Analyse
-        cluster_result = self.cluster_analyzer.analyze_email_patterns([email_data])
-        if cluster_result.get('new_patterns'):
-            self.threat_indicators.append("Neues Bedrohungsmuster erkannt")
-            cluster_score = 2.0
-        else:
-            cluster_score = 0.0
-
-        # Proaktive Verteidigung
-        proactive_result = self.proactive_defense.analyze_trends([{
-            'type': self._determine_threat_type(email_data),
-            'score': (sender_score + subject_score + body_score + attachment_score) / 4,
-            'indicators': self.threat_indicators.copy(),
-            'target_department': user_context.get('department') if user_context else None,
-            'target_role': user_context.get('role') if user_context else None
-        }])
+        with self._state_lock:
+            # Cluster-basierte Analyse; liefert nur bei vollem Stapel ein Ergebnis
+            cluster_result = self.cluster_analyzer.add_emails([email_data])
+            if cluster_result.get('new_patterns'):
+                ctx.indicators.append("Neues Bedrohungsmuster erkannt")
+                cluster_score = 2.0
+            else:
+                cluster_score = 0.0
+
+            # Proaktive Verteidigung
+            proactive_result = self.proactive_defense.analyze_trends([{
+                'type': self._determine_threat_type(email_data, subject_lower, body_lower),
+                'score': (sender_score + subject_score + body_score + attachment_score) / 4,
+                # ThreatRecord legt ohnehin eine eigene Liste an; keine zusätzliche Kopie
+                'indicators': ctx.indicators,
+                'target_department': user_context.get('department') if user_context else None,
+                'target_role': user_context.get('role') if user_context else None
+            }])
 
         # Gewichtete Kombination aller Scores
         weights = {
@@ -83,7 +195,7 @@ class ThreatAnalyzer:
             'proactive': 0.1
         }
 
-        self.threat_score = (
+        threat_score = (
             (sender_score + subject_score + body_score + attachment_score) / 4 * weights['rule_based'] +
             ml_score * weights['ml'] +
             context_score * weights['context'] +
@@ -91,146 +203,176 @@ class ThreatAnalyzer:
         ) / sum(weights.values())
 
         # Normalisierung auf 0-10 Skala
-        self.threat_score = min(10.0, self.threat_score * 10)
+        threat_score = min(10.0, threat_score * 10)
 
         # Füge proaktive Empfehlungen hinzu
         if proactive_result.get('recommendations'):
-            self.threat_indicators.extend(proactive_result['recommendations'])
+            ctx.indicators.extend(proactive_result['recommendations'])
 
         return {
-            'score': round(self.threat_score, 2),
-            'level': get_threat_level(self.threat_score, use_icon=True),
-            'indicators': self.threat_indicators,
-            'analyzed_urls': list(self.urls_found),
+            'score': round(threat_score, 2),
+            'level': get_threat_level(threat_score, use_icon=True),
+            'indicators': ctx.indicators,
+            'analyzed_urls': list(ctx.urls),
             'ml_confidence': ml_confidence,
             'context_analysis': context_result if user_context else None,
             'cluster_analysis': cluster_result,
             'trend_analysis': proactive_result
         }
 
-    def _determine_threat_type(self, email_data: Dict) -> str:
-        """Bestimmt den Typ der Bedrohung"""
+    def _analyze_with_context(self, email_data: Dict, user_context: Dict) -> Dict:
+        """Kontextanalyse unter ``_state_lock``, da sie den gemeinsamen Ergebnis-Cache ändert"""
+        with self._state_lock:
+            return self.context_analyzer.analyze_with_context(email_data, user_context)
+
+    def _determine_threat_type(
+        self, email_data: Dict, subject_lower: Optional[str] = None, body_lower: Optional[str] = None
+    ) -> str:
+        """Bestimmt den Typ der Bedrohung.
+
+        Bereits kleingeschriebener Betreff und Text können übergeben werden,
+        damit sie nicht erneut umgewandelt werden.
+        """
+        if subject_lower is None:
+            subject_lower = email_data.get('subject', '').lower()
+        if body_lower is None:
+            body_lower = email_data.get('body', '').lower()
+
         if any(ext in str(email_data.get('attachments', [])) for ext in SUSPICIOUS_EXTENSIONS['high_risk']):
             return "malware"
-        elif any(kw in email_data.get('body', '').lower() for kw in ['bank', 'konto', 'password', 'anmelden']):
+        elif any(kw in body_lower for kw in PHISHING_KEYWORDS):
             return "phishing"
-        elif any(kw in email_data.get('subject', '').lower() for kw in ['gewinn', 'prize', 'lottery']):
+        elif any(kw in subject_lower for kw in SCAM_KEYWORDS):
             return "scam"
         return "suspicious"
 
-    def _perform_threat_intel_analysis(self, email_data: Dict) -> float:
-        """Führt eine umfassende Threat Intelligence Analyse durch"""
+    def _perform_threat_intel_analysis(self, email_data: Dict, ctx: AnalysisContext) -> float:
+        """Führt eine umfassende Threat Intelligence Analyse durch.
+
+        Die voneinander unabhängigen, netzwerkgebundenen Abfragen laufen
+        nebenläufig; ausgewertet werden sie anschließend in fester
+        Reihenfolge.
+        """
         score = 0.0
+        subject = email_data.get('subject', '')
+        body = email_data.get('body', '')
+        sender = email_data.get('sender', '')
+        domain = sender.split('@')[1] if '@' in sender else None
+        urls = self._extract_urls(body)
 
-        # Lokale KI-Analyse
-        local_ai_result = self.threat_intel.analyze_text_local(
-            f"{email_data.get('subject', '')} {email_data.get('body', '')}"
+        executor = self._get_executor()
+        local_ai_future = executor.submit(self.threat_intel.analyze_text_local, f"{subject} {body}")
+        reputation_future = (
+            executor.submit(self.threat_intel.check_sender_reputation, domain) if domain else None
         )
+        url_future = executor.submit(self.threat_intel.check_urls, urls) if urls else None
+        spam_future = executor.submit(self.threat_intel.get_spam_score, f"Subject: {subject}\n\n{body}")
+
+        # Lokale KI-Analyse
+        local_ai_result = local_ai_future.result()
         if local_ai_result.get('spam_score', 0) > 0.7:
             score += 2.0
-            self.threat_indicators.append("Hohe Spam-Wahrscheinlichkeit (Lokale KI)")
+            ctx.indicators.append("Hohe Spam-Wahrscheinlichkeit (Lokale KI)")
 
         # Domain-Reputation prüfen
-        sender = email_data.get('sender', '')
-        if '@' in sender:
-            domain = sender.split('@')[1]
-            reputation = self.threat_intel.check_sender_reputation(domain)
+        if reputation_future is not None:
+            reputation = reputation_future.result()
             if reputation.get('spamhaus') == 'blacklisted' or reputation.get('surbl') == 'blacklisted':
                 score += 3.0
-                self.threat_indicators.append(f"Domain {domain} ist auf Blacklists")
+                ctx.indicators.append(f"Domain {domain} ist auf Blacklists")
 
         # URLs überprüfen
-        urls = self._extract_urls(email_data.get('body', ''))
-        if urls:
-            url_results = self.threat_intel.check_urls(urls)
+        if url_future is not None:
+            url_results = url_future.result()
             for url, result in url_results.items():
                 if result.get('safe_browsing') == 'suspicious':
                     score += 2.5
-                    self.threat_indicators.append(f"Verdächtige URL gefunden: {url}")
+                    ctx.indicators.append(f"Verdächtige URL gefunden: {url}")
                 if result.get('phishtank') == 'suspicious':
                     score += 2.0
-                    self.threat_indicators.append(f"Mögliche Phishing-URL: {url}")
+                    ctx.indicators.append(f"Mögliche Phishing-URL: {url}")
 
         # SpamAssassin Score
-        spam_score = self.threat_intel.get_spam_score(
-            f"Subject: {email_data.get('subject', '')}\n\n{email_data.get('body', '')}"
-        )
+        spam_score = spam_future.result()
         if spam_score > 5.0:
             score += 1.5
-            self.threat_indicators.append(f"Hoher SpamAssassin Score: {spam_score}")
+            ctx.indicators.append(f"Hoher SpamAssassin Score: {spam_score}")
 
         return min(10.0, score)  # Normalisiere auf max 10
 
-    def _check_sender(self, sender: str) -> float:
+    def _check_sender(self, sender: str, ctx: AnalysisContext) -> float:
         """Überprüft die Absenderadresse auf verdächtige Muster"""
         score = 0.0
 
         if not sender:
-            self.threat_indicators.append("Fehlender Absender")
+            ctx.indicators.append("Fehlender Absender")
             return SCORING_WEIGHTS['sender']['suspicious_domain']
 
         # E-Mail-Adresse extrahieren
-        email_match = re.search(r'<?([\w\.-]+@[\w\.-]+\.\w+)>?', sender)
+        email_match = SENDER_ADDRESS_RE.search(sender)
         if not email_match:
-            self.threat_indicators.append("Ungültiges E-Mail-Format")
+            ctx.indicators.append("Ungültiges E-Mail-Format")
             return SCORING_WEIGHTS['sender']['suspicious_domain']
 
         email = email_match.group(1).lower()
         domain = email.split('@')[1]
 
         # Überprüfe auf verdächtige Domain-Endungen
-        if any(tld in domain for tld in SUSPICIOUS_TLD):
-            self.threat_indicators.append(f"Verdächtige Domain-Endung: {domain}")
+        if domain.endswith(SUSPICIOUS_TLD_SUFFIXES):
+            ctx.indicators.append(f"Verdächtige Domain-Endung: {domain}")
             score += SCORING_WEIGHTS['sender']['suspicious_domain']
 
         # Überprüfe auf gefälschte Anzeigenamen
         display_name = sender.split('<')[0].strip() if '<' in sender else ''
         if display_name and any(keyword in display_name.lower() for keyword in SUSPICIOUS_KEYWORDS['high_risk']):
-            self.threat_indicators.append("Möglicherweise gefälschter Anzeigename")
+            ctx.indicators.append("Möglicherweise gefälschter Anzeigename")
             score += SCORING_WEIGHTS['sender']['spoofed_display_name']
 
         return score
 
-    def _check_subject(self, subject: str) -> float:
-        """Überprüft den Betreff auf verdächtige Schlüsselwörter"""
+    def _check_subject(self, subject: str, ctx: AnalysisContext, subject_lower: Optional[str] = None) -> float:
+        """Überprüft den Betreff auf verdächtige Schlüsselwörter.
+
+        Args:
+            subject: Betreff der E-Mail.
+            ctx: Kontext, der die gefundenen Indikatoren aufnimmt.
+            subject_lower: Optional bereits kleingeschriebener Betreff.
+        """
         score = 0.0
         if not subject:
             return score
 
-        subject_lower = subject.lower()
+        found = KEYWORD_MATCHER.find(subject.lower() if subject_lower is None else subject_lower)
 
         # Überprüfe verschiedene Risikostufen von Schlüsselwörtern
-        for keyword in SUSPICIOUS_KEYWORDS['high_risk']:
-            if keyword in subject_lower:
-                self.threat_indicators.append(f"Hochrisiko-Schlüsselwort im Betreff: {keyword}")
-                score += SCORING_WEIGHTS['subject']['high_risk_keyword']
-
-        for keyword in SUSPICIOUS_KEYWORDS['medium_risk']:
-            if keyword in subject_lower:
-                self.threat_indicators.append(f"Mittleres Risiko-Schlüsselwort im Betreff: {keyword}")
-                score += SCORING_WEIGHTS['subject']['medium_risk_keyword']
-
-        for keyword in SUSPICIOUS_KEYWORDS['low_risk']:
-            if keyword in subject_lower:
-                self.threat_indicators.append(f"Niedrigrisiko-Schlüsselwort im Betreff: {keyword}")
-                score += SCORING_WEIGHTS['subject']['low_risk_keyword']
+        for risk_level, keywords in KEYWORDS_BY_RISK:
+            for keyword in keywords:
+                if keyword in found:
+                    ctx.indicators.append(f"{SUBJECT_KEYWORD_LABELS[risk_level]}: {keyword}")
+                    score += SCORING_WEIGHTS['subject'][f'{risk_level}_keyword']
 
         return score
 
-    def _check_body(self, body: str) -> float:
-        """Überprüft den E-Mail-Body auf verdächtige Inhalte"""
+    def _check_body(self, body: str, ctx: AnalysisContext, body_lower: Optional[str] = None) -> float:
+        """Überprüft den E-Mail-Body auf verdächtige Inhalte.
+
+        Args:
+            body: Originaltext; URLs werden daraus unverändert extrahiert.
+            ctx: Kontext, der Indikatoren und URLs aufnimmt.
+            body_lower: Optional bereits kleingeschriebener Text.
+        """
         score = 0.0
         if not body:
             return score
 
-        body_lower = body.lower()
+        found = KEYWORD_MATCHER.find(body.lower() if body_lower is None else body_lower)
 
         # Schlüsselwort-Überprüfung
-        for risk_level, keywords in SUSPICIOUS_KEYWORDS.items():
+        for risk_level, keywords in KEYWORDS_BY_RISK:
             for keyword in keywords:
-                if keyword in body_lower:
+                if keyword in found:
                     weight = SCORING_WEIGHTS['body'][f'{risk_level}_keyword']
-                    self.threat_indicators.append(
+                    ctx.indicators.append(
                         f"{risk_level.replace('_', ' ').title()}-Schlüsselwort im Text: {keyword}"
                     )
                     score += weight
@@ -238,17 +380,16 @@ class ThreatAnalyzer:
         # URL-Überprüfung
         urls = self._extract_urls(body)
         if urls:
-            score += self._analyze_urls(urls)
+            score += self._analyze_urls(urls, ctx)
 
         # Dringlichkeitssprache
-        urgency_indicators = ['sofort', 'dringend', 'eilig', 'wichtig', 'warnung', 'jetzt']
-        if any(indicator in body_lower for indicator in urgency_indicators):
-            self.threat_indicators.append("Dringlichkeitssprache im Text")
+        if not found.isdisjoint(URGENCY_INDICATORS):
+            ctx.indicators.append("Dringlichkeitssprache im Text")
             score += SCORING_WEIGHTS['body']['urgent_language']
 
         return score
 
-    def _check_attachments(self, attachments: List[str]) -> float:
+    def _check_attachments(self, attachments: List[str], ctx: AnalysisContext) -> float:
         """Überprüft Anhänge auf verdächtige Dateitypen"""
         score = 0.0
         if not attachments:
@@ -256,57 +397,37 @@ class ThreatAnalyzer:
 
         # Mehrere Anhänge erhöhen das Risiko
         if len(attachments) > 1:
-            self.threat_indicators.append(f"Mehrere Anhänge ({len(attachments)})")
+            ctx.indicators.append(f"Mehrere Anhänge ({len(attachments)})")
             score += SCORING_WEIGHTS['attachments']['multiple_attachments']
 
         for attachment in attachments:
-            attachment_lower = attachment.lower()
-
-            # Überprüfe auf verschiedene Risikostufen von Dateierweiterungen
-            for ext in SUSPICIOUS_EXTENSIONS['high_risk']:
-                if attachment_lower.endswith(ext):
-                    self.threat_indicators.append(f"Hochrisiko-Anhang: {attachment}")
-                    score += SCORING_WEIGHTS['attachments']['high_risk_extension']
-                    break
-
-            for ext in SUSPICIOUS_EXTENSIONS['medium_risk']:
-                if attachment_lower.endswith(ext):
-                    self.threat_indicators.append(f"Mittleres Risiko-Anhang: {attachment}")
-                    score += SCORING_WEIGHTS['attachments']['medium_risk_extension']
-                    break
-
-            for ext in SUSPICIOUS_EXTENSIONS['low_risk']:
-                if attachment_lower.endswith(ext):
-                    self.threat_indicators.append(f"Niedrigrisiko-Anhang: {attachment}")
-                    score += SCORING_WEIGHTS['attachments']['low_risk_extension']
-                    break
+            risk_level = EXTENSION_RISK.get(os.path.splitext(attachment.lower())[1])
+            if risk_level is not None:
+                ctx.indicators.append(f"{ATTACHMENT_LABELS[risk_level]}: {attachment}")
+                score += SCORING_WEIGHTS['attachments'][f'{risk_level}_extension']
 
         return score
 
     def _extract_urls(self, text: str) -> List[str]:
         """Extrahiert URLs aus dem Text"""
-        urls = []
-        for pattern in SUSPICIOUS_URL_PATTERNS:
-            urls.extend(re.findall(pattern, text))
-        return list(set(urls))  # Entferne Duplikate
+        return list(set(URL_RE.findall(text)))  # Entferne Duplikate
 
-    def _analyze_urls(self, urls: List[str]) -> float:
+    def _analyze_urls(self, urls: List[str], ctx: AnalysisContext) -> float:
         """Analysiert gefundene URLs auf Verdächtigkeit"""
         score = 0.0
-        self.urls_found.update(urls)
+        ctx.urls.update(urls)
 
         if len(urls) > 3:
-            self.threat_indicators.append(f"Viele URLs gefunden ({len(urls)})")
+            ctx.indicators.append(f"Viele URLs gefunden ({len(urls)})")
             score += SCORING_WEIGHTS['body']['multiple_urls']
 
         for url in urls:
             try:
-                parsed = urlparse(url if '://' in url else 'http://' + url)
-                domain = parsed.netloc.lower()
+                domain, hostname = _url_domain(url)
 
                 # Überprüfe auf verdächtige TLDs
-                if any(tld in domain for tld in SUSPICIOUS_TLD):
-                    self.threat_indicators.append(f"Verdächtige URL-Domain: {domain}")
+                if hostname.endswith(SUSPICIOUS_TLD_SUFFIXES):
+                    ctx.indicators.append(f"Verdächtige URL-Domain: {domain}")
                     score += SCORING_WEIGHTS['body']['suspicious_url']
 
                 # Optional: URL-Überprüfung gegen Phishing-Datenbanken
@@ -4,31 +4,142 @@ Erkennt automatisch neue Bedrohungsmuster durch Clustering ähnlicher E-Mails
 """
 import numpy as np
 from sklearn.cluster import DBSCAN
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List
-import json
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List
 import os
 
+try:  # pragma: no cover - optionale Abhängigkeit
+    from numba import njit
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    njit = None
+
+from .serialization import dumps, loads
+
+# Dimension der gehashten Merkmalsvektoren für das Clustering
+CLUSTER_HASH_FEATURES = 2 ** 14
+# Anzahl gepufferter E-Mails, ab der ein Clustering-Lauf gestartet wird
+CLUSTER_BATCH_SIZE = 100
+# Höchstalter der ältesten gepufferten E-Mail in Sekunden; danach wird auch ein
+# unvollständiger Stapel geclustert
+CLUSTER_MAX_AGE = 300.0
+# Anzahl der zuletzt erkannten Muster, die in der Historie verbleiben
+CLUSTER_HISTORY_LIMIT = 1000
+# Ab dieser Jaccard-Ähnlichkeit der Indikatoren gilt ein Muster als bekannt
+KNOWN_PATTERN_SIMILARITY = 0.7
+
+
+def _max_jaccard_kernel(new_ids, n_unknown, indptr, data):
+    """Größte Jaccard-Ähnlichkeit zwischen ``new_ids`` und den Mustern der Historie
+
+    Die Indikatoren jedes Musters liegen sortiert und eindeutig in
+    ``data[indptr[k]:indptr[k + 1]]``. ``n_unknown`` zählt neue Indikatoren,
+    die in keinem Muster vorkommen; sie vergrößern nur die Vereinigung.
+    Muster ohne Indikatoren werden übersprungen.
+    """
+    n_new = new_ids.shape[0] + n_unknown
+    best = 0.0
+    if n_new == 0:
+        return best
+    for k in range(indptr.shape[0] - 1):
+        start = indptr[k]
+        end = indptr[k + 1]
+        if start == end:
+            continue
+        i = 0
+        j = start
+        common = 0
+        while i < new_ids.shape[0] and j < end:
+            if new_ids[i] == data[j]:
+                common += 1
+                i += 1
+                j += 1
+            elif new_ids[i] < data[j]:
+                i += 1
+            else:
+                j += 1
+        similarity = common / (n_new + (end - start) - common)
+        if similarity > best:
+            best = similarity
+    return best
+
+
+if njit is not None:
+    _max_jaccard = njit(cache=True)(_max_jaccard_kernel)
+else:
+    _max_jaccard = _max_jaccard_kernel
+
+
+def _pattern_time(pattern: Dict) -> float:
+    """Zeitstempel eines Musters in Epochensekunden; ``nan`` falls er fehlt"""
+    try:
+        return datetime.fromisoformat(pattern["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return float("nan")
+
 
 class ThreatClusterAnalyzer:
-    def __init__(self, storage_dir: str = "models/clusters"):
+    def __init__(self, storage_dir: str = "models/clusters", batch_size: int = CLUSTER_BATCH_SIZE,
+                 max_age: float = CLUSTER_MAX_AGE):
         self.storage_dir = storage_dir
+        self.batch_size = batch_size
+        self.max_age = max_age
         if not os.path.exists(storage_dir):
             os.makedirs(storage_dir)
 
-        self.cluster_history_file = os.path.join(storage_dir, "cluster_history.json")
-        self.vectorizer = TfidfVectorizer(max_features=1000)
+        self.cluster_history_file = os.path.join(storage_dir, "cluster_history.jsonl")
+        self.legacy_history_file = os.path.join(storage_dir, "cluster_history.json")
+        # Zustandslos: kein Vokabular, das je Stapel neu gelernt werden müsste
+        self.vectorizer = HashingVectorizer(
+            n_features=CLUSTER_HASH_FEATURES, alternate_sign=False, norm='l2', dtype=np.float32
+        )
         self.clustering = DBSCAN(
             eps=0.3,          # Maximale Distanz zwischen Samples im Cluster
             min_samples=3,    # Minimale Anzahl von Samples pro Cluster
-            metric='cosine'
+            metric='cosine',
+            n_jobs=-1         # Nachbarschaftssuche auf allen Kernen
         )
 
         self.cluster_history = self._load_cluster_history()
+        self._index_history()
         self.current_clusters = {}
         self.detection_window = timedelta(hours=24)  # Zeitfenster für Clustering
+        # E-Mails, die auf den nächsten Clustering-Lauf warten
+        self._pending_emails: List[Dict] = []
+        # Zeitpunkt (monotone Uhr), seit dem der Puffer nicht mehr leer ist
+        self._pending_since = 0.0
+
+    def add_emails(self, emails: List[Dict]) -> Dict:
+        """Puffert E-Mails und clustert sie stapelweise.
+
+        Ein einzelner Datenpunkt kann mit ``min_samples=3`` nie einen Cluster
+        bilden; deshalb wird erst geclustert, sobald ``batch_size`` E-Mails
+        vorliegen oder die älteste gepufferte E-Mail älter als ``max_age``
+        Sekunden ist.
+
+        Args:
+            emails: Neu analysierte E-Mails.
+
+        Returns:
+            Das Ergebnis von :meth:`analyze_email_patterns` für den
+            geclusterten Stapel oder ein leeres Dictionary, solange weiter
+            gepuffert wird.
+        """
+        now = time.monotonic()
+        if not self._pending_emails:
+            self._pending_since = now
+        self._pending_emails.extend(emails)
+        if len(self._pending_emails) < self.batch_size and now - self._pending_since < self.max_age:
+            return {}
+        return self.flush()
+
+    def flush(self) -> Dict:
+        """Clustert alle gepufferten E-Mails sofort und leert den Puffer"""
+        batch, self._pending_emails = self._pending_emails, []
+        return self.analyze_email_patterns(batch)
 
     def analyze_email_patterns(self, new_emails: List[Dict]) -> Dict:
         """Analysiert neue E-Mails auf Clustering-Muster"""
@@ -36,25 +147,22 @@ class ThreatClusterAnalyzer:
             return {}
 
         try:
-            # Feature-Extraktion
-            email_features = [
-                self._extract_email_features(email)
-                for email in new_emails
-            ]
-
-            # Vektorisierung
-            X = self.vectorizer.fit_transform(email_features)
+            # Feature-Extraktion und Vektorisierung; die Feature-Texte werden
+            # gestreamt statt als Liste vorgehalten
+            X = self.vectorizer.transform(self._extract_email_features(email) for email in new_emails)
 
             # Clustering
             labels = self.clustering.fit_predict(X)
 
-            # Analyse der Cluster
-            clusters = {}
-            for i, label in enumerate(labels):
-                if label != -1:  # Ignoriere Noise-Points
-                    if label not in clusters:
-                        clusters[label] = []
-                    clusters[label].append(new_emails[i])
+            # Analyse der Cluster: Indizes ohne Noise-Points stabil nach Label
+            # sortieren und an den Labelgrenzen aufteilen
+            members = np.flatnonzero(labels != -1)
+            members = members[np.argsort(labels[members], kind="stable")]
+            cluster_labels, starts = np.unique(labels[members], return_index=True)
+            clusters = {
+                label: [new_emails[i] for i in indices]
+                for label, indices in zip(cluster_labels, np.split(members, starts[1:]))
+            }
 
             # Identifiziere neue Bedrohungsmuster
             new_patterns = self._identify_new_patterns(clusters)
@@ -66,7 +174,7 @@ class ThreatClusterAnalyzer:
                 "clusters": clusters,
                 "new_patterns": new_patterns,
                 "total_clusters": len(clusters),
-                "noise_points": list(labels).count(-1)
+                "noise_points": int(np.count_nonzero(labels == -1))
             }
 
         except Exception as e:
@@ -91,10 +199,9 @@ class ThreatClusterAnalyzer:
         for att in attachments:
             features.append(f"attachment_{os.path.splitext(att)[1]}")
 
-        # URLs
+        # URLs, jede nur einmal
         if "analyzed_urls" in email:
-            for url in email["analyzed_urls"]:
-                features.append(f"url_{url}")
+            features.extend(f"url_{url}" for url in dict.fromkeys(email["analyzed_urls"]))
 
         # Bedrohungsindikatoren
         if "indicators" in email:
@@ -109,8 +216,8 @@ class ThreatClusterAnalyzer:
         for cluster_id, emails in clusters.items():
             # Berechne Cluster-Charakteristiken
             common_indicators = self._find_common_indicators(emails)
-            threat_scores = [email.get("score", 0) for email in emails]
-            avg_score = np.mean(threat_scores)
+            # Cluster enthalten nur wenige E-Mails; eine Summe ist günstiger als np.mean
+            avg_score = sum(email.get("score", 0) for email in emails) / len(emails)
 
             # Prüfe ob ähnliches Muster bereits bekannt
             if not self._is_known_pattern(common_indicators):
@@ -133,89 +240,138 @@ class ThreatClusterAnalyzer:
         return new_patterns
 
     def _find_common_indicators(self, emails: List[Dict]) -> Dict:
-        """Findet gemeinsame Indikatoren in einem Cluster"""
-        all_indicators = []
-        domains = []
-        attachments = []
-        urls = []
-
-        for email in emails:
-            all_indicators.extend(email.get("indicators", []))
-
-            if "@" in email.get("sender", ""):
-                domains.append(email["sender"].split("@")[1])
-
-            attachments.extend(email.get("attachments", []))
-            urls.extend(email.get("analyzed_urls", []))
+        """Findet gemeinsame Indikatoren in einem Cluster.
+
+        Anhänge werden nach Dateiendung gezählt, sodass etwa mehrere
+        verschiedene ``.exe``-Dateien als gemeinsamer Anhangstyp gelten.
+        """
+        indicators = Counter(ind for email in emails for ind in email.get("indicators", []))
+        domains = Counter(
+            email["sender"].split("@")[1] for email in emails if "@" in email.get("sender", "")
+        )
+        attachment_types = Counter(
+            os.path.splitext(att)[1] for email in emails for att in email.get("attachments", [])
+        )
+        urls = Counter(url for email in emails for url in email.get("analyzed_urls", []))
 
-        # Finde häufige Elemente
-        from collections import Counter
+        # Mindestanteil der E-Mails, in denen ein Element vorkommen muss
+        majority = len(emails) * 0.5
+        frequent = len(emails) * 0.3
 
         return {
-            "common_indicators": [
-                ind for ind, count in Counter(all_indicators).items()
-                if count >= len(emails) * 0.5  # Mindestens in 50% der E-Mails
-            ],
-            "common_domains": [
-                dom for dom, count in Counter(domains).items()
-                if count >= len(emails) * 0.3
-            ],
-            "common_attachment_types": [
-                os.path.splitext(att)[1] for att, count in Counter(attachments).items()
-                if count >= len(emails) * 0.3
-            ],
-            "common_url_patterns": [
-                url for url, count in Counter(urls).items()
-                if count >= len(emails) * 0.3
-            ]
+            "common_indicators": [ind for ind, count in indicators.items() if count >= majority],
+            "common_domains": [dom for dom, count in domains.items() if count >= frequent],
+            "common_attachment_types": [ext for ext, count in attachment_types.items() if count >= frequent],
+            "common_url_patterns": [url for url, count in urls.items() if count >= frequent],
         }
 
+    def _index_history(self) -> None:
+        """Bereitet die Historie für Musterabgleich und Statistiken auf.
+
+        Die Indikatoren werden als sortierte Ganzzahl-IDs abgelegt: Jedes
+        Muster belegt einen Abschnitt von ``_history_data``, begrenzt durch
+        ``_history_indptr`` (CSR-Format), und ``_indicator_ids`` bildet die
+        Indikatoren auf fortlaufende IDs ab. Die Zeitstempel werden einmal in
+        Epochensekunden (``_history_times``) umgerechnet.
+        """
+        self._indicator_ids: Dict[str, int] = {}
+        indptr = [0]
+        data: List[int] = []
+        self._history_times = np.fromiter(
+            (_pattern_time(pattern) for pattern in self.cluster_history),
+            dtype=np.float64,
+            count=len(self.cluster_history),
+        )
+        for pattern in self.cluster_history:
+            indicators = (pattern.get("characteristics") or {}).get("common_indicators", [])
+            ids = {self._indicator_ids.setdefault(ind, len(self._indicator_ids)) for ind in indicators}
+            data.extend(sorted(ids))
+            indptr.append(len(data))
+        self._history_indptr = np.array(indptr, dtype=np.int64)
+        self._history_data = np.array(data, dtype=np.int64)
+
     def _is_known_pattern(self, characteristics: Dict) -> bool:
         """Prüft ob ein ähnliches Muster bereits bekannt ist"""
         if not self.cluster_history:
             return False
 
-        for pattern in self.cluster_history:
-            if pattern.get("characteristics"):
-                # Berechne Ähnlichkeit der Indikatoren
-                known_indicators = set(pattern["characteristics"].get("common_indicators", []))
-                new_indicators = set(characteristics.get("common_indicators", []))
-
-                if known_indicators and new_indicators:
-                    similarity = len(known_indicators & new_indicators) / len(known_indicators | new_indicators)
-                    if similarity > 0.7:  # 70% Ähnlichkeit
-                        return True
+        new_indicators = set(characteristics.get("common_indicators", []))
+        new_ids = sorted(
+            self._indicator_ids[ind] for ind in new_indicators if ind in self._indicator_ids
+        )
+        similarity = _max_jaccard(
+            np.array(new_ids, dtype=np.int64),
+            len(new_indicators) - len(new_ids),
+            self._history_indptr,
+            self._history_data,
+        )
+        return similarity > KNOWN_PATTERN_SIMILARITY
 
-        return False
+    def _load_cluster_history(self) -> Deque[Dict]:
+        """Lädt die Cluster-Historie zeilenweise aus dem JSONL-Log.
 
-    def _load_cluster_history(self) -> List[Dict]:
-        """Lädt die Cluster-Historie"""
+        Eine ``cluster_history.json`` älterer Versionen wird einmalig
+        übernommen; unvollständige Zeilen werden übersprungen.
+        """
+        history: Deque[Dict] = deque(maxlen=CLUSTER_HISTORY_LIMIT)
+        self._logged_patterns = 0
         try:
-            if os.path.exists(self.cluster_history_file):
-                with open(self.cluster_history_file, 'r') as f:
-                    return json.load(f)
-            return []
+            if not os.path.exists(self.cluster_history_file) and os.path.exists(self.legacy_history_file):
+                with open(self.legacy_history_file, 'rb') as f:
+                    history.extend(loads(f.read()))
+                self._compact_cluster_history(history)
+                return history
+
+            with open(self.cluster_history_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    self._logged_patterns += 1
+                    try:
+                        history.append(loads(line))
+                    except ValueError:
+                        logging.warning("Unvollständiger Eintrag in der Cluster-Historie übersprungen")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logging.error(f"Fehler beim Laden der Cluster-Historie: {str(e)}")
-            return []
+        return history
 
     def _update_cluster_history(self, new_patterns: List[Dict]) -> None:
-        """Aktualisiert die Cluster-Historie"""
+        """Aktualisiert die Cluster-Historie.
+
+        Neue Muster werden nur an das Log angehängt. Erst wenn es doppelt so
+        viele Zeilen enthält wie die Historie fasst, wird es aus dem Speicher
+        neu geschrieben.
+        """
+        if not new_patterns:
+            return
         try:
-            # Füge neue Muster hinzu
+            # Die Deque verwirft die ältesten Muster selbst
             self.cluster_history.extend(new_patterns)
+            self._index_history()
 
-            # Begrenze Historie auf die letzten 1000 Muster
-            if len(self.cluster_history) > 1000:
-                self.cluster_history = self.cluster_history[-1000:]
-
-            # Speichere aktualisierte Historie
-            with open(self.cluster_history_file, 'w') as f:
-                json.dump(self.cluster_history, f, indent=2)
+            if self._logged_patterns + len(new_patterns) > 2 * CLUSTER_HISTORY_LIMIT:
+                self._compact_cluster_history(self.cluster_history)
+            else:
+                with open(self.cluster_history_file, 'ab') as f:
+                    f.writelines(dumps(pattern) + b"\n" for pattern in new_patterns)
+                self._logged_patterns += len(new_patterns)
 
         except Exception as e:
             logging.error(f"Fehler beim Aktualisieren der Cluster-Historie: {str(e)}")
 
+    def _compact_cluster_history(self, patterns: Iterable[Dict]) -> None:
+        """Schreibt das Log atomar mit den übergebenen Mustern neu"""
+        tmp_file = f"{self.cluster_history_file}.tmp"
+        count = 0
+        with open(tmp_file, 'wb') as f:
+            for pattern in patterns:
+                f.write(dumps(pattern) + b"\n")
+                count += 1
+        os.replace(tmp_file, self.cluster_history_file)
+        self._logged_patterns = count
+
     def get_cluster_statistics(self) -> Dict:
         """Liefert Statistiken über erkannte Cluster"""
         stats = {
@@ -234,18 +390,13 @@ class ThreatClusterAnalyzer:
             return stats
 
         # Analysiere Muster der letzten 24 Stunden
-        cutoff = datetime.now() - timedelta(hours=24)
-        recent_patterns = [
-            pattern for pattern in self.cluster_history
-            if datetime.fromisoformat(pattern["timestamp"]) > cutoff
-        ]
-
-        stats["patterns_last_24h"] = len(recent_patterns)
+        cutoff = (datetime.now() - timedelta(hours=24)).timestamp()
+        stats["patterns_last_24h"] = int(np.count_nonzero(self._history_times > cutoff))
 
         # Berechne durchschnittlichen Bedrohungsscore
-        scores = [p.get("avg_threat_score", 0) for p in self.cluster_history]
-        if scores:
-            stats["avg_threat_score"] = np.mean(scores)
+        stats["avg_threat_score"] = (
+            sum(p.get("avg_threat_score", 0) for p in self.cluster_history) / len(self.cluster_history)
+        )
 
         # Sammle häufige Charakteristiken
         all_characteristics = {
@@ -263,7 +414,6 @@ class ThreatClusterAnalyzer:
             all_characteristics["url_patterns"].extend(chars.get("common_url_patterns", []))
 
         # Finde häufigste Elemente
-        from collections import Counter
         for key in all_characteristics:
             if all_characteristics[key]:
                 stats["common_characteristics"][key] = [
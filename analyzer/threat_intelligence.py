@@ -6,7 +6,10 @@ Integriert verschiedene Malware- und Spam-Datenbanken sowie KI-Modelle.
 import os
 import hashlib
 import logging
-from typing import Dict, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 try:  # pragma: no cover - optionale Abhängigkeiten
@@ -31,12 +34,22 @@ except Exception:  # pragma: no cover
 
 from .local_ai_handler import LocalAIHandler
 
+# Gültigkeitsdauer (Sekunden) und Umfang der Zwischenspeicher für URL- und
+# Domain-Prüfungen
+INTEL_CACHE_TTL = 3600
+INTEL_CACHE_SIZE = 4096
+# Höchstzahl an URLs je Safe-Browsing-Anfrage (Grenze der API)
+SAFE_BROWSING_BATCH_SIZE = 500
+
 
 class ThreatIntelligence:
     def __init__(self):
         self.vt_api_key = os.getenv('VIRUSTOTAL_API_KEY')
         self.abuse_ipdb_key = os.getenv('ABUSEIPDB_API_KEY')
         self.local_ai = LocalAIHandler()
+        self._url_verdicts: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._domain_verdicts: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.model = None
         self.transformer = None
         self._initialize_ai_models()
@@ -116,21 +129,47 @@ class ThreatIntelligence:
             return {"error": str(e)}
 
     def check_urls(self, urls: List[str]) -> Dict[str, Dict]:
-        """Überprüft URLs gegen verschiedene Datenbanken"""
+        """Überprüft URLs gegen verschiedene Datenbanken.
+
+        Bereits geprüfte URLs werden für ``INTEL_CACHE_TTL`` Sekunden aus dem
+        Zwischenspeicher beantwortet. Alle übrigen URLs werden Safe Browsing
+        in einer gemeinsamen Anfrage übergeben; PhishTank kennt keine
+        Stapelabfrage und wird je URL parallel befragt.
+        """
         results = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            cached = self._cache_get(self._url_verdicts, url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending.append(url)
+        if not pending:
+            return results
 
         with ThreadPoolExecutor(max_workers=5) as executor:
+            safe_browsing_future = executor.submit(self._check_safe_browsing, pending)
             future_to_url = {
-                executor.submit(self._check_single_url, url): url
-                for url in urls
+                executor.submit(self._check_phishtank, url): url
+                for url in pending
             }
 
+            try:
+                safe_browsing = safe_browsing_future.result()
+            except Exception as e:
+                safe_browsing = {url: "error" for url in pending}
+                logging.error("Safe Browsing check failed: %s", e)
+
             for future in future_to_url:
                 url = future_to_url[future]
                 try:
-                    results[url] = future.result()
+                    results[url] = {"safe_browsing": safe_browsing[url], "phishtank": future.result()}
                 except Exception as e:
                     results[url] = {"error": str(e)}
+                    continue
+                # Fehlgeschlagene Prüfungen beim nächsten Aufruf wiederholen
+                if "error" not in results[url].values():
+                    self._cache_put(self._url_verdicts, url, results[url])
 
         return results
 
@@ -146,11 +185,27 @@ class ThreatIntelligence:
         Raises:
             requests.RequestException: Falls eine externe Anfrage fehlschlägt.
         """
-        results: Dict[str, str] = {}
+        return {
+            "safe_browsing": self._check_safe_browsing([url])[url],
+            "phishtank": self._check_phishtank(url),
+        }
 
-        # Google Safe Browsing API Check
-        try:
-            safe_browsing_url = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
+    def _check_safe_browsing(self, urls: List[str]) -> Dict[str, str]:
+        """Prüft mehrere URLs mit einer Google-Safe-Browsing-Anfrage je Block.
+
+        Args:
+            urls: Zu prüfende URLs.
+
+        Returns:
+            ``"clean"``, ``"suspicious"`` oder ``"error"`` je URL.
+        """
+        if requests is None:
+            return {url: "error" for url in urls}
+
+        results: Dict[str, str] = {}
+        safe_browsing_url = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
+        for start in range(0, len(urls), SAFE_BROWSING_BATCH_SIZE):
+            batch = urls[start:start + SAFE_BROWSING_BATCH_SIZE]
             payload = {
                 "client": {
                     "clientId": "your-client-id",
@@ -160,33 +215,56 @@ class ThreatIntelligence:
                     "threatTypes": ["MALWARE", "SOCIAL_ENGINEERING"],
                     "platformTypes": ["ANY_PLATFORM"],
                     "threatEntryTypes": ["URL"],
-                    "threatEntries": [{"url": url}]
+                    "threatEntries": [{"url": url} for url in batch]
                 }
             }
-            if requests is None:
-                results["safe_browsing"] = "error"
-            else:
+            try:
                 response = requests.post(safe_browsing_url, json=payload, timeout=10)
-                results["safe_browsing"] = (
-                    "clean" if response.status_code == 200 and not response.json() else "suspicious"
-                )
-        except requests.RequestException as exc:
-            logging.error("Safe Browsing check failed: %s", exc)
-            results["safe_browsing"] = "error"
+                if response.status_code != 200:
+                    results.update(dict.fromkeys(batch, "suspicious"))
+                    continue
+                matches = {
+                    match.get("threat", {}).get("url")
+                    for match in (response.json() or {}).get("matches", [])
+                }
+                results.update((url, "suspicious" if url in matches else "clean") for url in batch)
+            except requests.RequestException as exc:
+                logging.error("Safe Browsing check failed: %s", exc)
+                results.update(dict.fromkeys(batch, "error"))
+        return results
 
-        # PhishTank Check
+    def _check_phishtank(self, url: str) -> str:
+        """Prüft eine URL bei PhishTank"""
+        if requests is None:
+            return "error"
         try:
             phishtank_url = "http://checkurl.phishtank.com/checkurl/"
-            if requests is None:
-                results["phishtank"] = "error"
-            else:
-                response = requests.post(phishtank_url, data={"url": url}, timeout=10)
-                results["phishtank"] = "suspicious" if "phish" in response.text.lower() else "clean"
+            response = requests.post(phishtank_url, data={"url": url}, timeout=10)
+            return "suspicious" if "phish" in response.text.lower() else "clean"
         except requests.RequestException as exc:
             logging.error("PhishTank check failed: %s", exc)
-            results["phishtank"] = "error"
-
-        return results
+            return "error"
+
+    def _cache_get(self, cache: "OrderedDict[str, Tuple[float, Dict]]", key: str) -> Optional[Dict]:
+        """Liefert ein noch gültiges Ergebnis aus einem Zwischenspeicher"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, cache: "OrderedDict[str, Tuple[float, Dict]]", key: str, value: Dict) -> None:
+        """Legt ein Ergebnis ab und verwirft bei Bedarf das älteste"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic() + INTEL_CACHE_TTL, value)
+            cache.move_to_end(key)
+            if len(cache) > INTEL_CACHE_SIZE:
+                cache.popitem(last=False)
 
     def analyze_text_local(self, text: str) -> Dict:
         """Analysiert Text mit lokalen KI-Modellen"""
@@ -242,7 +320,14 @@ class ThreatIntelligence:
         return result
 
     def check_sender_reputation(self, sender_domain: str) -> Dict:
-        """Überprüft die Reputation einer Absender-Domain"""
+        """Überprüft die Reputation einer Absender-Domain.
+
+        Ergebnisse werden je Domain für ``INTEL_CACHE_TTL`` Sekunden
+        zwischengespeichert.
+        """
+        cached = self._cache_get(self._domain_verdicts, sender_domain)
+        if cached is not None:
+            return cached
         results = {}
 
         # Spamhaus ZEN Check
@@ -263,6 +348,7 @@ class ThreatIntelligence:
         except Exception:
             results["surbl"] = "clean"
 
+        self._cache_put(self._domain_verdicts, sender_domain, results)
         return results
 
     def get_spam_score(self, email_content: str) -> float:
@@ -1,7 +1,6 @@
 """Update-Manager für automatische Software-Updates."""
 
 import os
-import json
 import logging
 from datetime import datetime
 from typing import Optional
@@ -16,6 +15,8 @@ try:  # pragma: no cover - ImportError handling
 except ImportError:  # pragma: no cover - packaging not installed
     version = None  # type: ignore[assignment]
 
+from .serialization import dumps, loads
+
 
 class UpdateManager:
     def __init__(self):
@@ -114,8 +115,8 @@ class UpdateManager:
             return True
 
         try:
-            with open(self.update_info_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self.update_info_file, "rb") as f:
+                data = loads(f.read())
             last_checked = datetime.fromisoformat(data.get("last_checked", "2000-01-01T00:00:00"))
             return (datetime.now() - last_checked).days >= 1
         except Exception:
@@ -124,16 +125,16 @@ class UpdateManager:
     def _save_update_info(self, info: dict):
         """Speichert Update-Informationen."""
         try:
-            with open(self.update_info_file, "w", encoding="utf-8") as f:
-                json.dump(info, f, indent=2)
+            with open(self.update_info_file, "wb") as f:
+                f.write(dumps(info, indent=True))
         except Exception as e:
             logging.error("Fehler beim Speichern der Update-Informationen: %s", e)
 
     def _save_last_check(self):
         """Speichert den Zeitpunkt der letzten Prüfung."""
         try:
-            with open(self.update_info_file, "w", encoding="utf-8") as f:
-                json.dump({"last_checked": datetime.now().isoformat()}, f, indent=2)
+            with open(self.update_info_file, "wb") as f:
+                f.write(dumps({"last_checked": datetime.now().isoformat()}, indent=True))
         except Exception as e:
             logging.error("Fehler beim Speichern des Prüfzeitpunkts: %s", e)
 
@@ -5,9 +5,24 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 from datetime import datetime
-import re
+from typing import Dict
 
-from config.settings import LOG_FILE, LOG_FORMAT
+import numpy as np
+
+try:  # pragma: no cover - optionale Abhängigkeit
+    from numba import njit
+except Exception:  # pragma: no cover - Modul möglicherweise nicht verfügbar
+    njit = None
+
+from config.settings import LOG_FILE, LOG_FORMAT, THREAT_LEVELS
+
+from .domain_matcher import get_domain_matcher
+
+# Untergrenzen der Scores für die Bedrohungslevel
+HIGH_THREAT_SCORE = 7.0
+MEDIUM_THREAT_SCORE = 4.0
+# Bedrohungslevel in der Reihenfolge der Indizes aus ``classify_threat_levels``
+THREAT_LEVEL_NAMES = ("LOW", "MEDIUM", "HIGH")
 
 
 def setup_logging():
@@ -62,11 +77,43 @@ def create_analysis_report(email_data, threat_analysis):
     }
 
 
+def iter_links(text):
+    """Yield all ``http://``/``https://`` URLs in ``text``.
+
+    Equivalent to ``re.findall(r"https?://\\S+", text)``, but locates
+    candidates with ``str.find`` instead of running the regex engine over the
+    whole text. A URL ends at the next whitespace character.
+    """
+    if not text:
+        return
+    n = len(text)
+    i = 0
+    while True:
+        j = text.find("http", i)
+        if j < 0:
+            return
+        if text.startswith("://", j + 4):
+            start = j + 7
+        elif text.startswith("s://", j + 4):
+            start = j + 8
+        else:
+            i = j + 1
+            continue
+        k = start
+        while k < n and not text[k].isspace():
+            k += 1
+        if k == start:
+            i = j + 1
+            continue
+        yield text[j:k]
+        i = k
+
+
 def extract_links(text):
     """
     Extracts all URLs from the given text.
     """
-    return re.findall(r"https?://[^\s]+", text or "")
+    return list(iter_links(text))
 
 
 def is_suspicious_sender(sender, trusted_domains=None):
@@ -83,7 +130,7 @@ def is_suspicious_sender(sender, trusted_domains=None):
     if trusted_domains is None:
         trusted_domains = ["@ihrefirma.de", "@vertrauenswuerdig.de"]
 
-    return not any(sender.endswith(domain) for domain in trusted_domains)
+    return not get_domain_matcher(tuple(trusted_domains)).matches(sender)
 
 
 def has_suspicious_attachment(attachments, suspicious_extensions=None):
@@ -108,10 +155,8 @@ def has_suspicious_attachment(attachments, suspicious_extensions=None):
             ".rar",
         ]
 
-    return any(
-        att.lower().endswith(tuple(suspicious_extensions))
-        for att in attachments
-    )
+    suspicious_extensions = tuple(ext.lower() for ext in suspicious_extensions)
+    return any(att.lower().endswith(suspicious_extensions) for att in attachments)
 
 
 def get_threat_level(score, use_icon=False):
@@ -127,13 +172,56 @@ def get_threat_level(score, use_icon=False):
             an icon when ``use_icon`` is ``True``.
     """
 
-    from config.settings import THREAT_LEVELS
-
-    if score >= 7.0:
+    if score >= HIGH_THREAT_SCORE:
         level = "HIGH"
-    elif score >= 4.0:
+    elif score >= MEDIUM_THREAT_SCORE:
         level = "MEDIUM"
     else:
         level = "LOW"
 
     return THREAT_LEVELS[level] if use_icon else level
+
+
+def _classify_kernel(scores, high, medium, out):
+    """Ordnet jedem Score den Index seines Bedrohungslevels zu"""
+    for i in range(scores.shape[0]):
+        score = scores[i]
+        out[i] = 2 if score >= high else (1 if score >= medium else 0)
+
+
+if njit is not None:  # pragma: no cover - nur mit Numba
+    _classify = njit(cache=True)(_classify_kernel)
+else:
+    def _classify(scores, high, medium, out):
+        """NumPy-Variante von ``_classify_kernel`` ohne Python-Schleife"""
+        # Zwei Vergleiche sind deutlich schneller als np.digitize (binäre Suche
+        # je Wert) und ordnen NaN wie get_threat_level als LOW ein
+        np.add(scores >= medium, scores >= high, out=out, dtype=np.int8, casting="unsafe")
+
+
+def classify_threat_levels(scores) -> np.ndarray:
+    """Bestimmt die Bedrohungslevel vieler Scores auf einmal.
+
+    Args:
+        scores: Scores auf einer Skala von 0 bis 10.
+
+    Returns:
+        ``int8``-Array mit Indizes in :data:`THREAT_LEVEL_NAMES`.
+    """
+    scores = np.ascontiguousarray(scores, dtype=np.float64)
+    out = np.empty(scores.shape[0], dtype=np.int8)
+    _classify(scores, HIGH_THREAT_SCORE, MEDIUM_THREAT_SCORE, out)
+    return out
+
+
+def count_threat_levels(scores) -> Dict[str, int]:
+    """Zählt die Scores je Bedrohungslevel.
+
+    Args:
+        scores: Scores auf einer Skala von 0 bis 10.
+
+    Returns:
+        Anzahl je Level mit den Schlüsseln ``"HIGH"``, ``"MEDIUM"`` und ``"LOW"``.
+    """
+    counts = np.bincount(classify_threat_levels(scores), minlength=len(THREAT_LEVEL_NAMES))
+    return {"HIGH": int(counts[2]), "MEDIUM": int(counts[1]), "LOW": int(counts[0])}
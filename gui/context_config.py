@@ -8,10 +8,11 @@ from PyQt6.QtWidgets import (
     QSpinBox, QMessageBox
 )
 from PyQt6.QtCore import Qt
-import json
 import os
 from typing import Dict, List
 
+from analyzer.serialization import dumps, loads
+
 
 class RuleConfigDialog(QDialog):
     def __init__(self, parent=None):
@@ -252,8 +253,8 @@ class ContextRuleConfig(QWidget):
         """Lädt die gespeicherten Regeln"""
         try:
             if os.path.exists(self.rules_file):
-                with open(self.rules_file, 'r') as f:
-                    return json.load(f)
+                with open(self.rules_file, 'rb') as f:
+                    return loads(f.read())
             return {}
         except Exception as e:
             print(f"Fehler beim Laden der Regeln: {str(e)}")
@@ -263,8 +264,8 @@ class ContextRuleConfig(QWidget):
         """Speichert die Regeln"""
         try:
             os.makedirs(os.path.dirname(self.rules_file), exist_ok=True)
-            with open(self.rules_file, 'w') as f:
-                json.dump(self.rules, f, indent=2)
+            with open(self.rules_file, 'wb') as f:
+                f.write(dumps(self.rules, indent=True))
         except Exception as e:
             print(f"Fehler beim Speichern der Regeln: {str(e)}")
 
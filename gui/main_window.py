@@ -45,23 +45,14 @@ class EmailRefreshWorker(QThread):
     result = pyqtSignal(list)
     error = pyqtSignal(str)
 
-    def __init__(self, scanner, analyzer, parent=None):
+    def __init__(self, controller, parent=None):
         super().__init__(parent)
-        self._scanner = scanner
-        self._analyzer = analyzer
+        self._controller = controller
 
     def run(self):
         """Führt das Laden und Analysieren der E-Mails aus."""
         try:
-            emails = self._scanner.get_emails(max_count=MAX_EMAILS_TO_SCAN)
-            total = len(emails) or 1
-            results = []
-
-            for index, email in enumerate(emails, start=1):
-                analysis = self._analyzer.analyze_email(email)
-                results.append((email, analysis))
-                self.progress.emit(index, total)
-
+            results = self._controller.fetch_emails(MAX_EMAILS_TO_SCAN, progress=self.progress.emit)
             self.result.emit(results)
         except Exception as exc:  # pragma: no cover - GUI feedback
             self.error.emit(str(exc))
@@ -70,6 +61,9 @@ class EmailRefreshWorker(QThread):
 class MainWindow(QMainWindow):
     """Main application window for the Mail Analyzer."""
 
+    # Meldet fertige Berichte aus dem Prozesspool an den GUI-Thread
+    report_finished = pyqtSignal(str, object)
+
     def __init__(self) -> None:
         super().__init__()
         self.analyzer = ThreatAnalyzer()
@@ -81,6 +75,7 @@ class MainWindow(QMainWindow):
         self.report_generator = ReportGenerator()
         self.email_controller = EmailController(self.scanner, self.analyzer)
         self.report_controller = ReportController(self.report_generator)
+        self.report_finished.connect(self._show_report_result)
 
         # Timer für automatische Updates
         self.update_check_timer = QTimer()
@@ -271,7 +266,7 @@ class MainWindow(QMainWindow):
         self.refresh_button.setEnabled(False)
         self.email_list.clear()
 
-        self._refresh_worker = EmailRefreshWorker(self.scanner, self.analyzer)
+        self._refresh_worker = EmailRefreshWorker(self.email_controller)
         self._refresh_worker.progress.connect(self._update_refresh_progress)
         self._refresh_worker.result.connect(self._populate_email_list)
         self._refresh_worker.error.connect(self._handle_refresh_error)
@@ -397,32 +392,39 @@ class MainWindow(QMainWindow):
         )
 
     def create_pdf_report(self) -> None:
-        """Generate a PDF report for the current email list."""
+        """Generate a PDF report for the current email list in the background."""
         try:
-            filename = self.report_controller.create_pdf_report(self.email_list)
-            if filename:
-                QMessageBox.information(
-                    self,
-                    "Bericht erstellt",
-                    f"Der PDF-Bericht wurde erstellt unter:\n{filename}"
-                )
-                QDesktopServices.openUrl(QUrl.fromLocalFile(filename))
+            future = self.report_controller.submit_pdf_report(self.email_list)
         except Exception as exc:  # pragma: no cover - GUI message box
             QMessageBox.critical(self, "Fehler", f"Fehler bei der PDF-Erstellung: {exc}")
+            return
+        future.add_done_callback(lambda done: self.report_finished.emit("PDF", done))
 
     def create_excel_report(self) -> None:
-        """Generate an Excel report for the current email list."""
+        """Generate an Excel report for the current email list in the background."""
         try:
-            filename = self.report_controller.create_excel_report(self.email_list)
-            if filename:
-                QMessageBox.information(
-                    self,
-                    "Bericht erstellt",
-                    f"Der Excel-Bericht wurde erstellt unter:\n{filename}"
-                )
-                QDesktopServices.openUrl(QUrl.fromLocalFile(filename))
+            future = self.report_controller.submit_excel_report(self.email_list)
         except Exception as exc:  # pragma: no cover
             QMessageBox.critical(self, "Fehler", f"Fehler bei der Excel-Erstellung: {exc}")
+            return
+        future.add_done_callback(lambda done: self.report_finished.emit("Excel", done))
+
+    def _show_report_result(self, kind: str, future) -> None:
+        """Zeigt das Ergebnis eines im Hintergrund erstellten Berichts an."""
+        if future.cancelled():
+            return
+        try:
+            filename = future.result()
+        except Exception as exc:  # pragma: no cover - GUI message box
+            QMessageBox.critical(self, "Fehler", f"Fehler bei der {kind}-Erstellung: {exc}")
+            return
+        if filename:
+            QMessageBox.information(
+                self,
+                "Bericht erstellt",
+                f"Der {kind}-Bericht wurde erstellt unter:\n{filename}"
+            )
+            QDesktopServices.openUrl(QUrl.fromLocalFile(filename))
 
     def show_statistics(self) -> None:
         """Display statistical summaries in a dialog."""
@@ -511,6 +513,12 @@ class MainWindow(QMainWindow):
         layout.addWidget(config)
         dialog.exec()
 
+    def closeEvent(self, event):
+        """Beendet Berichts-Pool und Analyse-Threads beim Schließen des Fensters."""
+        self.report_controller.shutdown()
+        self.analyzer.close()
+        super().closeEvent(event)
+
 
 def main():
     app = QApplication(sys.argv)
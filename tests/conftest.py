@@ -81,8 +81,13 @@ class _DummyHttpxClient:
             status_code=200, json=lambda: {}, raise_for_status=lambda: None
         )
 
+    def close(self):
+        pass
+
 
 httpx.Client = _DummyHttpxClient
+httpx.Timeout = lambda *args, **kwargs: None
+httpx.HTTPError = type("HTTPError", (Exception,), {})
 
 # Stub transformers pipeline for ML inference.
 transformers = _ensure_module("transformers")
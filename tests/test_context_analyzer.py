@@ -0,0 +1,238 @@
+"""Tests für den ContextAwareAnalyzer."""
+import pytest
+
+try:  # pragma: no cover - abhängigkeiten optional
+    import numpy as np
+    from sklearn.ensemble import IsolationForest
+    from analyzer.context_analyzer import ContextAwareAnalyzer
+except Exception:  # pragma: no cover - sklearn o.Ä. nicht verfügbar
+    ContextAwareAnalyzer = None
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_analyze_batch_matches_single_analysis(tmp_path):
+    """Batch-Analyse liefert dieselben Ergebnisse wie Einzelaufrufe."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    rng = np.random.default_rng(0)
+    analyzer.role_models["it"] = IsolationForest(random_state=42).fit(rng.random((50, 4)))
+
+    emails = [
+        {"sender": "admin@firma.de", "subject": "Passwort", "body": "", "attachments": ["a.pdf"]},
+        {"sender": "fremd@extern.de", "subject": "Hallo", "body": "", "attachments": []},
+    ]
+    contexts = [
+        {"role": "it", "clearance_level": 3, "common_contacts": ["admin@firma.de"]},
+        {"role": "hr", "clearance_level": 1, "common_contacts": []},
+    ]
+
+    batch = analyzer.analyze_batch(emails, contexts)
+
+    assert len(batch) == 2
+    for email, context, result in zip(emails, contexts, batch):
+        assert result == analyzer.analyze_with_context(email, context)
+    assert "Passwort-Phishing" in batch[0]["role_specific_threats"]
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_analyze_batch_rejects_mismatched_lengths(tmp_path):
+    """Unterschiedlich lange Eingaben werden abgelehnt."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        analyzer.analyze_batch([{}], [])
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_pattern_indices_follow_new_patterns(tmp_path):
+    """Neue Kommunikationsmuster sind sofort über die Indizes abrufbar."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    analyzer.add_communication_pattern({
+        "department": "Finanzen",
+        "role": "finance",
+        "sender": "cfo@firma.de",
+        "typical_subjects": ["Quartalsbericht"],
+        "typical_times": ["09:00", "14:30"],
+    })
+
+    assert len(analyzer._get_department_patterns("Finanzen")) == 1
+    assert analyzer._typical_hours_mask_by_role["finance"] == (1 << 9) | (1 << 14)
+    assert analyzer._is_contextual_anomaly({"sender": "fremd@extern.de"}, {"role": "finance"})
+    assert not analyzer._is_contextual_anomaly({"sender": "x@y.de"}, {"role": "hr"})
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_now_hour_makes_time_features_deterministic(tmp_path):
+    """Eine vorgegebene Stunde ersetzt die aktuelle Uhrzeit."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    analyzer.add_communication_pattern({
+        "department": "IT",
+        "role": "it",
+        "sender": "admin@firma.de",
+        "typical_times": ["08:00"],
+    })
+    email = {"sender": "admin@firma.de"}
+
+    features = analyzer._extract_role_features(email, {"role": "it"}, now_hour=12)
+
+    assert features[0] == pytest.approx(0.5)
+    assert not analyzer._is_contextual_anomaly(email, {"role": "it"}, now_hour=8)
+    assert analyzer._is_contextual_anomaly(email, {"role": "it"}, now_hour=23)
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_known_contact_feature_with_shared_context(tmp_path):
+    """Ein gemeinsamer Benutzerkontext markiert bekannte Absender je Zeile korrekt."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    shared = {"role": "it", "common_contacts": ["admin@firma.de"]}
+    emails = [{"sender": "admin@firma.de"}, {"sender": "fremd@extern.de"}, {"sender": "admin@firma.de"}]
+
+    features = analyzer._extract_role_features_batch(emails, [shared, shared, {"role": "hr"}], now_hour=0)
+
+    assert features[:, 1].tolist() == [1.0, 0.0, 0.0]
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_contact_sets_built_once_per_context(tmp_path, monkeypatch):
+    """Kontaktmengen werden je Benutzerkontext einmal gebildet und für Rollen-Features wiederverwendet."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    analyzer.role_models["it"] = IsolationForest(random_state=42).fit(np.random.default_rng(0).random((50, 4)))
+    built = []
+    contact_sets = ContextAwareAnalyzer._contact_sets
+    monkeypatch.setattr(
+        ContextAwareAnalyzer, "_contact_sets", staticmethod(lambda uc: built.append(uc) or contact_sets(uc))
+    )
+    shared = {"role": "it", "common_contacts": ["admin@firma.de"]}
+    emails = [{"sender": "admin@firma.de", "body": str(i)} for i in range(5)]
+
+    analyzer.analyze_batch(emails, [shared] * len(emails))
+
+    assert built == [shared]
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_contacts_key_computed_once_per_context(tmp_path, monkeypatch):
+    """Der Kontaktanteil des Cache-Schlüssels wird je Benutzerkontext nur einmal sortiert."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    calls = []
+    contacts_key = ContextAwareAnalyzer._contacts_key
+    monkeypatch.setattr(
+        ContextAwareAnalyzer, "_contacts_key", staticmethod(lambda uc: calls.append(uc) or contacts_key(uc))
+    )
+    shared = {"role": "it", "common_contacts": ["b@firma.de", "a@firma.de"]}
+    emails = [{"sender": "a@firma.de", "body": str(i)} for i in range(4)]
+
+    first = analyzer.analyze_batch(emails, [shared] * len(emails))
+    again = analyzer.analyze_batch(emails, [shared] * len(emails))
+
+    assert calls == [shared, shared]
+    assert again == first
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_patterns_are_appended_and_replayed(tmp_path):
+    """Neue Muster landen im Log und werden beim Laden wieder eingespielt."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    for sender in ("a@firma.de", "b@firma.de"):
+        analyzer.add_communication_pattern({"department": "IT", "role": "it", "sender": sender})
+
+    assert not (tmp_path / "organization_context.json").exists()
+    assert len((tmp_path / "communication_patterns.jsonl").read_text().splitlines()) == 2
+
+    reloaded = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    assert len(reloaded._get_department_patterns("IT")) == 2
+
+    reloaded.checkpoint()
+    assert (tmp_path / "communication_patterns.jsonl").read_text() == ""
+    assert len(ContextAwareAnalyzer(storage_dir=str(tmp_path))._get_department_patterns("IT")) == 2
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_contact_patterns_use_domain_set(tmp_path):
+    """Bekannte Kontakte, bekannte Domains und Fremde werden unterschieden."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    context = {"common_contacts": ["chef@firma.de", "ohne-domain"]}
+
+    assert analyzer._analyze_contact_patterns({"sender": "chef@firma.de"}, context) == 0.8
+    assert analyzer._analyze_contact_patterns({"sender": "neu@firma.de"}, context) == 0.5
+    assert analyzer._analyze_contact_patterns({"sender": "x@extern.de"}, context) == 0.2
+    assert analyzer._analyze_contact_patterns({"sender": ""}, context) == 0.0
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_combine_scores_batch_matches_kernel(tmp_path):
+    """Batch-Kombination entspricht dem skalaren Kernel inklusive Begrenzung."""
+    from analyzer.context_analyzer import _combine_batch_kernel
+
+    role = np.array([0.0, 0.5, 3.0, -2.0])
+    dept = np.array([0.0, 0.7, 1.0, 0.0])
+    contact = np.array([0.0, 0.8, 1.0, 0.0])
+    expected = np.empty(4)
+    _combine_batch_kernel(role, dept, contact, 0.4, 0.3, 0.3, expected)
+
+    result = ContextAwareAnalyzer._combine_scores_batch(role, dept, contact)
+
+    assert result.tolist() == expected.tolist()
+    assert result[2] == 1.0 and result[3] == 0.0
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_repeated_analysis_is_served_from_cache(tmp_path, monkeypatch):
+    """Identische Eingaben werden nur einmal berechnet, Änderungen leeren den Cache."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    calls = []
+    original = analyzer._analyze_uncached
+
+    def counting(emails, contexts, now_hour):
+        calls.append(len(emails))
+        return original(emails, contexts, now_hour)
+
+    monkeypatch.setattr(analyzer, "_analyze_uncached", counting)
+    email = {"sender": "a@firma.de", "subject": "Passwort", "body": "admin"}
+    context = {"role": "it", "common_contacts": []}
+
+    first = analyzer.analyze_with_context(email, context, now_hour=9)
+    first["role_specific_threats"].append("verändert")
+    second = analyzer.analyze_with_context(dict(email), dict(context), now_hour=9)
+
+    assert calls == [1]
+    assert "verändert" not in second["role_specific_threats"]
+
+    analyzer.add_communication_pattern({"department": "IT", "role": "it", "sender": "b@firma.de"})
+    analyzer.analyze_with_context(email, context, now_hour=9)
+    assert calls == [1, 1]
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_unchanged_context_is_not_rewritten(tmp_path, monkeypatch):
+    """Ein unveränderter Kontext wird nicht erneut geschrieben."""
+    import os
+
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    replaced = []
+    original_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: (replaced.append(dst), original_replace(src, dst)))
+
+    analyzer.update_organization_context({"departments": ["IT"]})
+    analyzer.checkpoint()
+    analyzer.update_organization_context({"departments": ["IT", "HR"]})
+
+    assert len(replaced) == 2
+    assert not (tmp_path / "organization_context.json.tmp").exists()
+    assert ContextAwareAnalyzer(storage_dir=str(tmp_path)).org_context["departments"] == ["IT", "HR"]
+
+
+@pytest.mark.skipif(ContextAwareAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_department_score_uses_lowercased_subject_index(tmp_path):
+    """Betreffzeilen werden unabhängig von der Schreibweise im Muster erkannt."""
+    analyzer = ContextAwareAnalyzer(storage_dir=str(tmp_path))
+    analyzer.add_communication_pattern({
+        "department": "Finanzen",
+        "role": "finance",
+        "sender": "cfo@firma.de",
+        "typical_subjects": ["QUARTALSBERICHT"],
+    })
+    context = {"department": "Finanzen", "clearance_level": 1}
+
+    email = {"sender": "cfo@firma.de", "subject": "Quartalsbericht Q3"}
+    assert analyzer._analyze_department_specific(email, context) == pytest.approx(0.7)
+    other = {"sender": "x@y.de", "subject": "Hallo"}
+    assert analyzer._analyze_department_specific(other, context) == pytest.approx(0.1)
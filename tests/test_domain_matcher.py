@@ -0,0 +1,23 @@
+"""Tests für den TrustedDomainMatcher."""
+
+from analyzer.domain_matcher import TrustedDomainMatcher, get_domain_matcher
+
+
+def test_matches_like_endswith():
+    """Das Ergebnis entspricht ``any(sender.endswith(domain) ...)``."""
+    domains = ["@ihrefirma.de", "@vertrauenswuerdig.de", "partner.com", "@a.de"]
+    matcher = TrustedDomainMatcher(domains)
+    senders = [
+        "chef@ihrefirma.de", "x@IHREFIRMA.DE", "y@sub.partner.com", "z@a.de",
+        "z@ba.de", "firma.de", "", "@vertrauenswuerdig.de.evil.com",
+    ]
+
+    for sender in senders:
+        assert matcher.matches(sender) == any(sender.endswith(d) for d in domains), sender
+
+
+def test_empty_domain_matches_everything_and_instances_are_cached():
+    """Eine leere Domain passt wie bei ``endswith`` auf jede Adresse."""
+    assert TrustedDomainMatcher([""]).matches("irgendwer@example.com")
+    assert not TrustedDomainMatcher([]).matches("irgendwer@example.com")
+    assert get_domain_matcher(("@a.de",)) is get_domain_matcher(("@a.de",))
@@ -1,5 +1,8 @@
 """Tests for EmailController."""
 
+import asyncio
+import threading
+
 from analyzer.email_controller import EmailController
 
 
@@ -21,3 +24,50 @@ def test_fetch_emails_calls_dependencies():
     controller = EmailController(DummyScanner(), DummyAnalyzer())
     emails = controller.fetch_emails(5)
     assert emails[0][1]["level"] == "LOW"
+
+
+class TwoEmailScanner:
+    def get_emails(self, max_count: int):
+        return [{"subject": "a"}, {"subject": "b"}]
+
+
+class ConcurrentAnalyzer:
+    thread_safe = True
+
+    def __init__(self):
+        self._barrier = threading.Barrier(2, timeout=5)
+
+    def analyze_email(self, email):
+        # Both calls must be in flight at the same time to pass the barrier
+        self._barrier.wait()
+        return {"subject": email["subject"]}
+
+
+def test_fetch_emails_overlaps_thread_safe_analyses():
+    controller = EmailController(TwoEmailScanner(), ConcurrentAnalyzer())
+    results = controller.fetch_emails(2)
+    assert [analysis["subject"] for _, analysis in results] == ["a", "b"]
+
+
+class AsyncAnalyzer:
+    async def analyze_email_async(self, email):
+        await asyncio.sleep(0)
+        return {"level": email["subject"].upper()}
+
+
+def test_fetch_emails_async_gathers_analyses():
+    controller = EmailController(TwoEmailScanner(), AsyncAnalyzer())
+    results = asyncio.run(controller.fetch_emails_async(2))
+    assert [analysis["level"] for _, analysis in results] == ["A", "B"]
+
+
+def test_fetch_emails_async_falls_back_to_sync_analyzer():
+    results = asyncio.run(EmailController(DummyScanner(), DummyAnalyzer()).fetch_emails_async(1))
+    assert results == [({"subject": "test", "attachments": []}, {"level": "LOW"})]
+
+
+def test_fetch_emails_reports_progress_in_order():
+    controller = EmailController(TwoEmailScanner(), ConcurrentAnalyzer())
+    calls = []
+    controller.fetch_emails(2, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(1, 2), (2, 2)]
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 """Tests for the e-mail scanner module."""
 
+import os
 import sys
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 # Externe Abhängigkeiten mocken, damit Imports in email_scanner nicht fehlschlagen
 sys.modules["win32com"] = MagicMock()
 sys.modules["win32com.client"] = MagicMock()
@@ -26,7 +29,7 @@ mock_traffic_light.analyze_threat_level = MagicMock()
 sys.modules["analyzer.traffic_light"] = mock_traffic_light
 
 import analyzer.email_scanner  # noqa: E402
-from analyzer.email_scanner import get_outlook_emails, scan_inbox  # noqa: E402
+from analyzer.email_scanner import get_outlook_emails, scan_email, scan_inbox  # noqa: E402
 
 # Ursprüngliches TrafficLight-Modul wiederherstellen
 if original_traffic_light is not None:
@@ -111,3 +114,131 @@ def test_scan_inbox_uses_max_count(monkeypatch):
 
     mock_get.assert_called_once_with(max_count=5)
     assert results[0]["subject"] == "Hallo"
+
+
+def test_scan_email_reports_keywords_in_configured_order():
+    """Schlüsselwörter aus Betreff und Body werden je einmal gemeldet."""
+    email = {
+        "subject": "DRINGEND: Rechnung",
+        "body": "Passwort-Bestätigung, dringend!",
+        "sender": "chef@ihrefirma.de",
+    }
+
+    _, issues = scan_email(email)
+
+    assert issues == [
+        "Verdächtiges Schlüsselwort gefunden: 'passwort'",
+        "Verdächtiges Schlüsselwort gefunden: 'dringend'",
+        "Verdächtiges Schlüsselwort gefunden: 'rechnung'",
+        "Verdächtiges Schlüsselwort gefunden: 'bestätigung'",
+    ]
+
+
+def test_scan_email_flags_links_case_insensitively():
+    """Kurzlinks und verdächtige Links werden unabhängig von der Schreibweise erkannt."""
+    email = {"body": "Siehe https://BIT.LY/x und https://example.com/Login", "sender": "a@ihrefirma.de"}
+
+    risk, issues = scan_email(email)
+
+    assert "Verdächtiger Kurzlink gefunden: https://BIT.LY/x" in issues
+    assert "Verdächtiger Link gefunden: https://example.com/Login" in issues
+    assert risk == analyzer.email_scanner.settings.THREAT_LEVELS["HIGH"]
+
+
+def test_scan_email_flags_attachment_extensions_case_insensitively():
+    """Anhangsendungen werden ohne Beachtung der Groß-/Kleinschreibung geprüft."""
+    email = {"attachments": ["Rechnung.PDF.EXE", "notiz.txt"], "sender": "a@ihrefirma.de"}
+
+    _, issues = scan_email(email)
+
+    assert issues == ["Verdächtiger Anhang: Rechnung.PDF.EXE"]
+
+
+def test_scanner_reuses_parsed_config_and_client(tmp_path, monkeypatch):
+    """Konfiguration und Client werden nur nach Änderungen neu erzeugt."""
+    config_file = tmp_path / "configuration.ini"
+    config_file.write_text("[EMAIL]\nclient = gmail\n")
+    created = []
+
+    class FakeClient:
+        name = "Fake"
+
+        def __init__(self, *args):
+            created.append(args)
+
+        def connect(self):
+            return True
+
+        def get_emails(self, max_count):
+            return []
+
+        def disconnect(self):
+            pass
+
+    monkeypatch.setattr(analyzer.email_scanner, "GmailClient", FakeClient)
+    scanner = analyzer.email_scanner.EmailScanner(str(config_file))
+
+    assert analyzer.email_scanner.EmailScanner(str(config_file)).config is scanner.config
+
+    scanner.get_emails()
+    scanner.get_emails()
+    assert created == [("credentials.json",)]
+
+    config_file.write_text("[EMAIL]\nclient = gmail\n[GMAIL]\ncredentials_file = other.json\n")
+    os.utime(config_file, ns=(0, os.stat(config_file).st_mtime_ns + 1_000_000))
+    scanner.get_emails()
+    assert created == [("credentials.json",), ("other.json",)]
+
+
+def test_scan_emails_matches_scan_email():
+    """Die Stapelbewertung entspricht der Einzelbewertung je E-Mail."""
+    emails = [
+        {"subject": "Dringend", "body": "https://bit.ly/x", "sender": "a@ihrefirma.de"},
+        {"subject": "", "body": "passwort", "sender": "x@extern.com", "attachments": ["a.exe"]},
+        {"sender": "b@vertrauenswuerdig.de"},
+    ]
+
+    assert analyzer.email_scanner.scan_emails(emails) == [scan_email(email) for email in emails]
+
+
+def test_get_emails_only_swallows_connection_errors(monkeypatch):
+    """Verbindungsfehler ergeben eine leere Liste, andere Fehler werden weitergereicht."""
+    scanner = analyzer.email_scanner.EmailScanner("nicht-vorhanden.ini")
+
+    class FailingClient:
+        name = "Fake"
+        error = ConnectionError
+
+        def connect(self):
+            raise self.error("kaputt")
+
+    client = FailingClient()
+    monkeypatch.setattr(analyzer.email_scanner.EmailScanner, "_get_client", lambda self: client)
+    assert scanner.get_emails() == []
+
+    client.error = KeyError
+    with pytest.raises(KeyError):
+        scanner.get_emails()
+
+
+def test_determine_risk_level_uses_configured_threat_levels():
+    """Die Risikostufen stammen aus den Einstellungen, nicht aus festen Werten."""
+    levels = analyzer.email_scanner.settings.THREAT_LEVELS
+    determine = analyzer.email_scanner.determine_risk_level
+
+    assert determine([]) == levels["LOW"]
+    assert determine(["Unbekannter oder externer Absender: x"]) == levels["MEDIUM"]
+    assert determine(["Verdächtiger Anhang: a.exe"]) == levels["HIGH"]
+
+
+def test_get_scanner_returns_cached_instance(tmp_path):
+    """Der Scanner wird je Konfigurationsdatei nur einmal erzeugt."""
+    get_scanner = analyzer.email_scanner.get_scanner
+    get_scanner.cache_clear()
+    config_file = str(tmp_path / "configuration.ini")
+
+    scanner = get_scanner(config_file)
+
+    assert get_scanner(config_file) is scanner
+    assert scanner.config_file == config_file
+    get_scanner.cache_clear()
@@ -0,0 +1,119 @@
+"""Tests für den Exchange-Online-Client."""
+
+import types
+
+from analyzer.email_clients.exchange import ExchangeOnlineClient
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(self.status_code)
+
+
+MESSAGE = {
+    "id": "m1",
+    "subject": "Rechnung",
+    "from": {"emailAddress": {"address": "billing@example.com"}},
+    "body": {"content": "Bitte zahlen"},
+    "hasAttachments": True,
+}
+
+
+def _client(**session_methods):
+    client = ExchangeOnlineClient("id", "tenant", "secret")
+    client._token = "token"
+    client._session = types.SimpleNamespace(close=lambda: None, **session_methods)
+    return client
+
+
+def test_get_emails_reads_expanded_attachments():
+    """Anhänge aus $expand erfordern keine weiteren Anfragen."""
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse({"value": [{**MESSAGE, "attachments": [{"name": "rechnung.pdf"}]}]})
+
+    emails = _client(get=fake_get).get_emails(max_count=5)
+
+    assert len(calls) == 1
+    assert "$expand=attachments" in calls[0]
+    assert emails == [{
+        "subject": "Rechnung",
+        "sender": "billing@example.com",
+        "body": "Bitte zahlen",
+        "attachments": ["rechnung.pdf"],
+    }]
+
+
+def test_get_emails_falls_back_to_batch():
+    """Ist $expand verboten, werden Anhänge gebündelt per $batch geladen."""
+    posts = []
+
+    def fake_get(url, **kwargs):
+        if "$expand" in url:
+            return FakeResponse({}, status_code=400)
+        return FakeResponse({"value": [MESSAGE]})
+
+    def fake_post(url, json=None, **kwargs):
+        posts.append(json)
+        return FakeResponse({"responses": [
+            {"id": "0", "status": 200, "body": {"value": [{"name": "a.zip"}]}},
+        ]})
+
+    emails = _client(get=fake_get, post=fake_post).get_emails(max_count=5)
+
+    assert len(posts) == 1
+    assert posts[0]["requests"][0]["url"].startswith("/me/messages/m1/attachments")
+    assert emails[0]["attachments"] == ["a.zip"]
+
+
+def test_disconnect_closes_session():
+    """Beim Trennen wird die Session geschlossen."""
+    closed = []
+    client = _client()
+    client._session.close = lambda: closed.append(True)
+
+    client.disconnect()
+
+    assert closed == [True]
+    assert client._session is None
+
+
+def test_attachment_batches_are_split_by_limit():
+    """Mehr als 20 Nachrichten werden auf mehrere $batch-Anfragen verteilt."""
+    sizes = []
+
+    def fake_post(url, json=None, **kwargs):
+        sizes.append(len(json["requests"]))
+        return FakeResponse({"responses": [
+            {"id": request["id"], "status": 200, "body": {"value": [{"name": "x.pdf"}]}}
+            for request in json["requests"]
+        ]})
+
+    ids = [f"m{i}" for i in range(45)]
+    names = _client(post=fake_post)._fetch_attachment_names(ids)
+
+    assert sorted(sizes) == [5, 20, 20]
+    assert set(names) == set(ids)
+
+
+def test_get_emails_caps_body_length():
+    """Lange Bodys werden auf die konfigurierte Zeichenzahl gekürzt."""
+    message = {**MESSAGE, "body": {"content": "x" * 100}, "attachments": []}
+    client = _client(get=lambda url, **kwargs: FakeResponse({"value": [dict(message)]}))
+    client._body_chars_cap = 10
+
+    assert client.get_emails()[0]["body"] == "x" * 10
+
+    client._body_chars_cap = None
+    assert client.get_emails()[0]["body"] == "x" * 100
@@ -0,0 +1,339 @@
+"""Tests für den FeedbackLearner."""
+import pytest
+
+try:  # pragma: no cover - abhängigkeiten optional
+    from analyzer import feedback_learner
+    from analyzer.feedback_learner import FeedbackLearner
+except Exception:  # pragma: no cover - sklearn o.Ä. nicht verfügbar
+    FeedbackLearner = None
+
+
+class FixedModel:
+    """Liefert vorgegebene Klassenwahrscheinlichkeiten je Zeile."""
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+        self.calls = 0
+
+    def predict_proba(self, X):
+        import numpy as np
+
+        self.calls += 1
+        return np.array(self.probabilities[:X.shape[0]])
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_adjust_analysis_batch_predicts_once(tmp_path):
+    """Alle E-Mails werden mit einem Modellaufruf bewertet und gewichtet."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.model = FixedModel([[0.05, 0.95], [0.5, 0.5], [0.15, 0.85]])
+
+    items = [
+        ({"subject": "Rechnung", "sender": "a@b.de"}, {"score": 4.0, "indicators": []}),
+        ({"subject": "Hallo", "sender": "x@y.de"}, {"score": 2.0, "indicators": []}),
+        ({"subject": "Hallo", "sender": "a@b.de"}, {"score": 10.0, "indicators": []}),
+    ]
+
+    first, second, third = learner.adjust_analysis_batch(items)
+
+    assert learner.model.calls == 1
+    assert first["score"] == pytest.approx(4.0 * 0.7 + 0.95 * 10.0 * 0.3)
+    assert first["indicators"] == ["Anpassung basierend auf Unternehmensfeedback"]
+    assert second == {"score": 2.0, "indicators": []}
+    assert third["score"] == pytest.approx(10.0 * 0.7 + 0.85 * 10.0 * 0.3)
+    assert third["feedback_confidence"] == pytest.approx(0.85)
+    assert third["indicators"] == []
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_adjust_analysis_without_trained_model_is_unchanged(tmp_path):
+    """Ohne trainiertes Modell bleibt die Analyse unverändert."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    analysis = {"score": 3.0, "indicators": []}
+
+    assert learner.adjust_analysis({"subject": "x"}, analysis) == {"score": 3.0, "indicators": []}
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_feedback_is_appended_as_jsonl(tmp_path):
+    """Jedes Feedback wird als eigene Zeile angehängt und beim Laden gelesen."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    feedback = {"is_correct": True, "correct_category": "safe", "notes": ""}
+
+    learner.add_feedback({"subject": "a"}, {"score": 1}, feedback)
+    learner.add_feedback({"subject": "b"}, {"score": 2}, feedback)
+    with open(learner.feedback_file, "ab") as f:
+        f.write(b'{"unvollst')
+
+    lines = (tmp_path / "feedback_data.jsonl").read_bytes().splitlines()
+    assert len(lines) == 3
+    reloaded = FeedbackLearner(model_dir=str(tmp_path)).feedback_data
+    assert [entry["email_data"]["subject"] for entry in reloaded] == ["a", "b"]
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_legacy_json_feedback_is_migrated(tmp_path):
+    """Eine alte feedback_data.json wird übernommen und als JSONL gespeichert."""
+    import json
+
+    entry = {"email_data": {"subject": "alt"}, "user_feedback": {"is_correct": False}}
+    (tmp_path / "feedback_data.json").write_text(json.dumps([entry], indent=2))
+
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+
+    assert learner.feedback_data == [entry]
+    assert json.loads((tmp_path / "feedback_data.jsonl").read_text()) == entry
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_retrain_reuses_stored_features(tmp_path, monkeypatch):
+    """Beim Neutraining werden die gespeicherten Feature-Strings verwendet."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 1000
+    for i in range(4):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de", "attachments": ["x.pdf"]},
+            {"score": i},
+            {"is_correct": i % 2 == 0, "correct_category": "safe", "notes": ""},
+        )
+    assert learner.feedback_data[0]["feature_text"] == "Betreff 0 a@b.de"
+
+    monkeypatch.setattr(FeedbackLearner, "_extract_features", lambda self, email: pytest.fail("neu berechnet"))
+    learner._retrain_model()
+
+    assert learner.model.n_features_in_ == feedback_learner.FEEDBACK_N_FEATURES
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_retrained_model_is_persisted_without_vectorizer(tmp_path):
+    """Nur das Modell wird gespeichert; ein neuer Learner nutzt es direkt."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 1000
+    for i in range(40):
+        correct = i % 2 == 0
+        learner.add_feedback(
+            {"subject": "Newsletter" if correct else "Passwort sofort", "sender": f"u{i}@b.de"},
+            {"score": 1},
+            {"is_correct": correct, "correct_category": "safe", "notes": ""},
+        )
+    learner._retrain_model()
+
+    assert sorted(p.name for p in tmp_path.glob("*.joblib")) == ["feedback_model.joblib"]
+    reloaded = FeedbackLearner(model_dir=str(tmp_path))
+    [adjusted] = reloaded.adjust_analysis_batch([({"subject": "Newsletter", "sender": "n@b.de"}, {
+        "score": 0.0, "indicators": []
+    })])
+    assert adjusted["feedback_confidence"] > 0.8
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_retrain_updates_incrementally_after_first_fit(tmp_path, monkeypatch):
+    """Nach dem ersten Training werden nur neue Einträge nachgelernt."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 10
+    for i in range(20):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": i % 2 == 0, "correct_category": "safe", "notes": ""},
+        )
+    model = learner.model
+    learner.min_feedback_samples = 1000
+    for i in range(3):
+        learner.add_feedback(
+            {"subject": f"Neu {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": True, "correct_category": "safe", "notes": ""},
+        )
+
+    fitted_rows = []
+    partial_fit = type(model).partial_fit
+    monkeypatch.setattr(
+        type(model), "partial_fit",
+        lambda self, X, y, **kwargs: fitted_rows.append(X.shape[0]) or partial_fit(self, X, y, **kwargs)
+    )
+    learner._retrain_model()
+
+    assert learner.model is model
+    assert fitted_rows == [3]
+
+    learner._retrain_model()
+    assert fitted_rows == [3]
+
+    learner._retrain_model(force=True)
+    assert learner.model is not model
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_feature_vector_matches_for_email_and_stored_summary(tmp_path):
+    """Metadaten werden aus E-Mail und gespeicherter Zusammenfassung gleich gebildet."""
+    import numpy as np
+
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    email = {"subject": "Rechnung", "sender": "a@firma.de", "body": "x" * 99, "attachments": ["a.pdf", "b.zip"]}
+    learner.add_feedback(email, {"score": 1}, {"is_correct": True, "correct_category": "safe", "notes": ""})
+
+    summary = learner.feedback_data[0]["email_data"]
+    vector = learner._extract_feature_vector(email)
+    np.testing.assert_allclose(vector, learner._extract_feature_vector(summary))
+    np.testing.assert_allclose(vector[:3], np.log1p([99, 2, np.e - 1]), rtol=1e-6)
+
+    X = learner._feature_matrix([email, summary], ["Rechnung a@firma.de"] * 2)
+    assert X.shape == (2, feedback_learner.FEEDBACK_N_FEATURES)
+    assert (X[0] != X[1]).nnz == 0
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_loaded_model_is_shared_and_copied_before_update(tmp_path):
+    """Instanzen teilen das geladene Modell; Nachtraining arbeitet auf einer Kopie."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 1000
+    for i in range(20):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": i % 2 == 0, "correct_category": "safe", "notes": ""},
+        )
+    learner._retrain_model()
+
+    first, second = FeedbackLearner(model_dir=str(tmp_path)), FeedbackLearner(model_dir=str(tmp_path))
+    assert first.model is second.model
+    shared = first.model
+    coef = shared.coef_.copy()
+
+    first.min_feedback_samples = 1000
+    first.add_feedback(
+        {"subject": "Neu", "sender": "a@b.de"},
+        {"score": 1},
+        {"is_correct": True, "correct_category": "safe", "notes": ""},
+    )
+    first._retrain_model()
+
+    assert first.model is not shared
+    assert (shared.coef_ == coef).all()
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_feature_matrix_matches_per_email_vectors():
+    """Die Stapel-Extraktion entspricht den Einzelvektoren je E-Mail."""
+    import numpy as np
+
+    records = [
+        {"subject": "a", "sender": "x@y.de", "body": "text", "attachments": ["a.pdf"]},
+        {"subject": "b", "sender": "", "has_attachments": False, "attachment_count": 0, "body_length": 12},
+        {},
+    ]
+
+    matrix = FeedbackLearner._extract_feature_matrix(records)
+
+    assert matrix.shape == (3, feedback_learner.FEEDBACK_NUMERIC_FEATURES)
+    for row, record in zip(matrix, records):
+        np.testing.assert_allclose(row, FeedbackLearner._extract_feature_vector(record))
+    np.testing.assert_allclose(matrix[1], [np.log1p(12), 0, 0, np.log1p(1), 0], rtol=1e-6)
+    assert FeedbackLearner._extract_feature_matrix([]).shape == (0, feedback_learner.FEEDBACK_NUMERIC_FEATURES)
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_feedback_history_is_streamed_from_log(tmp_path):
+    """Die Historie bleibt im Log; im Speicher liegen nur noch ungelernte Einträge."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 10
+    for i in range(12):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": i % 3 == 0, "correct_category": "safe", "notes": ""},
+        )
+
+    assert len(learner._pending_feedback) == 2
+
+    reloaded = FeedbackLearner(model_dir=str(tmp_path))
+    assert reloaded._feedback_count == 12
+    assert reloaded._pending_feedback == []
+    assert len(reloaded.feedback_data) == 12
+    assert reloaded.get_learning_stats()["total_samples"] == 12
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_linear_predict_proba_matches_sklearn(tmp_path):
+    """Die direkte Berechnung liefert dieselben Wahrscheinlichkeiten wie sklearn."""
+    import numpy as np
+
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.min_feedback_samples = 10
+    for i in range(20):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": i % 2 == 0, "correct_category": "safe", "notes": ""},
+        )
+    emails = [{"subject": "Betreff 3", "sender": "a@b.de"}, {"subject": "Neu", "sender": "x@y.de"}]
+    X = learner._feature_matrix(emails, [learner._extract_features(email) for email in emails])
+
+    np.testing.assert_allclose(
+        feedback_learner._predict_proba(learner.model, X), learner.model.predict_proba(X)
+    )
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_float64_model_is_discarded_on_load(tmp_path):
+    """Modelle mit float64-Koeffizienten passen nicht zu den float32-Merkmalen."""
+    import numpy as np
+    from scipy import sparse
+
+    from analyzer.model_store import dump_atomic
+
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    assert learner._feature_matrix([{"subject": "Hallo"}], ["Hallo"]).dtype == np.float32
+
+    old = feedback_learner._new_feedback_model()
+    old.fit(sparse.random(4, feedback_learner.FEEDBACK_N_FEATURES, density=0.01, format="csr"), [0, 1, 0, 1])
+    dump_atomic(old, learner.model_file)
+
+    reloaded = FeedbackLearner(model_dir=str(tmp_path))
+    assert not reloaded._model_shared
+    assert not feedback_learner._is_fitted(reloaded.model)
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_learning_stats_use_running_counters(tmp_path, monkeypatch):
+    """Statistiken stammen aus Zählern und stimmen nach dem Neuladen überein."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    for i in range(4):
+        learner.add_feedback(
+            {"subject": f"Betreff {i}", "sender": "a@b.de"},
+            {"score": i},
+            {"is_correct": i != 0, "correct_category": "phishing" if i % 2 else "safe", "notes": ""},
+        )
+
+    monkeypatch.setattr(FeedbackLearner, "_iter_feedback", lambda self: iter(()))
+    stats = learner.get_learning_stats()
+    assert stats["total_samples"] == 4
+    assert stats["accuracy"] == 0.75
+    assert stats["category_distribution"] == {"safe": 2, "phishing": 2}
+
+    monkeypatch.undo()
+    assert FeedbackLearner(model_dir=str(tmp_path)).get_learning_stats()["category_distribution"] == {
+        "safe": 2, "phishing": 2
+    }
+
+
+@pytest.mark.skipif(FeedbackLearner is None, reason="Sklearn nicht verfügbar")
+def test_repeated_emails_are_served_from_prediction_cache(tmp_path):
+    """Wiederkehrende E-Mails lösen keinen weiteren Modellaufruf aus."""
+    learner = FeedbackLearner(model_dir=str(tmp_path))
+    learner.model = FixedModel([[0.05, 0.95], [0.5, 0.5]])
+    email = {"subject": "Rechnung", "sender": "a@b.de"}
+
+    first, repeat = learner.adjust_analysis_batch([
+        (email, {"score": 4.0, "indicators": []}),
+        (dict(email), {"score": 4.0, "indicators": []}),
+    ])
+    again = learner.adjust_analysis(dict(email), {"score": 4.0, "indicators": []})
+
+    assert learner.model.calls == 1
+    assert first["score"] == repeat["score"] == again["score"] == pytest.approx(4.0 * 0.7 + 0.95 * 10.0 * 0.3)
+
+    learner.model = FixedModel([[0.5, 0.5]])
+    assert learner.adjust_analysis(email, {"score": 4.0, "indicators": []})["score"] == 4.0
+    assert learner.model.calls == 1
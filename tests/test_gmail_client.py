@@ -0,0 +1,144 @@
+"""Tests für den Gmail-IMAP-Client."""
+
+import base64
+import json
+import pickle
+
+from analyzer.email_clients import gmail
+from analyzer.email_clients.gmail import GmailClient, _analyze_bodystructure, _parse_fetch_response
+
+MULTIPART = (
+    b'1 (BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL "BASE64" 12 1 NIL NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "rechnung.pdf") NIL NIL "BASE64" 100 NIL '
+    b'("ATTACHMENT" ("FILENAME" "rechnung.pdf")) NIL) "MIXED" ("BOUNDARY" "xyz") NIL NIL) '
+    b'BODY[HEADER.FIELDS (SUBJECT FROM)] {46}'
+)
+SINGLE = (
+    b'2 (BODY[HEADER.FIELDS (SUBJECT FROM)] {40}'
+)
+
+
+class FakeImap:
+    def __init__(self):
+        self.fetch_calls = []
+
+    def select(self, mailbox):
+        return "OK", [b"2"]
+
+    def search(self, charset, criterion):
+        return "OK", [b"1 2"]
+
+    def fetch(self, message_set, spec):
+        self.fetch_calls.append((message_set, spec))
+        if "BODYSTRUCTURE" in spec:
+            return "OK", [
+                (MULTIPART, b"Subject: Rechnung\r\nFrom: billing@example.com\r\n\r\n"),
+                b")",
+                (SINGLE, b"Subject: Hallo\r\nFrom: bob@example.com\r\n\r\n"),
+                b' BODYSTRUCTURE ("TEXT" "PLAIN" ("CHARSET" "ISO-8859-1") NIL NIL "QUOTED-PRINTABLE" 9 1 NIL NIL NIL))',
+            ]
+        if spec == "(BODY.PEEK[1])":
+            payloads = {b"1": base64.b64encode("Zahlen Sie".encode()), b"2": b"Gr=FC=DFe"}
+            data = []
+            for seq in message_set.encode().split(b","):
+                data.append((seq + b" (BODY[1] {%d}" % len(payloads[seq]), payloads[seq]))
+                data.append(b")")
+            return "OK", data
+        raise AssertionError(spec)
+
+
+def test_get_emails_uses_batched_fetches():
+    """Kopfzeilen, Struktur und Text-Teile werden gebündelt abgerufen."""
+    client = GmailClient()
+    client._imap = FakeImap()
+
+    emails = client.get_emails(max_count=20)
+
+    assert len(client._imap.fetch_calls) == 2
+    assert client._imap.fetch_calls[0][0] == "1,2"
+    assert emails == [
+        {
+            "subject": "Rechnung",
+            "sender": "billing@example.com",
+            "body": "Zahlen Sie",
+            "attachments": ["rechnung.pdf"],
+        },
+        {
+            "subject": "Hallo",
+            "sender": "bob@example.com",
+            "body": "Grüße",
+            "attachments": [],
+        },
+    ]
+
+
+def test_analyze_bodystructure_nested_multipart():
+    """Verschachtelte Multiparts liefern korrekte Teilnummern."""
+    data = [
+        b'7 (BODYSTRUCTURE ((("TEXT" "PLAIN" ("CHARSET" "us-ascii") NIL NIL "7BIT" 5 1 NIL NIL NIL)'
+        b'("TEXT" "HTML" ("CHARSET" "us-ascii") NIL NIL "7BIT" 9 1 NIL NIL NIL) "ALTERNATIVE" NIL NIL NIL)'
+        b'("APPLICATION" "ZIP" ("NAME" "a.zip") NIL NIL "BASE64" 10 NIL ("attachment" NIL) NIL) "MIXED" NIL NIL NIL))'
+    ]
+    structure = _parse_fetch_response(data)[b"7"][b"BODYSTRUCTURE"]
+
+    text_part, attachments = _analyze_bodystructure(structure)
+
+    assert text_part == {"number": "1.1", "charset": "us-ascii", "encoding": "7bit"}
+    assert attachments == ["a.zip"]
+
+
+class FakeCredentials:
+    valid = True
+
+    def __init__(self, info=None):
+        self.info = info or {"token": "abc"}
+
+    @classmethod
+    def from_authorized_user_info(cls, info, scopes):
+        return cls(info)
+
+    def to_json(self):
+        return json.dumps(self.info)
+
+
+def test_legacy_pickle_token_is_migrated(tmp_path, monkeypatch):
+    """Ein altes token.pickle wird einmalig in token.json überführt."""
+    monkeypatch.setattr(gmail, "Credentials", FakeCredentials)
+    monkeypatch.chdir(tmp_path)
+    with open("token.pickle", "wb") as f:
+        pickle.dump(FakeCredentials({"token": "alt"}), f)
+
+    creds = GmailClient()._get_credentials()
+
+    assert creds.info == {"token": "alt"}
+    assert not (tmp_path / "token.pickle").exists()
+    assert json.loads((tmp_path / "token.json").read_text()) == {"token": "alt"}
+    assert GmailClient()._get_credentials().info == {"token": "alt"}
+
+
+class BrokenStructureImap(FakeImap):
+    RAW = (
+        b"Subject: =?utf-8?q?Gr=C3=BC=C3=9Fe?=\r\nFrom: alice@example.com\r\n"
+        b"Content-Type: text/plain; charset=utf-8\r\n\r\nHallo"
+    )
+
+    def search(self, charset, criterion):
+        return "OK", [b"3"]
+
+    def fetch(self, message_set, spec):
+        self.fetch_calls.append((message_set, spec))
+        if "BODYSTRUCTURE" in spec:
+            return "OK", [(b'3 (BODYSTRUCTURE NIL BODY[HEADER.FIELDS (SUBJECT FROM)] {2}', b"\r\n"), b")"]
+        if spec == "(BODY.PEEK[])":
+            return "OK", [(b"3 (BODY[] {%d}" % len(self.RAW), self.RAW), b")"]
+        raise AssertionError(spec)
+
+
+def test_unreadable_bodystructure_falls_back_to_full_message():
+    """Ohne verwertbare BODYSTRUCTURE wird die komplette Nachricht geparst."""
+    client = GmailClient()
+    client._imap = BrokenStructureImap()
+
+    emails = client.get_emails()
+
+    assert emails == [{"subject": "Grüße", "sender": "alice@example.com", "body": "Hallo", "attachments": []}]
@@ -0,0 +1,41 @@
+"""Tests für den Byte-Automaten zur Schlüsselwortsuche."""
+
+import numpy as np
+
+from analyzer.keyword_dfa import KeywordDFA
+
+
+def test_find_matches_substring_semantics():
+    """Überlappende, verschachtelte und Nicht-ASCII-Schlüsselwörter werden gefunden."""
+    keywords = ["he", "she", "his", "hers", "überweisen", "konto", "to"]
+    dfa = KeywordDFA(keywords)
+
+    for text in ["ushers", "bitte überweisen sie", "kontonummer", "nichts", "ahishe", ""]:
+        assert dfa.find(text) == {kw for kw in keywords if kw in text}, text
+
+
+def test_duplicates_and_empty_keywords_are_ignored():
+    """Leere Einträge und Duplikate beeinflussen das Ergebnis nicht."""
+    dfa = KeywordDFA(["bank", "", "bank"])
+
+    assert dfa.keywords == ("bank",)
+    assert dfa.find("Die bank") == {"bank"}
+    assert KeywordDFA([]).find("bank") == set()
+
+
+def test_find_many_matches_find_per_text():
+    """Die Stapelsuche liefert je Text dieselben Treffer wie ``find``."""
+    dfa = KeywordDFA(["bank", "konto", "über"])
+    texts = ["bank", "kon", "to", "", "überweisung", "ban", "k"]
+
+    assert dfa.find_many(texts) == [dfa.find(text) for text in texts]
+    assert dfa.find_many([]) == []
+
+
+def test_transition_table_has_one_column_per_byte_class():
+    """Die Tabelle enthält nur Spalten für vorkommende Bytes plus eine Restklasse."""
+    dfa = KeywordDFA(["ab", "bc"])
+
+    assert dfa._transitions.shape == (5, 4)
+    assert dfa._transitions.dtype == np.int16
+    assert dfa.find("xabcx") == {"ab", "bc"}
@@ -0,0 +1,25 @@
+"""Tests für den KeywordMatcher."""
+
+import analyzer.keyword_matcher as keyword_matcher
+from analyzer.keyword_matcher import KeywordMatcher
+
+
+def test_find_returns_all_contained_keywords():
+    """Alle enthaltenen Schlüsselwörter werden genau einmal gemeldet."""
+    matcher = KeywordMatcher(["bank", "konto", "passwort", "bank"])
+    assert matcher.find("ihr bank-konto bei der bank") == {"bank", "konto"}
+    assert matcher.find("") == set()
+
+
+def test_find_without_ahocorasick(monkeypatch):
+    """Ohne pyahocorasick liefert der Fallback dieselben Treffer."""
+    monkeypatch.setattr(keyword_matcher, "ahocorasick", None)
+    matcher = KeywordMatcher(["bank", "konto", ""])
+    assert matcher.find("kontostand der bank") == {"bank", "konto"}
+
+
+def test_find_many_assigns_matches_to_each_text():
+    """Die Stapelsuche ordnet jeden Treffer dem richtigen Text zu."""
+    matcher = KeywordMatcher(["bank", "konto", "a"])
+    texts = ["bank", "xkonto", "", "a", "ban", "k"]
+    assert matcher.find_many(texts) == [matcher.find(text) for text in texts]
@@ -1,7 +1,11 @@
 """Tests für den LocalAIHandler."""
 
+import asyncio
+import types
+
 import pytest
 
+from analyzer import local_ai_handler
 from analyzer.local_ai_handler import LocalAIHandler
 
 
@@ -13,18 +17,18 @@ def test_analyze_email_content_combines_results(monkeypatch):
     handler = LocalAIHandler()
 
     monkeypatch.setattr(
-        handler,
+        LocalAIHandler,
         "_analyze_with_ollama",
-        lambda prompt: {
+        lambda self, prompt: {
             "spam_probability": 0.6,
             "overall_risk": 0.4,
             "indicators": ["a"],
         },
     )
     monkeypatch.setattr(
-        handler,
+        LocalAIHandler,
         "_analyze_with_deepseek",
-        lambda prompt: {
+        lambda self, prompt: {
             "spam_probability": 0.8,
             "overall_risk": 0.7,
             "indicators": ["b"],
@@ -37,3 +41,151 @@ def test_analyze_email_content_combines_results(monkeypatch):
     assert pytest.approx(result["risk_score"]) == 0.55
     assert set(result["indicators"]) == {"a", "b"}
     assert result["confidence"] == 1.0
+
+
+async def _available(self):
+    return True
+
+
+def test_analyze_email_content_async_gathers_models(monkeypatch):
+    """Die asynchrone Variante fragt beide Modelle ab und kombiniert die Ergebnisse."""
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available_async", _available)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available_async", _available)
+    handler = LocalAIHandler()
+
+    async def ollama(self, prompt):
+        return {"spam_probability": 0.2, "overall_risk": 1.0, "indicators": ["a"]}
+
+    async def deepseek(self, prompt):
+        raise RuntimeError("Timeout")
+
+    monkeypatch.setattr(LocalAIHandler, "_analyze_with_ollama_async", ollama)
+    monkeypatch.setattr(LocalAIHandler, "_analyze_with_deepseek_async", deepseek)
+
+    result = asyncio.run(handler.analyze_email_content_async({"body": "text"}))
+
+    assert pytest.approx(result["spam_score"]) == 0.2
+    assert result["confidence"] == 0.5
+    assert result["indicators"] == ["a"]
+
+
+def test_async_path_never_uses_blocking_probes(monkeypatch):
+    """Die asynchrone Analyse prüft die Verfügbarkeit über den AsyncClient und füllt denselben Cache."""
+    def blocking_probe(self):
+        raise AssertionError("synchrone Prüfung auf der Event-Loop")
+
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", blocking_probe)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", blocking_probe)
+    probed = []
+
+    class AsyncClient:
+        async def get(self, url, timeout=None):
+            probed.append(url)
+            return types.SimpleNamespace(status_code=200 if "/api/tags" in url else 503)
+
+    async def ollama(self, prompt):
+        return {"spam_probability": 0.4, "overall_risk": 2.0, "indicators": []}
+
+    monkeypatch.setattr(LocalAIHandler, "_get_async_client", lambda self: AsyncClient())
+    monkeypatch.setattr(LocalAIHandler, "_analyze_with_ollama_async", ollama)
+    handler = LocalAIHandler()
+
+    result = asyncio.run(handler.analyze_email_content_async({"body": "text"}))
+    asyncio.run(handler.analyze_email_content_async({"body": "text"}))
+
+    assert pytest.approx(result["spam_score"]) == 0.4
+    assert len(probed) == 2
+    assert handler.ollama_available and not handler.deepseek_available
+
+
+def test_backends_reuse_persistent_clients(monkeypatch):
+    """Anfragen laufen über die beim Start erzeugten Clients je Backend."""
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", lambda self: False)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", lambda self: False)
+    handler = LocalAIHandler()
+    paths = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        content = b'{"response": "{\\"overall_risk\\": 3}"}'
+
+    handler._ollama.post = lambda path, json: paths.append(path) or Response()
+
+    assert handler._analyze_with_ollama("prompt") == {"overall_risk": 3}
+    assert handler._analyze_with_ollama("prompt") == {"overall_risk": 3}
+    assert paths == ["/api/generate", "/api/generate"]
+    handler.close()
+
+
+def test_availability_is_probed_lazily_and_cached(monkeypatch):
+    """Die Verfügbarkeit wird erst bei Bedarf und dann nur einmal geprüft."""
+    probes = []
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", lambda self: probes.append("ollama") or True)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", lambda self: probes.append("deepseek") or False)
+
+    handler = LocalAIHandler()
+    assert probes == []
+
+    assert handler.ollama_available and handler.ollama_available
+    assert not handler.deepseek_available
+    assert probes == ["ollama", "deepseek"]
+
+    monkeypatch.setattr(local_ai_handler, "AVAILABILITY_TTL", -1.0)
+    handler._availability.clear()
+    handler.ollama_available
+    handler.ollama_available
+    assert probes == ["ollama", "deepseek", "ollama", "ollama"]
+
+
+def test_combined_indicators_are_unique_and_ordered(monkeypatch):
+    """Indikatoren mehrerer Modelle werden ohne Duplikate in Reihenfolge übernommen."""
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", lambda self: False)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", lambda self: False)
+
+    combined = LocalAIHandler()._combine_analysis_results({
+        "ollama": {"indicators": ["link", "dringend", "link"]},
+        "deepseek": {"indicators": ["anhang", "dringend"]},
+    })
+
+    assert combined["indicators"] == ["link", "dringend", "anhang"]
+
+
+def test_unparsable_model_output_is_reported():
+    """Nicht-JSON-Antworten des Modells werden als Fehler mit Rohtext geliefert."""
+    result = LocalAIHandler._parse_deepseek_result({"choices": [{"message": {"content": "kein json"}}]})
+
+    assert result == {"error": "Konnte DeepSeek-Antwort nicht parsen", "raw_response": "kein json"}
+
+
+def test_transport_errors_become_results_but_bugs_propagate(monkeypatch):
+    """HTTP-Fehler ergeben ein Fehlerergebnis, unerwartete Ausnahmen nicht."""
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", lambda self: False)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", lambda self: False)
+    handler = LocalAIHandler()
+
+    def unreachable(path, json):
+        raise local_ai_handler.httpx.HTTPError("nicht erreichbar")
+
+    handler._ollama.post = unreachable
+    assert handler._analyze_with_ollama("prompt") == {"error": "nicht erreichbar"}
+
+    def broken(path, json):
+        raise AttributeError("Programmfehler")
+
+    handler._ollama.post = broken
+    with pytest.raises(AttributeError):
+        handler._analyze_with_ollama("prompt")
+
+
+def test_handler_uses_slots_and_model_attributes(monkeypatch):
+    """Die Modellnamen sind direkte Attribute; weitere Attribute sind nicht erlaubt."""
+    monkeypatch.setattr(LocalAIHandler, "_check_ollama_available", lambda self: False)
+    monkeypatch.setattr(LocalAIHandler, "_check_deepseek_available", lambda self: False)
+    handler = LocalAIHandler()
+
+    assert handler._ollama_payload("p")["model"] == handler.ollama_model
+    assert handler._deepseek_payload("p")["model"] == handler.deepseek_model
+    with pytest.raises(AttributeError):
+        handler.models = {}
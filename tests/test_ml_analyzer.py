@@ -27,3 +27,98 @@ def test_ml_analyzer_regression(tmp_path):
     assert isinstance(result["ml_score"], float)
     assert result["ml_score"] == pytest.approx(0.75, abs=0.25)
     assert result["confidence"] == pytest.approx(1.0)
+
+
+@pytest.mark.skipif(MLAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_important_features_are_cached_until_retrain(tmp_path, monkeypatch):
+    """Die Feature-Wichtigkeiten werden nur einmal je Modell ermittelt."""
+    analyzer = MLAnalyzer(model_dir=str(tmp_path))
+    sample_email = {"subject": "Rechnung", "sender": "a@b.de", "body": "Bitte zahlen", "attachments": []}
+    for score in range(10):
+        analyzer.train(dict(sample_email, subject=f"Rechnung {score}"), score / 10)
+
+    calls = []
+    get_names = analyzer.vectorizer.get_feature_names_out
+    monkeypatch.setattr(analyzer.vectorizer, "get_feature_names_out", lambda: calls.append(1) or get_names())
+
+    assert "ml_features" not in analyzer.analyze_email(sample_email)
+    assert calls == []
+
+    first = analyzer.analyze_email(sample_email, include_features=True)["ml_features"]
+    assert analyzer.analyze_email(sample_email, include_features=True)["ml_features"] == first
+    assert len(calls) == 1
+
+
+@pytest.mark.skipif(MLAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_training_is_incremental_between_full_retrains(tmp_path):
+    """Zwischen vollständigen Trainings bleiben Vokabular und Modell erhalten."""
+    import numpy as np
+
+    analyzer = MLAnalyzer(model_dir=str(tmp_path))
+    sample_email = {"subject": "Rechnung", "sender": "a@b.de", "body": "Bitte zahlen", "attachments": []}
+    for score in range(10):
+        analyzer.train(sample_email, 0.5)
+    model, vectorizer = analyzer.model, analyzer.vectorizer
+
+    for score in range(10):
+        analyzer.train(dict(sample_email, body="Neuer Text"), 0.9)
+
+    assert analyzer.model is model
+    assert analyzer.vectorizer is vectorizer
+    assert "neuer" not in vectorizer.vocabulary_
+    assert vectorizer.transform(["Neuer Text"]).dtype == analyzer.model.coef_.dtype == np.float32
+
+    analyzer._retrain_model(force=True)
+    assert "neuer" in analyzer.vectorizer.vocabulary_
+
+
+@pytest.mark.skipif(MLAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_training_data_round_trip(tmp_path):
+    """Gespeicherte Trainingsdaten werden binär gelesen und geschrieben."""
+    analyzer = MLAnalyzer(model_dir=str(tmp_path))
+    analyzer.training_data = [{"features": "Grüße", "score": 0.5, "metadata": {}}]
+    analyzer._save_training_data()
+
+    assert MLAnalyzer(model_dir=str(tmp_path)).training_data == analyzer.training_data
+
+
+@pytest.mark.skipif(MLAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_important_features_are_top_five_above_threshold(tmp_path):
+    """Es werden höchstens fünf Features mit Wichtigkeit > 1 % absteigend geliefert."""
+    import numpy as np
+
+    analyzer = MLAnalyzer(model_dir=str(tmp_path))
+
+    class Vectorizer:
+        def get_feature_names_out(self):
+            return np.array([f"f{i}" for i in range(8)], dtype=object)
+
+    class Model:
+        feature_importances_ = np.array([0.005, 0.3, 0.1, 0.3, 0.02, 0.05, 0.2, 0.025])
+
+    analyzer.vectorizer, analyzer.model = Vectorizer(), Model()
+
+    assert analyzer._get_important_features("") == [
+        ("f1", 0.3), ("f3", 0.3), ("f6", 0.2), ("f2", 0.1), ("f5", 0.05)
+    ]
+
+
+@pytest.mark.skipif(MLAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_incremental_retrains_are_saved_in_batches(tmp_path):
+    """Nachtrainierte Modelle werden gebündelt und beim flush gespeichert."""
+    import os
+
+    analyzer = MLAnalyzer(model_dir=str(tmp_path))
+    sample_email = {"subject": "Rechnung", "sender": "a@b.de", "body": "Bitte zahlen", "attachments": []}
+    for _ in range(10):
+        analyzer.train(sample_email, 0.5)
+    saved_at = os.stat(analyzer.model_path).st_mtime_ns
+
+    for _ in range(20):
+        analyzer.train(sample_email, 0.9)
+    assert analyzer._unsaved_retrains == 2
+    assert os.stat(analyzer.model_path).st_mtime_ns == saved_at
+
+    analyzer.flush()
+    assert analyzer._unsaved_retrains == 0
+    assert os.stat(analyzer.model_path).st_mtime_ns != saved_at
@@ -0,0 +1,58 @@
+"""Tests für das Laden und Speichern von Modellen."""
+import os
+
+import numpy as np
+
+from analyzer.model_store import dump_atomic, load_shared
+
+
+def test_load_shared_reuses_object_until_file_changes(tmp_path):
+    """Unveränderte Dateien liefern dasselbe, schreibgeschützt eingeblendete Objekt."""
+    path = str(tmp_path / "model.joblib")
+    dump_atomic({"weights": np.arange(1000.0)}, path)
+
+    first = load_shared(path)
+    assert load_shared(path) is first
+    assert not first["weights"].flags.writeable
+
+    dump_atomic({"weights": np.zeros(1000)}, path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+
+    second = load_shared(path)
+    assert second is not first
+    assert second["weights"].sum() == 0
+    assert first["weights"][-1] == 999.0
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_flush_at_exit_does_not_keep_object_alive(monkeypatch):
+    """Registrierte Objekte werden beim Beenden gespeichert, solange sie existieren."""
+    import gc
+
+    from analyzer import model_store
+
+    hooks = []
+    monkeypatch.setattr(model_store.atexit, "register", hooks.append)
+    flushed = []
+
+    class Store:
+        def flush(self):
+            flushed.append(self)
+
+    kept, dropped = Store(), Store()
+    model_store.flush_at_exit(kept.flush)
+    model_store.flush_at_exit(dropped.flush)
+    del dropped
+    gc.collect()
+
+    for hook in hooks:
+        hook()
+    assert flushed == [kept]
+
+
+def test_dump_atomic_uses_pickle_protocol_5(tmp_path):
+    """Modelle werden mit Protokoll 5 geschrieben."""
+    path = tmp_path / "model.joblib"
+    dump_atomic({"weights": np.arange(10.0)}, str(path))
+
+    assert path.read_bytes()[:2] == b"\x80\x05"
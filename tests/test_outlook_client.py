@@ -0,0 +1,70 @@
+"""Tests für den Outlook-Client."""
+
+import types
+
+from analyzer.email_clients.outlook import PR_HASATTACH, OutlookClient
+
+
+class FakeRow:
+    def __init__(self, values):
+        self._values = values
+
+    def Item(self, column):
+        return self._values[column]
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self._rows = list(rows)
+        self.Columns = types.SimpleNamespace(added=[])
+        self.Columns.Add = self.Columns.added.append
+        self.sorted_by = None
+
+    @property
+    def EndOfTable(self):
+        return not self._rows
+
+    def GetNextRow(self):
+        return FakeRow(self._rows.pop(0))
+
+    def Sort(self, column, descending):
+        self.sorted_by = (column, descending)
+
+
+class FakeItem:
+    def __init__(self, body, attachments):
+        self.Body = body
+        self._attachments = attachments
+        self.attachments_read = False
+
+    @property
+    def Attachments(self):
+        self.attachments_read = True
+        return [types.SimpleNamespace(FileName=name) for name in self._attachments]
+
+
+def test_get_emails_reads_table_rows():
+    """Zeilen werden bis max_count gelesen, Anhänge nur bei gesetztem Flag."""
+    rows = [
+        {"EntryID": f"id{i}", "Subject": f"Betreff {i}", "SenderEmailAddress": f"s{i}@example.com",
+         PR_HASATTACH: i == 0}
+        for i in range(3)
+    ]
+    items = {"id0": FakeItem("Body 0", ["a.exe"]), "id1": FakeItem("Body 1", [])}
+    table = FakeTable(rows)
+    inbox = types.SimpleNamespace(GetTable=lambda: table)
+
+    client = OutlookClient()
+    client._outlook = types.SimpleNamespace(
+        GetDefaultFolder=lambda index: inbox,
+        GetItemFromID=items.__getitem__,
+    )
+
+    emails = client.get_emails(max_count=2)
+
+    assert table.sorted_by == ("[ReceivedTime]", True)
+    assert emails == [
+        {"subject": "Betreff 0", "sender": "s0@example.com", "body": "Body 0", "attachments": ["a.exe"]},
+        {"subject": "Betreff 1", "sender": "s1@example.com", "body": "Body 1", "attachments": []},
+    ]
+    assert not items["id1"].attachments_read
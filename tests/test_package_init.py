@@ -0,0 +1,15 @@
+"""Tests für das verzögerte Laden im Paket ``analyzer``."""
+
+import subprocess
+import sys
+
+
+def test_import_does_not_load_email_scanner():
+    """``import analyzer`` lädt den E-Mail-Scanner erst bei Bedarf."""
+    code = (
+        "import sys, analyzer; "
+        "assert 'analyzer.email_scanner' not in sys.modules; "
+        "analyzer.get_outlook_emails; "
+        "assert 'analyzer.email_scanner' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -35,3 +35,67 @@ def test_analyze_trends_returns_structure():
     # Calling again with no new data should keep history
     result = defense.analyze_trends([])
     assert result["window_analysis"]["short"]["total_threats"] >= 2
+
+
+def test_windows_expire_old_and_out_of_order_records():
+    """Records leave each window once they are older than its time span."""
+    from datetime import datetime, timedelta
+
+    defense = ProactiveThreatDefense()
+    now = datetime.now()
+
+    defense.analyze_trends([
+        {"type": "phishing", "score": 4, "timestamp": now - timedelta(hours=1)},
+        {"type": "malware", "score": 9, "timestamp": now - timedelta(days=10)},
+        {"type": "phishing", "score": 6, "timestamp": now - timedelta(days=3)},
+        {"type": "spam", "score": 1, "timestamp": now - timedelta(days=40)},
+    ])
+    windows = defense.analyze_trends([])["window_analysis"]
+
+    assert windows["short"] == {"total_threats": 1, "avg_severity": 4.0, "type_distribution": {"phishing": 1}}
+    assert windows["medium"] == {"total_threats": 2, "avg_severity": 5.0, "type_distribution": {"phishing": 2}}
+    assert windows["long"]["total_threats"] == 3
+    assert windows["long"]["type_distribution"] == {"phishing": 2, "malware": 1}
+    assert windows["long"]["avg_severity"] == round(19 / 3, 2)
+
+
+def test_history_is_bounded_by_size_and_age():
+    """Only recent records are kept, and never more than the configured number."""
+    from datetime import datetime, timedelta
+
+    defense = ProactiveThreatDefense(history_size=3)
+    now = datetime.now()
+    defense.analyze_trends([
+        {"type": "spam", "score": 1, "timestamp": now - timedelta(days=40)},
+        {"type": "phishing", "score": 5, "timestamp": now - timedelta(days=2)},
+    ])
+    assert [record.type for record in defense._history] == ["phishing"]
+
+    defense.analyze_trends([{"type": "malware", "score": 7} for _ in range(5)])
+    assert len(defense._history) == 3
+    assert defense.analyze_trends([])["window_analysis"]["short"]["total_threats"] == 5
+
+
+def test_threat_records_are_slotted_and_immutable():
+    """History records carry no per-instance __dict__ and cannot be changed."""
+    import dataclasses
+    from datetime import datetime
+
+    import pytest
+
+    from analyzer.proactive_defense import ThreatRecord
+
+    record = ThreatRecord(timestamp=datetime.now(), type="spam", score=1.0)
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.score = 2.0
+
+
+def test_records_copy_caller_indicators():
+    """Callers may keep appending to the indicator list they passed in."""
+    defense = ProactiveThreatDefense()
+    indicators = ["a"]
+    defense.analyze_trends([{"type": "phishing", "score": 5.0, "indicators": indicators}])
+    indicators.append("b")
+
+    assert defense._history[0].indicators == ["a"]
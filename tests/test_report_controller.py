@@ -10,8 +10,8 @@ class DummyItem:
 
 
 class DummyListWidget:
-    def __init__(self):
-        self._items = [DummyItem()]
+    def __init__(self, size=1):
+        self._items = [DummyItem() for _ in range(size)]
 
     def count(self):
         return len(self._items)
@@ -41,3 +41,37 @@ def test_collects_emails_and_generates_pdf():
     filename = controller.create_pdf_report(DummyListWidget())
     assert filename == "file.pdf"
     assert generator.received[0]["subject"] == "s"
+
+
+def test_collected_emails_share_timestamp_and_leave_items_untouched():
+    widget = DummyListWidget(size=3)
+    emails = ReportController(DummyGenerator())._collect_emails(widget)
+
+    assert len({email["timestamp"] for email in emails}) == 1
+    assert emails[0] == {"subject": "s", "body": "b", "level": "LOW", "timestamp": emails[0]["timestamp"]}
+    assert widget.item(0).email_data == {"subject": "s", "body": "b"}
+
+
+def test_submit_pdf_report_renders_in_executor(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from analyzer.report_generator import ReportGenerator
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        controller = ReportController(ReportGenerator(str(tmp_path)), executor=executor)
+        widget = DummyListWidget(size=2)
+        for item in widget._items:
+            item.email_data["sender"] = "a@example.com"
+            item.analysis_result["score"] = 1.0
+        filename = controller.submit_pdf_report(widget).result(timeout=30)
+
+    assert filename.startswith(str(tmp_path))
+    assert filename.endswith(".pdf")
+
+
+def test_report_pool_spawns_workers():
+    controller = ReportController(generator=None)
+    try:
+        assert controller._executor()._mp_context.get_start_method() == "spawn"
+    finally:
+        controller.shutdown()
@@ -0,0 +1,97 @@
+"""Tests für die statistische Auswertung des ReportGenerators."""
+import pytest
+
+try:  # pragma: no cover - abhängigkeiten optional
+    from analyzer import report_generator
+    from analyzer.report_generator import ReportGenerator
+except Exception:  # pragma: no cover - pandas/fpdf nicht verfügbar
+    ReportGenerator = None
+
+
+@pytest.mark.skipif(ReportGenerator is None, reason="pandas/fpdf nicht verfügbar")
+def test_statistical_analysis_counts_columns(tmp_path):
+    """Level, Indikatoren, Domains, Anhänge und Zeiten werden gezählt."""
+    emails = [
+        {
+            "score": 8.5, "sender": "a@example.com", "indicators": ["link", "urgent"],
+            "attachments": ["rechnung.pdf", "tool.exe"], "timestamp": "2024-01-01T10:15:00",
+        },
+        {"score": 4.0, "sender": "b@example.com", "indicators": ["link"], "attachments": []},
+        {
+            "score": 1.0, "sender": "c@other.org", "attachments": ["scan.pdf"],
+            "timestamp": "2024-01-02T10:00:00+02:00",
+        },
+    ]
+
+    stats = ReportGenerator(str(tmp_path)).create_statistical_analysis(emails)
+
+    assert stats["threat_levels"] == {"HIGH": 1, "MEDIUM": 1, "LOW": 1}
+    assert stats["common_indicators"] == {"link": 2, "urgent": 1}
+    assert stats["sender_domains"] == {"example.com": 2, "other.org": 1}
+    assert stats["attachment_types"] == {".pdf": 2, ".exe": 1}
+    assert stats["hourly_distribution"]["10"] == 2
+    assert stats["weekly_distribution"]["0"] == stats["weekly_distribution"]["1"] == 1
+
+
+@pytest.mark.skipif(ReportGenerator is None, reason="pandas/fpdf nicht verfügbar")
+def test_statistical_analysis_of_no_emails(tmp_path):
+    """Ohne E-Mails bleiben alle Zähler leer."""
+    stats = ReportGenerator(str(tmp_path)).create_statistical_analysis([])
+
+    assert stats["total_emails"] == 0
+    assert stats["threat_levels"] == {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+    assert sum(stats["hourly_distribution"].values()) == 0
+
+
+@pytest.mark.skipif(
+    ReportGenerator is None or report_generator.xlsxwriter is None, reason="xlsxwriter nicht verfügbar"
+)
+def test_excel_report_is_written(tmp_path):
+    """Der Excel-Bericht wird zeilenweise geschrieben und gespeichert."""
+    import os
+
+    emails = [
+        {"score": 8.0, "subject": "a", "sender": "x@y.de", "indicators": ["link"], "timestamp": "2024-01-01T10:00:00"},
+        {"score": 2.0, "subject": "b", "sender": "z@y.de"},
+    ]
+
+    filename = ReportGenerator(str(tmp_path)).create_excel_report(emails)
+
+    assert filename is not None and os.path.getsize(filename) > 0
+
+
+@pytest.mark.skipif(ReportGenerator is None, reason="pandas/fpdf nicht verfügbar")
+def test_periodic_report_classifies_once(tmp_path, monkeypatch):
+    """Der periodische Bericht bestimmt die Level einmal für alle Ausgaben."""
+    import json
+    from datetime import datetime, timedelta
+
+    now = datetime.now()
+    emails = [
+        {"score": 8.0, "subject": "neu", "sender": "a@b.de", "timestamp": now.isoformat()},
+        {"score": 2.0, "subject": "alt", "sender": "a@b.de", "timestamp": (now - timedelta(days=3)).isoformat()},
+    ]
+    (tmp_path / "email_data.json").write_text(json.dumps(emails))
+
+    calls = []
+    classify = report_generator.classify_threat_levels
+    monkeypatch.setattr(report_generator, "classify_threat_levels", lambda scores: calls.append(1) or classify(scores))
+
+    ReportGenerator(str(tmp_path)).generate_periodic_report("daily")
+
+    assert calls == [1]
+    stats_file, = tmp_path.glob("statistics_daily_*.json")
+    assert json.loads(stats_file.read_text())["threat_levels"] == {"HIGH": 1, "MEDIUM": 0, "LOW": 0}
+    assert list(tmp_path.glob("*.pdf"))
+
+
+@pytest.mark.skipif(ReportGenerator is None, reason="pandas/fpdf nicht verfügbar")
+def test_timestamps_are_binned_in_their_local_time():
+    """Stunde und Wochentag folgen der Ortszeit des jeweiligen Zeitstempels."""
+    timestamps = report_generator._parse_timestamps([
+        "2024-01-01T23:30:00+02:00", "2024-01-06T00:15:00.250000-05:00", "1969-12-31T12:00:00",
+    ])
+    hours, weekdays = report_generator._hour_and_weekday_counts(timestamps)
+
+    assert hours.tolist() == [1 if hour in (0, 12, 23) else 0 for hour in range(24)]
+    assert weekdays.tolist() == [1, 0, 1, 0, 0, 1, 0]
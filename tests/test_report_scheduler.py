@@ -0,0 +1,61 @@
+"""Tests für den ReportScheduler."""
+import time
+
+import pytest
+
+try:  # pragma: no cover - abhängigkeiten optional
+    from analyzer.report_scheduler import ReportScheduler
+except Exception:  # pragma: no cover - schedule/pandas/fpdf nicht verfügbar
+    ReportScheduler = None
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    """Berichte und Konfiguration werden im temporären Verzeichnis gesucht."""
+    monkeypatch.chdir(tmp_path)
+
+
+def _scheduler(daily=True, weekly=False):
+    scheduler = ReportScheduler()
+    scheduler.config.read_dict({"REPORTS": {"daily_reports": str(daily), "weekly_reports": str(weekly)}})
+    scheduler._load_settings()
+    return scheduler
+
+
+@pytest.mark.skipif(ReportScheduler is None, reason="schedule nicht verfügbar")
+def test_stop_returns_without_waiting_for_next_job():
+    """Der Scheduler schläft bis zum nächsten Bericht, lässt sich aber sofort stoppen."""
+    scheduler = _scheduler()
+    scheduler.start()
+
+    started = time.monotonic()
+    scheduler.stop()
+
+    assert time.monotonic() - started < 5
+    assert scheduler.thread is None
+
+
+@pytest.mark.skipif(ReportScheduler is None, reason="schedule nicht verfügbar")
+def test_reload_config_replaces_jobs_without_reentering_loop(monkeypatch):
+    """Ein Neuladen plant die Jobs neu und kehrt sofort zurück."""
+    scheduler = _scheduler(daily=True, weekly=False)
+    scheduler.start()
+    try:
+        monkeypatch.setattr(scheduler.config, "read", lambda *args, **kwargs: [])
+        scheduler.config.set("REPORTS", "weekly_reports", "True")
+        scheduler.reload_config()
+
+        assert len(scheduler._scheduler.get_jobs()) == 2
+    finally:
+        scheduler.stop()
+
+
+@pytest.mark.skipif(ReportScheduler is None, reason="schedule nicht verfügbar")
+def test_settings_are_read_once_per_load(monkeypatch):
+    """Die Einstellungen werden beim Laden übernommen, nicht bei jedem Einplanen."""
+    scheduler = _scheduler(daily=False, weekly=True)
+    monkeypatch.setattr(scheduler.config, "getboolean", lambda *args, **kwargs: pytest.fail("Konfiguration gelesen"))
+
+    scheduler._schedule_jobs()
+
+    assert len(scheduler._scheduler.get_jobs()) == 1
@@ -0,0 +1,24 @@
+"""Tests für die JSON-Serialisierung."""
+
+from analyzer import serialization
+
+
+def test_round_trip_with_and_without_orjson(monkeypatch):
+    """Beide Backends liefern kompatible Bytes für dieselben Daten."""
+    data = {"abteilung": "Büro", "muster": [1, 2.5, None, True]}
+
+    encoded = serialization.dumps(data, indent=True)
+    monkeypatch.setattr(serialization, "orjson", None)
+    fallback = serialization.dumps(data, indent=True)
+
+    assert isinstance(encoded, bytes) and isinstance(fallback, bytes)
+    assert serialization.loads(encoded) == data
+    assert serialization.loads(fallback) == data
+    assert "Büro".encode("utf-8") in fallback
+
+
+def test_numpy_floats_are_serialized():
+    """NumPy-Gleitkommawerte werden wie beim Standardmodul als Zahlen geschrieben."""
+    import numpy as np
+
+    assert serialization.loads(serialization.dumps({"score": np.float64(1.5)})) == {"score": 1.5}
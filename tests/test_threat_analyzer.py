@@ -4,7 +4,7 @@ Test-Suite für den Threat Analyzer
 import pytest
 
 try:  # pragma: no cover - abhängigkeiten optional
-    from analyzer.threat_analyzer import ThreatAnalyzer
+    from analyzer.threat_analyzer import AnalysisContext, ThreatAnalyzer
 except Exception:  # pragma: no cover - z.B. sklearn fehlt
     pytest.skip("Erforderliche Bibliotheken nicht verfügbar", allow_module_level=True)
 
@@ -41,3 +41,132 @@ def test_high_threat_email(analyzer):
 
     result = analyzer.analyze_email(suspicious_email)
     assert result["score"] >= 7, "Verdächtige E-Mail sollte hohen Score haben"
+
+
+def test_keyword_checks_scan_text_once(analyzer):
+    """Betreff und Text liefern alle Risikostufen aus einem Durchlauf"""
+    ctx = AnalysisContext()
+    score = analyzer._check_subject("DRINGEND: Konto Rechnung newsletter", ctx)
+    assert score == pytest.approx(6.0)
+    assert ctx.indicators == [
+        "Hochrisiko-Schlüsselwort im Betreff: konto",
+        "Hochrisiko-Schlüsselwort im Betreff: dringend",
+        "Mittleres Risiko-Schlüsselwort im Betreff: rechnung",
+        "Niedrigrisiko-Schlüsselwort im Betreff: newsletter",
+    ]
+
+    ctx = AnalysisContext()
+    analyzer._check_body("Bitte jetzt die Bestätigung senden", ctx)
+    assert ctx.indicators == [
+        "Low Risk-Schlüsselwort im Text: bestätigung",
+        "Dringlichkeitssprache im Text",
+    ]
+
+
+def test_extract_urls_uses_single_pattern(analyzer):
+    """Alle URL-Muster werden in einem Durchlauf gefunden"""
+    urls = analyzer._extract_urls("Login: http://fake-bank.com/login?x=1 oder www.test.xyz")
+    assert sorted(urls) == ["http://fake-bank.com/login?x=1", "www.test.xyz"]
+
+
+def test_determine_threat_type_matches_compounds(analyzer):
+    """Auch Komposita und vorab kleingeschriebene Texte werden erkannt"""
+    email = {"subject": "Ihr Gewinnspiel", "body": "Bitte Bankdaten angeben", "attachments": []}
+    assert analyzer._determine_threat_type(email) == "phishing"
+    assert analyzer._determine_threat_type(email, "ihr gewinnspiel", "keine daten") == "scam"
+
+
+def test_check_attachments_looks_up_extension_risk(analyzer):
+    """Jede Dateiendung wird genau einer Risikostufe zugeordnet"""
+    ctx = AnalysisContext()
+    analyzer._check_attachments(["Rechnung.PDF.exe", "daten.zip", "notiz.txt"], ctx)
+    assert ctx.indicators == [
+        "Mehrere Anhänge (3)",
+        "Hochrisiko-Anhang: Rechnung.PDF.exe",
+        "Mittleres Risiko-Anhang: daten.zip",
+    ]
+
+
+class OverlappingIntel:
+    """Threat-Intelligence-Attrappe, deren Abfragen sich überlappen müssen"""
+
+    def __init__(self):
+        import threading
+
+        self._barrier = threading.Barrier(3, timeout=5)
+
+    def analyze_text_local(self, text):
+        self._barrier.wait()
+        return {"spam_score": 0.9}
+
+    def check_sender_reputation(self, domain):
+        self._barrier.wait()
+        return {"spamhaus": "blacklisted"}
+
+    def get_spam_score(self, content):
+        self._barrier.wait()
+        return 0.0
+
+
+def test_threat_intel_lookups_run_concurrently(analyzer):
+    """Unabhängige Abfragen laufen nebenläufig und werden geordnet ausgewertet"""
+    analyzer.threat_intel = OverlappingIntel()
+    ctx = AnalysisContext()
+    score = analyzer._perform_threat_intel_analysis(
+        {"subject": "Hallo", "body": "Ohne Links", "sender": "a@spam.example"}, ctx
+    )
+    assert score == pytest.approx(5.0)
+    assert ctx.indicators == [
+        "Hohe Spam-Wahrscheinlichkeit (Lokale KI)",
+        "Domain spam.example ist auf Blacklists",
+    ]
+
+
+def test_analyze_urls_matches_tld_suffix_only(analyzer):
+    """Verdächtige Endungen zählen nur am Ende des Hostnamens"""
+    ctx = AnalysisContext()
+    analyzer._analyze_urls(["http://evil.xyz:8080/login", "https://www.promo.example.com/"], ctx)
+    assert ctx.indicators == ["Verdächtige URL-Domain: evil.xyz:8080"]
+
+
+def test_results_do_not_share_state(analyzer):
+    """Jede Analyse sammelt ihre Indikatoren in einem eigenen Kontext"""
+    first = analyzer.analyze_email({"subject": "Konto", "sender": "a@b.de", "body": "", "attachments": []})
+    indicators = list(first["indicators"])
+    analyzer.analyze_email({"subject": "Rechnung", "sender": "c@d.de", "body": "", "attachments": []})
+    assert first["indicators"] == indicators
+
+
+def test_concurrent_analyses_match_serial(analyzer):
+    """Nebenläufig analysierte E-Mails erhalten dieselben Indikatoren wie einzeln analysierte"""
+    from analyzer.email_controller import EmailController
+
+    emails = [
+        {"subject": subject, "sender": "a@b.de", "body": "", "attachments": []}
+        for subject in ("Konto", "Rechnung", "newsletter", "Hallo") * 4
+    ]
+
+    class Scanner:
+        def get_emails(self, max_count):
+            return emails
+
+    assert ThreatAnalyzer.thread_safe
+    serial = [analyzer.analyze_email(email)["indicators"] for email in emails]
+    parallel = EmailController(Scanner(), analyzer).fetch_emails(len(emails))
+    rule_based = [[i for i in result["indicators"] if "Schlüsselwort" in i] for _, result in parallel]
+    assert rule_based == [[i for i in indicators if "Schlüsselwort" in i] for indicators in serial]
+
+
+def test_close_clusters_pending_emails(analyzer):
+    """Beim Schließen werden noch gepufferte E-Mails geclustert statt verworfen"""
+    email = {"subject": "Konto gesperrt", "sender": "a@evil.xyz", "body": "Bitte anmelden", "attachments": []}
+    for _ in range(3):
+        analyzer.analyze_email(email)
+    flushed = []
+    flush = analyzer.cluster_analyzer.flush
+    analyzer.cluster_analyzer.flush = lambda: flushed.append(len(analyzer.cluster_analyzer._pending_emails)) or flush()
+
+    analyzer.close()
+
+    assert flushed == [3]
+    assert analyzer.cluster_analyzer._pending_emails == []
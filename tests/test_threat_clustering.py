@@ -0,0 +1,127 @@
+"""Tests für den ThreatClusterAnalyzer."""
+import pytest
+
+try:  # pragma: no cover - abhängigkeiten optional
+    from analyzer.threat_clustering import ThreatClusterAnalyzer
+except Exception:  # pragma: no cover - sklearn o.Ä. nicht verfügbar
+    ThreatClusterAnalyzer = None
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_add_emails_clusters_full_batches(tmp_path):
+    """Erst ein voller Stapel löst einen Clustering-Lauf aus."""
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path), batch_size=3)
+    email = {"subject": "Konto gesperrt", "body": "Bitte anmelden", "sender": "a@evil.xyz"}
+
+    assert analyzer.add_emails([email]) == {}
+    assert analyzer.add_emails([email]) == {}
+    result = analyzer.add_emails([email])
+
+    assert result["total_clusters"] == 1
+    assert result["noise_points"] == 0
+    assert analyzer.flush() == {}
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_add_emails_clusters_aged_batches(tmp_path, monkeypatch):
+    """Ein unvollständiger Stapel wird geclustert, sobald er älter als ``max_age`` ist."""
+    from analyzer import threat_clustering
+
+    clock = iter([0.0, 10.0, 61.0])
+    monkeypatch.setattr(threat_clustering.time, "monotonic", lambda: next(clock))
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path), batch_size=100, max_age=60.0)
+    email = {"subject": "Konto gesperrt", "body": "Bitte anmelden", "sender": "a@evil.xyz"}
+
+    assert analyzer.add_emails([email]) == {}
+    assert analyzer.add_emails([email]) == {}
+    result = analyzer.add_emails([email])
+
+    assert result["total_clusters"] == 1
+    assert analyzer._pending_emails == []
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_known_pattern_uses_indicator_jaccard(tmp_path):
+    """Muster gelten ab einer Jaccard-Ähnlichkeit über 0,7 als bekannt."""
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    analyzer._update_cluster_history([
+        {"characteristics": {}},
+        {"characteristics": {"common_indicators": ["a", "b", "c", "d"]}},
+    ])
+
+    assert analyzer._is_known_pattern({"common_indicators": ["a", "b", "c", "d", "e"]})
+    assert not analyzer._is_known_pattern({"common_indicators": ["a", "b", "c", "x"]})
+    assert not analyzer._is_known_pattern({"common_indicators": []})
+
+    # Die Indizes überstehen einen Neustart mit gespeicherter Historie
+    reloaded = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    assert reloaded._is_known_pattern({"common_indicators": ["d", "c", "b", "a"]})
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_cluster_history_is_appended_and_compacted(tmp_path, monkeypatch):
+    """Neue Muster werden angehängt, das Log wird nur gelegentlich neu geschrieben."""
+    from analyzer import threat_clustering
+
+    monkeypatch.setattr(threat_clustering, "CLUSTER_HISTORY_LIMIT", 3)
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    log_file = tmp_path / "cluster_history.jsonl"
+
+    for number in range(6):
+        analyzer._update_cluster_history([{"id": number}])
+    assert len(log_file.read_text().splitlines()) == 6
+
+    analyzer._update_cluster_history([{"id": 6}])
+    assert len(log_file.read_text().splitlines()) == 3
+
+    reloaded = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    assert [pattern["id"] for pattern in reloaded.cluster_history] == [4, 5, 6]
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_legacy_cluster_history_is_migrated(tmp_path):
+    """Eine ``cluster_history.json`` älterer Versionen wird übernommen."""
+    (tmp_path / "cluster_history.json").write_text('[{"id": 1}, {"id": 2}]')
+
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+
+    assert [pattern["id"] for pattern in analyzer.cluster_history] == [1, 2]
+    assert (tmp_path / "cluster_history.jsonl").exists()
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_statistics_count_recent_patterns(tmp_path):
+    """Nur Muster der letzten 24 Stunden zählen als aktuell."""
+    from datetime import datetime, timedelta
+
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    now = datetime.now()
+    analyzer._update_cluster_history([
+        {"timestamp": (now - timedelta(days=2)).isoformat(), "avg_threat_score": 2.0},
+        {"timestamp": (now - timedelta(hours=1)).isoformat(), "avg_threat_score": 4.0},
+        {"avg_threat_score": 6.0},
+    ])
+
+    stats = analyzer.get_cluster_statistics()
+
+    assert stats["total_patterns"] == 3
+    assert stats["patterns_last_24h"] == 1
+    assert stats["avg_threat_score"] == pytest.approx(4.0)
+
+
+@pytest.mark.skipif(ThreatClusterAnalyzer is None, reason="Sklearn nicht verfügbar")
+def test_common_indicators_count_attachment_extensions(tmp_path):
+    """Gemeinsame Merkmale werden je Kategorie in einem Durchlauf gezählt."""
+    analyzer = ThreatClusterAnalyzer(storage_dir=str(tmp_path))
+    emails = [
+        {"indicators": ["a", "b"], "sender": "x@evil.xyz", "attachments": ["one.exe"]},
+        {"indicators": ["a"], "sender": "y@evil.xyz", "attachments": ["two.exe"]},
+        {"indicators": ["c"], "sender": "broken", "attachments": ["three.pdf"]},
+    ]
+
+    common = analyzer._find_common_indicators(emails)
+
+    assert common["common_indicators"] == ["a"]
+    assert common["common_domains"] == ["evil.xyz"]
+    assert common["common_attachment_types"] == [".exe", ".pdf"]
+    assert common["common_url_patterns"] == []
@@ -18,7 +18,7 @@ def threat_intel(monkeypatch):
 def test_local_ai_analysis(threat_intel, monkeypatch):
     """Test der lokalen KI-Analyse mit simulierten Modellantworten."""
 
-    def dummy_analysis(_):
+    def dummy_analysis(self, _):
         return {
             "spam_score": 0.8,
             "confidence": 0.9,
@@ -26,7 +26,7 @@ def test_local_ai_analysis(threat_intel, monkeypatch):
             "model_scores": {"mock": {"spam_score": 0.8, "risk_score": 0.5}},
         }
 
-    monkeypatch.setattr(threat_intel.local_ai, "analyze_email_content", dummy_analysis)
+    monkeypatch.setattr(type(threat_intel.local_ai), "analyze_email_content", dummy_analysis)
 
     result = threat_intel.analyze_text_local("Testinhalt")
 
@@ -145,3 +145,37 @@ def test_attachment_hashing_is_streamed(threat_intel, monkeypatch):
     assert expected_hash in called_url["url"]
     assert len(tracking_file.read_sizes) > 1
     assert -1 not in tracking_file.read_sizes
+
+
+def test_check_urls_batches_safe_browsing_and_caches(threat_intel, monkeypatch):
+    """Safe Browsing erhält alle URLs in einer Anfrage, Wiederholungen kommen aus dem Cache."""
+    calls = []
+
+    class DummyResponse:
+        status_code = 200
+        text = "clean"
+
+        def __init__(self, body):
+            self._body = body
+
+        def json(self):
+            return self._body
+
+    def fake_post(url, json=None, data=None, timeout=None):
+        calls.append(url)
+        if json is not None:
+            return DummyResponse({"matches": [{"threat": {"url": "http://bad.example"}}]})
+        return DummyResponse({})
+
+    monkeypatch.setattr("analyzer.threat_intelligence.requests.post", fake_post)
+    urls = ["http://bad.example", "http://good.example", "http://other.example"]
+
+    results = threat_intel.check_urls(urls)
+
+    assert results["http://bad.example"] == {"safe_browsing": "suspicious", "phishtank": "clean"}
+    assert results["http://good.example"]["safe_browsing"] == "clean"
+    assert sum("safebrowsing" in call for call in calls) == 1
+    assert len(calls) == 4
+
+    assert threat_intel.check_urls(urls[:2]) == {url: results[url] for url in urls[:2]}
+    assert len(calls) == 4
@@ -11,6 +11,8 @@ from analyzer.utils import (
     extract_links,
     is_suspicious_sender,
     get_threat_level,
+    classify_threat_levels,
+    count_threat_levels,
 )
 
 
@@ -108,3 +110,27 @@ def test_get_threat_level_icon():
     assert get_threat_level(8.5, use_icon=True) == "🔴"
     assert get_threat_level(5.0, use_icon=True) == "🟡"
     assert get_threat_level(1.0, use_icon=True) == "🟢"
+
+
+def test_extract_links_matches_regex_semantics():
+    """Die Suche ohne Regex liefert dieselben Treffer wie das frühere Muster."""
+    import re
+
+    samples = [
+        "http:// leer https://a.de/x?y=1\tweiter",
+        "xhttps://b.de,http://c.de\nhttpd http:/kaputt https://",
+        "Text ohne Links",
+        "https://ü.de/ä\u2003danach http://d.de",
+        "",
+    ]
+    for text in samples:
+        assert extract_links(text) == re.findall(r"https?://[^\s]+", text), text
+
+
+def test_classify_threat_levels_matches_get_threat_level():
+    """Die Stapel-Klassifizierung entspricht get_threat_level je Score."""
+    scores = [0.0, 3.99, 4.0, 6.5, 7.0, 10.0, float("nan")]
+    levels = classify_threat_levels(scores)
+    assert [("LOW", "MEDIUM", "HIGH")[level] for level in levels] == [get_threat_level(s) for s in scores]
+    assert count_threat_levels(scores) == {"HIGH": 2, "MEDIUM": 2, "LOW": 3}
+    assert count_threat_levels([]) == {"HIGH": 0, "MEDIUM": 0, "LOW": 0}